@@ -0,0 +1,105 @@
+"""
+Vectorized analytics over a year of blocks: load time, minute occupancy,
+the weekday x hour heatmap, session lengths and per-app histograms. The
+heatmap and occupancy are checked against a straightforward per-block
+Python reference that walks every block across hour boundaries.
+
+Usage: python benchmarks/bench_analytics.py [days] [blocks_per_day]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import populate_days  # noqa: E402
+from src.db.manager import DatabaseManager  # noqa: E402
+from src.utils import analytics  # noqa: E402
+
+
+def reference_heatmap(blocks):
+    """Per-block loop: split at every wall-clock hour boundary."""
+    cells = defaultdict(float)
+    for start, end, category in zip(
+        blocks.start.tolist(), blocks.end.tolist(), blocks.category.tolist()
+    ):
+        t = start
+        while t < end:
+            local = datetime.fromtimestamp(t)
+            hour_start = int(local.replace(minute=0, second=0).timestamp())
+            boundary = min(end, hour_start + 3600)
+            cells[(category, local.weekday(), local.hour)] += (boundary - t) / 60
+            t = boundary
+    heatmap = np.zeros((len(blocks.categories), 7, 24))
+    for (category, weekday, hour), minutes in cells.items():
+        heatmap[category, weekday, hour] = minutes
+    return heatmap
+
+
+def timed(label, func, repeat=5):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    ms = (time.perf_counter() - started) * 1000 / repeat
+    print(f"  {label:<28} {ms:8.2f} ms")
+    return result, ms
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 365
+    blocks_per_day = int(sys.argv[2]) if len(sys.argv) > 2 else 120
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["APPDATA"] = tmp
+        db = DatabaseManager("bench_analytics.db")
+        summary = populate_days(db, days, blocks_per_day, seed=5)
+        start, end = summary["first_day"], summary["last_day"]
+        print(f"{summary['blocks']} blocks over {days} days")
+
+        total_ms = 0
+        blocks, ms = timed(
+            "load (one fetch)", lambda: analytics.BlockArrays.load(db, start, end)
+        )
+        total_ms += ms
+        occupancy, ms = timed(
+            "minute occupancy", lambda: analytics.minute_occupancy(blocks)
+        )
+        total_ms += ms
+        heatmap, ms = timed(
+            "weekday x hour heatmap", lambda: analytics.weekday_hour_heatmap(blocks)
+        )
+        total_ms += ms
+        (sessions, _), ms = timed(
+            "session histogram", lambda: analytics.session_length_histogram(blocks)
+        )
+        total_ms += ms
+        per_app, ms = timed(
+            "per-app histograms", lambda: analytics.app_duration_histograms(blocks)
+        )
+        total_ms += ms
+        print(f"  {'total':<28} {total_ms:8.2f} ms")
+
+        started = time.perf_counter()
+        expected = reference_heatmap(blocks)
+        reference_ms = (time.perf_counter() - started) * 1000
+        assert np.allclose(heatmap, expected), "heatmap differs from reference"
+        print(f"  ok  heatmap matches per-block reference ({reference_ms:.0f} ms)")
+
+        active_minutes = (blocks.end - blocks.start).sum() / 60
+        assert np.isclose(occupancy.sum(), active_minutes), "occupancy lost time"
+        assert np.isclose(heatmap.sum(), active_minutes), "heatmap lost time"
+        assert per_app.sum() == len(blocks)
+        print(f"  ok  occupancy and heatmap both total {active_minutes:.0f} minutes")
+        print(f"  sessions per length bin: {sessions.tolist()}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
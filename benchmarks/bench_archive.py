@@ -0,0 +1,126 @@
+"""
+Cold archive: builds two years of history, reports a year of stats and a
+year-long export, moves closed months to the archive and repeats. Checks
+that every answer is unchanged and shows file sizes and query times with
+the live file holding only recent data.
+
+Usage: python benchmarks/bench_archive.py [days] [blocks_per_day]
+"""
+
+import glob
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import populate_days  # noqa: E402
+from src.db.maintenance import MaintenanceWorker  # noqa: E402
+from src.db.manager import DatabaseManager  # noqa: E402
+from src.utils.exporter import ExportManager  # noqa: E402
+
+RETENTION_DAYS = 30
+
+
+def snapshot(db, exporter, start, end):
+    """Every reporting answer for the range, plus how long each took."""
+    timings = {}
+
+    def timed(label, func):
+        started = time.perf_counter()
+        result = func()
+        timings[label] = (time.perf_counter() - started) * 1000
+        return result
+
+    answers = {
+        "app stats (year)": timed(
+            "app stats (year)",
+            lambda: sorted(
+                (r["app_name"], r["total_duration"], r["category"])
+                for r in db.get_app_usage_stats(start, end)
+            ),
+        ),
+        "category stats (year)": timed(
+            "category stats (year)",
+            lambda: sorted(
+                (r["category"], r["total_duration"])
+                for r in db.get_category_usage_stats(start, end)
+            ),
+        ),
+        "daily stats (365)": timed(
+            "daily stats (365)",
+            lambda: [
+                (r["date"], r["total_duration"])
+                for r in db.get_daily_usage_stats(days=365)
+            ],
+        ),
+        "app stats (7 days)": timed(
+            "app stats (7 days)",
+            lambda: sorted(
+                (r["app_name"], r["total_duration"])
+                for r in db.get_app_usage_stats(
+                    (datetime.now() - timedelta(days=6)).strftime("%Y-%m-%d"), end
+                )
+            ),
+        ),
+    }
+    paths = timed("export (year)", lambda: exporter.export_range(start, end))
+    exported = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            lines = f.readlines()
+        exported[os.path.basename(path)] = [
+            line for line in lines if not line.startswith("Report generated at")
+        ]
+    answers["export (year)"] = exported
+    return answers, timings
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 730
+    blocks_per_day = int(sys.argv[2]) if len(sys.argv) > 2 else 120
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["APPDATA"] = tmp
+        db = DatabaseManager("bench_archive.db")
+        db.set_setting("db_cleanup_days", str(RETENTION_DAYS))
+        exporter = ExportManager(db)
+        exporter.export_dir = os.path.join(tmp, "exports")
+        os.makedirs(exporter.export_dir)
+
+        count = populate_days(db, days, blocks_per_day, seed=11)["blocks"]
+        db.optimize()
+        start = (datetime.now() - timedelta(days=364)).strftime("%Y-%m-%d")
+        end = datetime.now().strftime("%Y-%m-%d")
+        live_before = os.path.getsize(db.db_path)
+        before, before_ms = snapshot(db, exporter, start, end)
+
+        result = MaintenanceWorker(db, pause=0).run_once()
+        archive_files = glob.glob(os.path.join(db.archive.archive_dir, "*.db"))
+        archive_size = sum(os.path.getsize(p) for p in archive_files)
+        after, after_ms = snapshot(db, exporter, start, end)
+
+        print(f"{count} blocks over {days} days, retention {RETENTION_DAYS} days")
+        print(
+            f"  archived {result['rows_archived']} blocks into {len(archive_files)} "
+            f"month files in {result['seconds']:.2f}s"
+        )
+        print(
+            f"  live file {live_before / 2**20:.2f} MB -> "
+            f"{os.path.getsize(db.db_path) / 2**20:.2f} MB, "
+            f"archive {archive_size / 2**20:.2f} MB"
+        )
+        for label in before:
+            assert before[label] == after[label], f"{label} changed after archiving"
+            print(
+                f"  ok  {label:<24} live {before_ms[label]:8.2f} ms   "
+                f"archived {after_ms[label]:8.2f} ms"
+            )
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Micro-benchmark for the heartbeat database workload.
+
+Compares the old connect-per-call access pattern (new sqlite3 connection and
+PRAGMA journal_mode=WAL for every call) with DatabaseManager's pooled
+per-thread connections. One "op" is one heartbeat tick: read the last block
+and update its duration.
+
+Usage: python benchmarks/bench_db_heartbeat.py [ticks]
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.db.manager import DatabaseManager  # noqa: E402
+
+
+def _legacy_connection(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def legacy_tick(db_path):
+    conn = _legacy_connection(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        row = conn.execute(
+            "SELECT * FROM activity_blocks ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        last_block = dict(row)
+    finally:
+        conn.close()
+
+    conn = _legacy_connection(db_path)
+    try:
+        with conn:
+            conn.execute(
+                "UPDATE blocks SET end_ts = ?, duration_minutes = ? WHERE id = ?",
+                (int(datetime.now().timestamp()), 5, last_block["id"]),
+            )
+    finally:
+        conn.close()
+
+
+def pooled_tick(db):
+    last_block = db.get_last_block()
+    db.update_last_block(last_block["id"], 5, end_time=datetime.now().isoformat(" "))
+
+
+def run(label, tick, ticks):
+    start = time.perf_counter()
+    for _ in range(ticks):
+        tick()
+    elapsed = time.perf_counter() - start
+    ops = ticks / elapsed
+    print(f"{label:<28} {ticks:>6} ticks  {elapsed:8.3f}s  {ops:10.1f} ops/sec")
+    return ops
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["APPDATA"] = tmp
+        db = DatabaseManager("bench_heartbeat.db")
+        db.create_block("code.exe", "main.py - Time Reporter")
+
+        before = run(
+            "connect-per-call (before)", lambda: legacy_tick(db.db_path), ticks
+        )
+        after = run("pooled connections (after)", lambda: pooled_tick(db), ticks)
+        print(f"speedup: {after / before:.1f}x")
+
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Point-in-time and overlap lookups on the timeline, through the R*Tree
+interval index and through the plain start_ts index it replaces. Also
+times retroactive breaks (carve + insert) at random points in the history
+and checks both lookups return the same blocks, and that R*Tree lookups
+which find blocks stay under HIT_LIMIT_US.
+
+Usage: python benchmarks/bench_intervals.py [days] [blocks_per_day] [lookups]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import populate_days  # noqa: E402
+from src.db.manager import DatabaseManager, day_start_epoch  # noqa: E402
+
+# A lookup that finds blocks is a few rowid searches; a plan that touches
+# every block takes milliseconds at the default size
+HIT_LIMIT_US = 1000
+
+
+def timed(label, func, lookups):
+    started = time.perf_counter()
+    results = [func(i) for i in range(lookups)]
+    us = (time.perf_counter() - started) * 1e6 / lookups
+    print(f"  {label:<34} {us:10.1f} us/op")
+    return results, us
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 365
+    blocks_per_day = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    lookups = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["APPDATA"] = tmp
+        db = DatabaseManager("bench_intervals.db")
+        if not db.has_interval_index:
+            print("SQLite was built without R*Tree; nothing to compare")
+            return
+        summary = populate_days(db, days, blocks_per_day, seed=3)
+        db.optimize()
+        first = day_start_epoch(summary["first_day"])
+        last = day_start_epoch(summary["last_day"]) + 86400
+        rng = random.Random(8)
+        points = [rng.randint(first, last) for _ in range(lookups)]
+        print(f"{summary['blocks']} blocks over {days} days, {lookups} lookups each")
+
+        answers = {}
+        for label, indexed in (("scan", False), ("R*Tree", True)):
+            db.has_interval_index = indexed
+            at, _ = timed(
+                f"{label}: block at T",
+                lambda i: db.get_block_at(datetime.fromtimestamp(points[i])),
+                lookups,
+            )
+            overlapping, _ = timed(
+                f"{label}: overlapping [T, T+40min)",
+                lambda i: db.get_blocks_overlapping(
+                    datetime.fromtimestamp(points[i]),
+                    datetime.fromtimestamp(points[i] + 2400),
+                ),
+                lookups,
+            )
+            answers[label] = (
+                [b and b["id"] for b in at],
+                [[b["id"] for b in blocks] for blocks in overlapping],
+            )
+        assert answers["scan"] == answers["R*Tree"], "index and scan disagree"
+        print("  ok  both return the same blocks")
+
+        hits = [point for point, block in zip(points, at) if block]
+        assert hits, "no lookup landed on a block"
+        _, at_us = timed(
+            "R*Tree: block at T, hits only",
+            lambda i: db.get_block_at(datetime.fromtimestamp(hits[i])),
+            len(hits),
+        )
+        _, overlapping_us = timed(
+            "R*Tree: overlapping, hits only",
+            lambda i: db.get_blocks_overlapping(
+                datetime.fromtimestamp(hits[i]),
+                datetime.fromtimestamp(hits[i] + 2400),
+            ),
+            len(hits),
+        )
+        assert at_us < HIT_LIMIT_US, f"block at T: {at_us:.0f} us"
+        assert overlapping_us < HIT_LIMIT_US, f"overlap: {overlapping_us:.0f} us"
+        print(f"  ok  lookups that find blocks stay under {HIT_LIMIT_US} us")
+
+        started = time.perf_counter()
+        for point in points[:100]:
+            start = datetime.fromtimestamp(point)
+            with db.batch():
+                db.carve_interval(start, start + timedelta(minutes=40))
+                db.insert_block(
+                    "Break",
+                    "Manual Break Session",
+                    start,
+                    start + timedelta(minutes=40),
+                )
+        us = (time.perf_counter() - started) * 1e6 / 100
+        print(f"  {'retroactive 40 min break':<34} {us:10.1f} us/op")
+        assert not db.check_daily_rollup(), "rollup out of sync after carving"
+        print("  ok  daily rollup still matches the blocks")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Overhead of the metrics registry (src/utils/metrics.py).
+
+Times a trivial function bare, wrapped by timed() with collection off and
+with it on, then replays a synthetic workday through the real engine (with
+every DatabaseManager method instrumented) with metrics off and on, and
+prints the resulting snapshot. Runs on any OS.
+
+Usage: python benchmarks/bench_metrics.py [calls] [hours]
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.db.manager import DatabaseManager  # noqa: E402
+from src.core.replay import ReplayHarness, synthetic_trace  # noqa: E402
+from src.utils.metrics import format_snapshot, registry, timed  # noqa: E402
+
+
+def noop(x):
+    return x
+
+
+def per_call_ns(func, calls: int) -> float:
+    started = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+def replay(trace, enabled: bool):
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["APPDATA"] = tmp
+        db = DatabaseManager("bench_metrics.db")
+        db.set_setting("metrics_enabled", str(enabled))
+        registry.reset()
+        result = ReplayHarness(db).run(trace)
+        snapshot = registry.snapshot()
+        db.close()
+    return result, snapshot
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    hours = float(sys.argv[2]) if len(sys.argv) > 2 else 8
+    logging.basicConfig(level=logging.WARNING)
+
+    wrapped = timed("bench.noop")(noop)
+    bare = per_call_ns(noop, calls)
+    registry.enabled = False
+    disabled = per_call_ns(wrapped, calls)
+    registry.enabled = True
+    enabled = per_call_ns(wrapped, calls)
+    print(f"per call over {calls} calls")
+    print(f"  bare                  {bare:8.0f} ns")
+    print(f"  timed, disabled       {disabled:8.0f} ns  (+{disabled - bare:.0f})")
+    print(f"  timed, enabled        {enabled:8.0f} ns  (+{enabled - bare:.0f})")
+
+    trace = synthetic_trace(hours=hours)
+    snapshot = None
+    for enabled in (False, True):
+        result, snapshot = replay(trace, enabled)
+        label = "on" if enabled else "off"
+        print(
+            f"replay, metrics {label:<3}   {result.events_per_second:10.1f} events/sec"
+        )
+
+    print()
+    print(format_snapshot(snapshot))
+
+
+if __name__ == "__main__":
+    main()
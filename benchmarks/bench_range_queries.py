@@ -0,0 +1,106 @@
+"""
+Range-query benchmark and query-plan check for the statistics/export queries.
+
+Builds a database with a year of synthetic activity, then for every range
+query used by the Statistics view, retention cleanup and the exporter:
+  * captures the SQL actually executed (via the connection trace callback),
+  * asserts EXPLAIN QUERY PLAN serves it from an index, never a full scan,
+  * reports the wall time of the "Last 30 Days" view.
+
+Usage: python benchmarks/bench_range_queries.py [blocks_per_day]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import populate_days  # noqa: E402
+from src.db.manager import DatabaseManager  # noqa: E402
+from src.utils.exporter import ExportManager  # noqa: E402
+
+
+def capture_statements(db, func):
+    conn = db._get_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        func()
+    finally:
+        conn.set_trace_callback(None)
+    relevant = [
+        s
+        for s in statements
+        if ("blocks" in s or "daily_app_usage" in s)
+        and s.lstrip().upper().startswith(("SELECT", "DELETE"))
+    ]
+    # Trigger bodies are traced once per affected row; keep each statement once
+    return list(dict.fromkeys(relevant))
+
+
+def assert_indexed(db, label, func):
+    conn = db._get_connection()
+    for sql in capture_statements(db, func):
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+        scans = [p for p in plan if p.startswith("SCAN") and "INDEX" not in p]
+        assert not scans, f"{label}: full scan in plan {plan}"
+        print(f"  ok  {label:<24} {' | '.join(plan)}")
+
+
+def timed(label, func, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    ms = (time.perf_counter() - start) * 1000 / repeat
+    print(f"  {label:<28} {ms:8.2f} ms")
+
+
+def main():
+    blocks_per_day = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["APPDATA"] = tmp
+        db = DatabaseManager("bench_range.db")
+        exporter = ExportManager(db)
+        exporter.export_dir = tmp
+        count = populate_days(db, 365, blocks_per_day, seed=42)["blocks"]
+        print(f"{count} blocks over 365 days")
+
+        today = datetime.now().strftime("%Y-%m-%d")
+        month_ago = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+
+        print("query plans:")
+        assert_indexed(
+            db, "get_app_usage_stats", lambda: db.get_app_usage_stats(month_ago, today)
+        )
+        assert_indexed(
+            db,
+            "get_category_usage_stats",
+            lambda: db.get_category_usage_stats(month_ago, today),
+        )
+        assert_indexed(
+            db, "get_daily_usage_stats", lambda: db.get_daily_usage_stats(days=30)
+        )
+        assert_indexed(db, "export_date", lambda: exporter.export_date(today))
+
+        print("Last 30 Days view:")
+        timed("get_app_usage_stats", lambda: db.get_app_usage_stats(month_ago, today))
+        timed(
+            "get_category_usage_stats",
+            lambda: db.get_category_usage_stats(month_ago, today),
+        )
+        timed("get_daily_usage_stats(7)", lambda: db.get_daily_usage_stats(days=7))
+
+        assert_indexed(db, "cleanup_old_data", lambda: db.cleanup_old_data(days=300))
+        mismatches = db.check_daily_rollup()
+        assert not mismatches, f"rollup out of sync: {mismatches[:5]}"
+        print("  ok  daily_app_usage rollup consistent with raw blocks")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
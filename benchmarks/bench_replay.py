@@ -0,0 +1,74 @@
+"""
+Headless replay benchmark for the tracking engine.
+
+Feeds a synthetic workday (or a recorded JSON-lines trace, see
+src/core/replay.py) through the real TrackingEngine on a virtual clock and
+reports events/sec, database statements per event and the resulting
+block table, for both the old engine loop (fixed 10s heartbeat, every hook
+event applied immediately) and the deadline scheduler with focus coalescing. Runs on any OS; no desktop session or win32 modules needed.
+
+Usage: python benchmarks/bench_replay.py [hours | trace.jsonl] [blocks_to_show]
+"""
+
+import logging
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.db.manager import DatabaseManager  # noqa: E402
+from src.core.replay import ReplayHarness, load_trace, synthetic_trace  # noqa: E402
+
+
+def print_blocks(blocks, limit):
+    print(f"{'start':<19}  {'end':<19}  {'min':>4}  {'category':<14} app")
+    for block in blocks[:limit]:
+        print(
+            f"{block['start_time'][:19]:<19}  {block['end_time'][:19]:<19}  "
+            f"{block['duration_minutes']:>4}  {block['category']:<14} {block['app_name']}"
+        )
+    if len(blocks) > limit:
+        print(f"... {len(blocks) - limit} more")
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else "8"
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    if os.path.exists(source):
+        trace = load_trace(source)
+    else:
+        trace = synthetic_trace(hours=float(source))
+
+    logging.basicConfig(level=logging.WARNING)
+    results = {}
+    for label, tick_interval in (
+        ("old loop (10s, no coalescing)", 10),
+        ("deadline scheduler", None),
+    ):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["APPDATA"] = tmp
+            db = DatabaseManager("bench_replay.db")
+            result = ReplayHarness(db, tick_interval=tick_interval).run(trace)
+            db.close()
+        results[label] = result
+
+        print(
+            f"{label}: {result.focus_events} focus events -> {result.transitions} "
+            f"transitions, {result.idle_periods} idle periods, {result.ticks} heartbeat ticks"
+        )
+        print(f"  events/sec            {result.events_per_second:10.1f}")
+        print(f"  statements/event      {result.statements_per_event:10.3f}")
+        print(f"  wake-ups/hour         {result.wakeups_per_hour:10.1f}")
+        print(f"  commits               {result.commits:10d}")
+        print(f"  blocks                {len(result.blocks):10d}")
+
+        tracked = sum(b["duration_minutes"] for b in result.blocks)
+        print(f"  sum of block minutes  {tracked:10d}")
+
+    print_blocks(results["deadline scheduler"].blocks, limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Retention under load: one DELETE of everything past the retention window
+vs MaintenanceWorker's chunked run (which archives the months before
+deleting them), while a "tracker" thread keeps writing
+heartbeats. Reports how long the tracker's writes had to wait and how much
+space each approach handed back to the OS.
+
+Usage: python benchmarks/bench_retention.py [days] [blocks_per_day]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import populate_days  # noqa: E402
+from src.db.maintenance import MaintenanceWorker  # noqa: E402
+from src.db.manager import DatabaseManager, day_start_epoch  # noqa: E402
+
+RETENTION_DAYS = 30
+TRACKER_PERIOD_SECONDS = 0.01
+
+
+def single_delete(db):
+    """What startup used to do: one statement, one transaction."""
+    cutoff = (datetime.now() - timedelta(days=RETENTION_DAYS)).strftime("%Y-%m-%d")
+    with db._write() as conn:
+        return conn.execute(
+            "DELETE FROM blocks WHERE start_ts < ?", (day_start_epoch(cutoff),)
+        ).rowcount
+
+
+def run_with_tracker(db, work):
+    """Runs work() while another thread times small heartbeat-sized writes."""
+    block_id = db.create_block("tracker.exe", "benchmark")
+    latencies = []
+    done = threading.Event()
+
+    def tracker():
+        while not done.is_set():
+            started = time.perf_counter()
+            db.update_last_block(block_id, 1)
+            latencies.append(time.perf_counter() - started)
+            time.sleep(TRACKER_PERIOD_SECONDS)
+
+    thread = threading.Thread(target=tracker)
+    thread.start()
+    time.sleep(0.1)
+    started = time.perf_counter()
+    result = work()
+    elapsed = time.perf_counter() - started
+    time.sleep(0.1)
+    done.set()
+    thread.join()
+    return result, elapsed, latencies
+
+
+def report(label, db, work, size_before):
+    result, elapsed, latencies = run_with_tracker(db, work)
+    latencies_ms = sorted(x * 1000 for x in latencies)
+    p99 = latencies_ms[int(len(latencies_ms) * 0.99) - 1]
+    print(f"{label}")
+    print(f"  {result} rows removed in {elapsed:.2f}s")
+    print(
+        f"  tracker writes: {len(latencies_ms)}, median {statistics.median(latencies_ms):.2f} ms, "
+        f"p99 {p99:.2f} ms, max {latencies_ms[-1]:.2f} ms"
+    )
+    print(
+        f"  file: {size_before / 2**20:.1f} MB -> {os.path.getsize(db.db_path) / 2**20:.1f} MB"
+    )
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 730
+    blocks_per_day = int(sys.argv[2]) if len(sys.argv) > 2 else 120
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["APPDATA"] = tmp
+        for label, name in (
+            ("single DELETE (old startup cleanup)", "single.db"),
+            ("MaintenanceWorker.run_once (chunked, background)", "chunked.db"),
+        ):
+            db = DatabaseManager(name)
+            db.set_setting("db_cleanup_days", str(RETENTION_DAYS))
+            count = populate_days(db, days, blocks_per_day, seed=3)["blocks"]
+            db.optimize()
+            size_before = os.path.getsize(db.db_path)
+            if name == "single.db":
+                report(
+                    f"{label}, {count} blocks",
+                    db,
+                    lambda db=db: single_delete(db),
+                    size_before,
+                )
+            else:
+                maintenance = MaintenanceWorker(db)
+                report(
+                    f"{label}, {count} blocks",
+                    db,
+                    lambda maintenance=maintenance: maintenance.run_once()[
+                        "rows_archived"
+                    ],
+                    size_before,
+                )
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Startup cost: each module main.py loads, imported alone in a fresh
+interpreter, and DatabaseManager construction on a new database versus an
+existing one whose schema is already current (the every-login case).
+Modules whose third-party packages are missing here are reported as
+skipped.
+
+Usage: python benchmarks/bench_startup.py [repeats]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.db.manager import DatabaseManager  # noqa: E402
+
+# What main.py needs before the tracker and tray are live, then the UI
+MODULES = (
+    "src.db.manager",
+    "src.core.engine",
+    "src.utils.exporter",
+    "src.utils.tray",
+    "src.ui.dashboard",
+    "src.ui.charts",  # Only on first visit to the Statistics view
+)
+
+IMPORT_PROBE = """
+import sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+import {module}
+print((time.perf_counter() - started) * 1000)
+print(int("matplotlib" in sys.modules), int("numpy" in sys.modules))
+"""
+
+
+def import_ms(module, repeats):
+    """Best of repeats, each in a new interpreter so nothing is cached."""
+    best = None
+    for _ in range(repeats):
+        probe = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE.format(root=ROOT, module=module)],
+            capture_output=True,
+            text=True,
+        )
+        if probe.returncode:
+            return None, probe.stderr.strip().splitlines()[-1]
+        ms, loaded = probe.stdout.split("\n", 1)
+        best = min(best or float("inf"), float(ms))
+    heavy = [
+        name
+        for name, flag in zip(("matplotlib", "numpy"), loaded.split())
+        if flag == "1"
+    ]
+    return best, ", ".join(heavy) or "-"
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    print(f"{'module':<22} {'import':>10}  pulls in")
+    for module in MODULES:
+        ms, detail = import_ms(module, repeats)
+        if ms is None:
+            print(f"{module:<22} {'skipped':>10}  {detail}")
+        else:
+            print(f"{module:<22} {ms:8.1f} ms  {detail}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["APPDATA"] = tmp
+        for label in ("new database", "schema current"):
+            started = time.perf_counter()
+            db = DatabaseManager("bench_startup.db")
+            ms = (time.perf_counter() - started) * 1000
+            commits = db.commit_count
+            db.close()
+            print(f"DatabaseManager, {label:<15} {ms:8.1f} ms")
+        assert commits == 0, "a current schema should need no writes"
+
+
+if __name__ == "__main__":
+    main()
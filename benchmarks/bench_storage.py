@@ -0,0 +1,194 @@
+"""
+Storage comparison: free-text/ISO-string blocks (schema v3) vs normalized
+blocks with interned apps/titles and epoch-second times (schema v4).
+
+Builds the same synthetic history in a v3 database, copies it and lets
+DatabaseManager migrate the copy, then reports file size after VACUUM and
+the time of a few scans/joins on both layouts.
+
+Usage: python benchmarks/bench_storage.py [days] [blocks_per_day]
+"""
+
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.db.manager import CONNECTION_PRAGMAS, DatabaseManager  # noqa: E402
+from src.db.migrations import MIGRATIONS, get_schema_version  # noqa: E402
+
+APP_TITLES = {
+    "code.exe": "{} - Time Reporter - Visual Studio Code",
+    "chrome.exe": "{} - Google Chrome",
+    "slack.exe": "Slack | {}",
+    "explorer.exe": "{} - File Explorer",
+    "WindowsTerminal.exe": "Windows PowerShell - {}",
+    "spotify.exe": "Spotify Premium - {}",
+    "outlook.exe": "Inbox - {} - Outlook",
+}
+WORDS = (
+    "engine manager schema rollup export dashboard tracker review release notes".split()
+)
+
+LEGACY_EXPORT_SQL = """
+    SELECT ab.id, ab.app_name, ab.window_title, ab.start_time, ab.end_time,
+           ab.duration_minutes, ab.day, ab.start_ts, ab.end_ts,
+           COALESCE(ac.category, 'Uncategorized') as category
+    FROM activity_blocks ab
+    LEFT JOIN app_categories ac ON ab.app_name = ac.app_name
+    WHERE ab.start_ts >= ? AND ab.start_ts < ?
+    ORDER BY ab.start_ts ASC
+"""
+LEGACY_APP_TOTALS_SQL = """
+    SELECT app_name, SUM(duration_minutes) FROM activity_blocks GROUP BY app_name
+"""
+NORMALIZED_APP_TOTALS_SQL = """
+    SELECT a.name, s.minutes
+    FROM (SELECT app_id, SUM(duration_minutes) AS minutes
+          FROM blocks GROUP BY app_id) s
+    JOIN apps a ON a.id = s.app_id
+"""
+
+
+def create_legacy_db(path, days, blocks_per_day):
+    conn = sqlite3.connect(path)
+    get_schema_version(conn)
+    for version, description, migration in MIGRATIONS[:3]:
+        migration(conn)
+        conn.execute(
+            "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+            (version, description, datetime.now()),
+        )
+
+    rng = random.Random(7)
+    titles = {
+        app: [
+            pattern.format(" ".join(rng.sample(WORDS, rng.randint(1, 4))))
+            for _ in range(300)
+        ]
+        for app, pattern in APP_TITLES.items()
+    }
+    rows = []
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    for d in range(days):
+        t = (
+            today
+            - timedelta(days=d)
+            + timedelta(hours=8, microseconds=rng.randint(0, 10**6))
+        )
+        for _ in range(blocks_per_day):
+            app = rng.choice(list(APP_TITLES))
+            end = t + timedelta(seconds=rng.randint(30, 900))
+            rows.append(
+                (
+                    app,
+                    rng.choice(titles[app]),
+                    t,
+                    end,
+                    max(1, int((end - t).total_seconds() / 60)),
+                    t.strftime("%Y-%m-%d"),
+                    int(t.timestamp()),
+                    int(end.timestamp()),
+                )
+            )
+            t = end
+    conn.executemany(
+        """
+        INSERT INTO activity_blocks
+            (app_name, window_title, start_time, end_time, duration_minutes, day, start_ts, end_ts)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    return len(rows)
+
+
+def timed(func, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 730
+    blocks_per_day = int(sys.argv[2]) if len(sys.argv) > 2 else 120
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["APPDATA"] = tmp
+        data_dir = os.path.join(tmp, "TimeReporter")
+        os.makedirs(data_dir)
+        legacy_path = os.path.join(data_dir, "legacy.db")
+        count = create_legacy_db(legacy_path, days, blocks_per_day)
+        shutil.copy(legacy_path, os.path.join(data_dir, "normalized.db"))
+
+        started = time.perf_counter()
+        db = DatabaseManager("normalized.db")
+        migration_seconds = time.perf_counter() - started
+        conn = db._get_connection()
+        conn.execute("VACUUM")
+        # VACUUM writes the rebuilt file through the WAL; fold it back in
+        # before measuring.
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        # Same pragmas and row factory as the app, so only the layout differs
+        legacy = sqlite3.connect(legacy_path)
+        legacy.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            legacy.execute(pragma)
+        legacy_size = os.path.getsize(legacy_path)
+        normalized_size = os.path.getsize(db.db_path)
+        print(
+            f"{count} blocks over {days} days (migration took {migration_seconds:.2f}s)"
+        )
+        print(
+            f"  file size     v3 {legacy_size / 2**20:8.1f} MB   "
+            f"v4 {normalized_size / 2**20:8.1f} MB   "
+            f"({100 * normalized_size / legacy_size:.0f}%)"
+        )
+
+        start = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
+        end = datetime.now().strftime("%Y-%m-%d")
+        bounds = (
+            int(datetime.strptime(start, "%Y-%m-%d").timestamp()),
+            int(datetime.now().timestamp()) + 86400,
+        )
+        cases = [
+            (
+                "year export join",
+                lambda: legacy.execute(LEGACY_EXPORT_SQL, bounds).fetchall(),
+                lambda: list(db.iter_blocks_with_category(start, end)),
+            ),
+            (
+                "per-app totals (raw)",
+                lambda: legacy.execute(LEGACY_APP_TOTALS_SQL).fetchall(),
+                lambda: conn.execute(NORMALIZED_APP_TOTALS_SQL).fetchall(),
+            ),
+            (
+                "recent 15 blocks",
+                lambda: legacy.execute(
+                    "SELECT * FROM activity_blocks ORDER BY id DESC LIMIT 15"
+                ).fetchall(),
+                lambda: db.get_recent_blocks(limit=15),
+            ),
+        ]
+        for label, before, after in cases:
+            b, a = timed(before), timed(after)
+            print(f"  {label:<22} v3 {b:8.2f} ms   v4 {a:8.2f} ms   ({b / a:.1f}x)")
+
+        legacy.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Benchmark suite over synthetic histories of 10k, 100k and 1M blocks.
+
+For each size a fresh database is filled by benchmarks/synthetic.py, then
+timed: the statistics queries behind the dashboard and CLI, create_block
+and update_last_block throughput, ExportManager.export_date, the engine's
+transition logic (a replayed workday, see src/core/replay.py) and finally
+cleanup_old_data removing the oldest tenth of the history.
+
+Results are written as JSON; --compare reads an earlier run and exits with
+status 1 when a case's median got slower than --threshold allows. Runs on
+any OS; no desktop session or win32 modules needed.
+
+Usage: python benchmarks/bench_suite.py [--sizes 10k,100k,1m] [--repeat 5]
+           [--output bench_suite.json] [--compare baseline.json] [--threshold 0.25]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import populate  # noqa: E402
+from src.db.manager import DatabaseManager  # noqa: E402
+from src.core.replay import ReplayHarness, synthetic_trace  # noqa: E402
+from src.utils.exporter import ExportManager  # noqa: E402
+from src.utils.metrics import registry  # noqa: E402
+
+DEFAULT_SIZES = "10k,100k,1m"
+WRITE_OPS = 2000
+REPLAY_HOURS = 4
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def measure(func, repeat: int, ops: int = 1) -> dict:
+    """Runs func repeat times; per-op times in ms (func does ops operations)."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - started) * 1000 / ops)
+    return {
+        "median_ms": statistics.median(times),
+        "min_ms": min(times),
+        "max_ms": max(times),
+        "runs": repeat,
+        "ops_per_run": ops,
+    }
+
+
+def stats_cases(db, today: str, repeat: int) -> dict:
+    def days_before(days):
+        return (datetime.strptime(today, "%Y-%m-%d") - timedelta(days=days)).strftime(
+            "%Y-%m-%d"
+        )
+
+    month, year = days_before(29), days_before(364)
+    return {
+        "stats.app_usage_today": measure(
+            lambda: db.get_app_usage_stats(today, today), repeat
+        ),
+        "stats.app_usage_30d": measure(
+            lambda: db.get_app_usage_stats(month, today), repeat
+        ),
+        "stats.app_usage_365d": measure(
+            lambda: db.get_app_usage_stats(year, today), repeat
+        ),
+        "stats.category_usage_30d": measure(
+            lambda: db.get_category_usage_stats(month, today), repeat
+        ),
+        "stats.daily_usage_365d": measure(
+            lambda: db.get_daily_usage_between(year, today), repeat
+        ),
+        "stats.blocks_30d": measure(
+            lambda: sum(1 for _ in db.iter_blocks_with_category(month, today)),
+            repeat,
+        ),
+        "stats.block_at": measure(
+            lambda: db.get_block_at(f"{days_before(1)} 11:00:00"), repeat
+        ),
+    }
+
+
+def write_cases(db, repeat: int) -> dict:
+    def create_blocks():
+        for i in range(WRITE_OPS):
+            created.append(db.create_block("code.exe", f"bench window {i % 50}"))
+
+    def update_blocks():
+        block_id = created[-1]
+        for minutes in range(WRITE_OPS):
+            db.update_last_block(block_id, minutes)
+
+    created = []
+    return {
+        "write.create_block": measure(create_blocks, repeat, WRITE_OPS),
+        "write.update_last_block": measure(update_blocks, repeat, WRITE_OPS),
+    }
+
+
+def export_case(db, day: str, export_dir: str, repeat: int) -> dict:
+    exporter = ExportManager(db, export_dir=export_dir)
+    return {"export.export_date": measure(lambda: exporter.export_date(day), repeat)}
+
+
+def engine_case(db, repeat: int) -> dict:
+    trace = synthetic_trace(hours=REPLAY_HOURS)
+    results = []
+
+    def replay():
+        start = datetime.now() + timedelta(days=1 + len(results))
+        results.append(ReplayHarness(db, start=start).run(trace))
+
+    case = measure(replay, repeat, len(trace))
+    case["transitions_per_run"] = results[-1].transitions
+    case["statements_per_event"] = results[-1].statements_per_event
+    return {"engine.replay_event": case}
+
+
+def cleanup_case(db, summary: dict) -> dict:
+    first = datetime.strptime(summary["first_day"], "%Y-%m-%d")
+    span_days = (datetime.now() - first).days
+    keep_days = max(1, span_days - span_days // 10)
+    deleted = []
+    case = measure(lambda: deleted.append(db.cleanup_old_data(days=keep_days)), 1)
+    case["rows_deleted"] = deleted[0]
+    return {"retention.cleanup_old_data": case}
+
+
+def run_size(size: int, seed: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["APPDATA"] = tmp
+        db = DatabaseManager("bench_suite.db")
+        started = time.perf_counter()
+        summary = populate(db, size, seed)
+        populate_s = time.perf_counter() - started
+        today = summary["last_day"]
+        yesterday = (datetime.strptime(today, "%Y-%m-%d") - timedelta(days=1)).strftime(
+            "%Y-%m-%d"
+        )
+
+        cases = {}
+        cases.update(stats_cases(db, today, repeat))
+        cases.update(export_case(db, yesterday, tmp, repeat))
+        cases.update(write_cases(db, repeat))
+        cases.update(engine_case(db, repeat))
+        # Destructive, so last
+        cases.update(cleanup_case(db, summary))
+        db.close()
+    return {"dataset": {**summary, "populate_s": populate_s}, "cases": cases}
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_size(size: int, result: dict):
+    dataset = result["dataset"]
+    print(
+        f"{size} blocks: {dataset['days']} days from {dataset['first_day']}, "
+        f"{dataset['midnight_crossing']} crossing midnight, "
+        f"populated in {dataset['populate_s']:.1f}s"
+    )
+    for name, case in result["cases"].items():
+        print(
+            f"  {name:<30} {case['median_ms']:10.3f} ms/op  (min {case['min_ms']:.3f})"
+        )
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Prints median ratios against baseline; returns the regressed cases."""
+    regressions = []
+    print(f"\nvs baseline {baseline['meta'].get('revision') or ''}:")
+    for size, result in results["sizes"].items():
+        old_cases = baseline["sizes"].get(size, {}).get("cases", {})
+        for name, case in result["cases"].items():
+            old = old_cases.get(name)
+            if not old or not old["median_ms"]:
+                continue
+            ratio = case["median_ms"] / old["median_ms"]
+            flag = ""
+            if ratio > 1 + threshold:
+                flag = "  REGRESSION"
+                regressions.append(f"{size}/{name}")
+            print(f"  {size:>8} {name:<30} x{ratio:6.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="e.g. 10k,100k,1m")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_suite.json")
+    parser.add_argument("--compare", help="earlier --output file to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed slowdown of a median before it counts as a regression",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    results = {
+        "meta": {
+            "taken_at": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "sizes": {},
+    }
+    for size in map(parse_size, args.sizes.split(",")):
+        result = run_size(size, args.seed, args.repeat)
+        results["sizes"][str(size)] = result
+        print_size(size, result)
+    results["meta"]["metrics_enabled"] = registry.enabled
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
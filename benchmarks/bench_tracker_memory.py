@@ -0,0 +1,127 @@
+"""
+Steady-state resident memory of the tracker in both launch modes:
+
+- single process (default main.py): tracker plus Tk, customtkinter,
+  matplotlib and NumPy for the dashboard, loaded for the whole session
+- --tracker: engine, tray and IPC server only; the dashboard is a separate
+  process that exists while its window is open
+
+Each mode runs in a fresh interpreter that imports what main.py would,
+replays a workday through the real engine and then reports its RSS.
+UI packages missing here are listed; the single-process figure then
+understates the real difference.
+
+Usage: python benchmarks/bench_tracker_memory.py [hours]
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import importlib, json, os, sys, tempfile
+sys.path.insert(0, {root!r})
+
+def rss_bytes():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t)
+                for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage",
+                    "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage",
+                    "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage",
+                )
+            ]
+
+        counters = Counters(cb=ctypes.sizeof(Counters))
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters),
+            counters.cb,
+        )
+        return counters.WorkingSetSize
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+
+missing = []
+def load(*modules):
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            missing.append(f"{{module}} ({{e.name}})")
+
+os.environ["APPDATA"] = tempfile.mkdtemp()
+load("src.utils.tray")  # PIL; pystray is imported when the icon is built
+from src.db.manager import DatabaseManager
+from src.db.maintenance import MaintenanceWorker
+from src.core.ipc import TrackerServer
+from src.core.replay import ReplayHarness, synthetic_trace
+from src.utils.exporter import ExportManager
+
+if {single!r}:
+    # What DashboardApp and a visit to the Statistics view pull in
+    load("src.ui.dashboard", "src.ui.charts")
+    if "src.ui.dashboard" not in sys.modules:
+        load("tkinter", "customtkinter", "PIL.ImageTk")
+    if "src.ui.charts" not in sys.modules:
+        load("numpy", "matplotlib.figure", "matplotlib.backends.backend_tkagg")
+
+db = DatabaseManager("bench_memory.db")
+ExportManager(db)
+MaintenanceWorker(db)
+harness = ReplayHarness(db)
+server = TrackerServer(harness.engine, db.db_dir)
+server.start()
+harness.run(synthetic_trace(hours={hours}))
+loaded = sorted(
+    name for name in ("tkinter", "customtkinter", "matplotlib", "numpy")
+    if name in sys.modules
+)
+print(json.dumps({{"rss": rss_bytes(), "loaded": loaded, "missing": missing}}))
+server.stop()
+db.close()
+"""
+
+
+def measure(single, hours):
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD.format(root=ROOT, single=single, hours=hours)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 8
+    results = {}
+    for label, single in (("single process", True), ("--tracker", False)):
+        result = measure(single, hours)
+        results[label] = result["rss"]
+        print(
+            f"{label:<16} RSS {result['rss'] / 2**20:7.1f} MB   "
+            f"UI libraries loaded: {', '.join(result['loaded']) or 'none'}"
+        )
+        if result["missing"]:
+            print(f"{'':<16} not installed here: {'; '.join(result['missing'])}")
+    saved = results["single process"] - results["--tracker"]
+    print(f"tracker process saves {saved / 2**20:.1f} MB resident")
+
+
+if __name__ == "__main__":
+    main()
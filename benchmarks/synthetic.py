@@ -0,0 +1,222 @@
+"""
+Synthetic multi-year activity history for the benchmarks.
+
+generate_days() plans how many blocks each day gets, going back from today
+until the requested row count is reached, then lays the days out oldest
+first (so ids grow with time, as in a real database):
+  * app usage is Zipf-skewed: a few apps take most blocks, with a long tail;
+    window titles are skewed the same way within each app,
+  * weekdays are busy, weekends light, and some days have no activity,
+  * blocks are separated by short switches, idle gaps and a lunch break,
+  * some days end with a late session whose first block crosses midnight.
+
+populate_days() lays out a fixed number of days ending today instead, each
+with the same number of blocks, for benchmarks that size by days.
+
+Both bulk-insert the rows through the normal schema, so the rollup and
+interval-index triggers run as they do for tracked blocks. Deterministic
+per seed.
+"""
+
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.db.manager import span_minutes, to_epoch  # noqa: E402
+
+# Most-used first; the default category mappings cover the first few
+APPS = [
+    "code.exe",
+    "chrome.exe",
+    "slack.exe",
+    "explorer.exe",
+    "msedge.exe",
+    "powershell.exe",
+    "outlook.exe",
+    "spotify.exe",
+    "teams.exe",
+    "pycharm64.exe",
+    "discord.exe",
+    "cmd.exe",
+    "excel.exe",
+    "winword.exe",
+    "notepad.exe",
+    "vlc.exe",
+    "figma.exe",
+    "postman.exe",
+    "obsidian.exe",
+    "zoom.exe",
+] + [f"tool{i:02d}.exe" for i in range(40)]
+TITLES_PER_APP = 400
+ZIPF_EXPONENT = 1.2
+
+# Blocks per day (uniform within the range) and chance of a day with none
+WEEKDAY_BLOCKS = (60, 220)
+WEEKEND_BLOCKS = (0, 60)
+EMPTY_DAY_PROBABILITY = 0.05
+LATE_SESSION_PROBABILITY = 0.12
+
+SQL_INSERT_BLOCK = """
+    INSERT INTO blocks (app_id, title_id, start_ts, end_ts, duration_minutes)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+def zipf_weights(n: int, exponent: float = ZIPF_EXPONENT) -> list[float]:
+    return [1 / (rank**exponent) for rank in range(1, n + 1)]
+
+
+def plan_days(count: int, rng: random.Random, today: datetime) -> list[tuple]:
+    """(day, blocks) pairs, oldest first, adding up to exactly count."""
+    plan = []
+    remaining = count
+    day = today
+    while remaining > 0:
+        if rng.random() < EMPTY_DAY_PROBABILITY:
+            blocks = 0
+        else:
+            low, high = WEEKEND_BLOCKS if day.weekday() >= 5 else WEEKDAY_BLOCKS
+            blocks = min(remaining, rng.randint(low, high))
+        plan.append((day, blocks))
+        remaining -= blocks
+        day -= timedelta(days=1)
+    plan.reverse()
+    return plan
+
+
+def layout_day(day: datetime, blocks: int, rng: random.Random) -> list[tuple]:
+    """(start, end) times of a day's blocks, in order and non-overlapping."""
+    if blocks == 0:
+        return []
+    late = blocks >= 4 and rng.random() < LATE_SESSION_PROBABILITY
+    late_blocks = rng.randint(1, min(5, blocks - 1)) if late else 0
+    day_blocks = blocks - late_blocks
+
+    # Main session: spread over 8-12 hours from 08:00-10:00, lunch included
+    start = day + timedelta(minutes=rng.randint(8 * 60, 10 * 60))
+    span = rng.randint(8 * 3600, 12 * 3600)
+    lunch_after = day_blocks // 2
+    weights = [rng.lognormvariate(0, 1.2) for _ in range(day_blocks)]
+    gaps = [
+        rng.uniform(5, 45) if rng.random() < 0.08 else rng.uniform(0, 0.5)
+        for _ in range(day_blocks)
+    ]
+    gaps[lunch_after] += rng.uniform(30, 75)
+    scale = span / (sum(weights) + sum(gaps))
+    spans = []
+    t = start
+    for weight, gap in zip(weights, gaps):
+        t += timedelta(seconds=gap * scale)
+        end = t + timedelta(seconds=max(30, weight * scale))
+        spans.append((t, end))
+        t = end
+
+    # Late session: starts 23:00-23:50; its first block runs past midnight
+    if late_blocks:
+        t = max(t, day + timedelta(hours=23, minutes=rng.randint(0, 50)))
+        midnight = day + timedelta(days=1)
+        end = midnight + timedelta(minutes=rng.randint(5, 45))
+        spans.append((t, end))
+        t = end
+        for _ in range(late_blocks - 1):
+            t += timedelta(seconds=rng.uniform(0, 120))
+            end = t + timedelta(seconds=rng.uniform(60, 900))
+            spans.append((t, end))
+            t = end
+    return spans
+
+
+def plan_fixed_days(days: int, blocks_per_day: int, today: datetime) -> list[tuple]:
+    """(day, blocks) pairs for the days days ending today, oldest first."""
+    return [
+        (today - timedelta(days=d), blocks_per_day) for d in range(days - 1, -1, -1)
+    ]
+
+
+def _start_of_today() -> datetime:
+    return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _generate(plan: list[tuple], rng: random.Random):
+    app_weights = zipf_weights(len(APPS))
+    title_weights = zipf_weights(TITLES_PER_APP)
+    for day, blocks in plan:
+        spans = layout_day(day, blocks, rng)
+        apps = rng.choices(range(len(APPS)), app_weights, k=len(spans))
+        titles = rng.choices(range(TITLES_PER_APP), title_weights, k=len(spans))
+        rows = []
+        for (start, end), app, title in zip(spans, apps, titles):
+            start_ts, end_ts = to_epoch(start), to_epoch(end)
+            rows.append((app, title, start_ts, end_ts, span_minutes(start_ts, end_ts)))
+        yield day, rows
+
+
+def generate_days(count: int, seed: int = 0, today: datetime | None = None):
+    """
+    Yields (day, rows) per planned day, oldest first; rows are
+    (app_index, title_index, start_ts, end_ts, duration_minutes).
+    """
+    rng = random.Random(seed)
+    yield from _generate(plan_days(count, rng, today or _start_of_today()), rng)
+
+
+def _insert(db, days) -> dict:
+    """Inserts the (day, rows) pairs in one transaction; returns the summary."""
+    conn = db._get_connection()
+    summary = {"blocks": 0, "days": 0, "midnight_crossing": 0}
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO apps (name) VALUES (?)", ((a,) for a in APPS)
+        )
+        app_ids = [
+            conn.execute("SELECT id FROM apps WHERE name = ?", (a,)).fetchone()[0]
+            for a in APPS
+        ]
+        title_ids = {}
+        for day, rows in days:
+            summary["days"] += 1
+            summary.setdefault("first_day", day.strftime("%Y-%m-%d"))
+            summary["last_day"] = day.strftime("%Y-%m-%d")
+            midnight = to_epoch(day + timedelta(days=1))
+            batch = []
+            for app, title, start_ts, end_ts, minutes in rows:
+                key = (app, title)
+                if key not in title_ids:
+                    text = f"{APPS[app][:-4]} - document {title}"
+                    conn.execute(
+                        "INSERT OR IGNORE INTO titles (title) VALUES (?)", (text,)
+                    )
+                    title_ids[key] = conn.execute(
+                        "SELECT id FROM titles WHERE title = ?", (text,)
+                    ).fetchone()[0]
+                batch.append((app_ids[app], title_ids[key], start_ts, end_ts, minutes))
+                if start_ts < midnight < end_ts:
+                    summary["midnight_crossing"] += 1
+            conn.executemany(SQL_INSERT_BLOCK, batch)
+            summary["blocks"] += len(batch)
+    conn.execute("ANALYZE")
+    return summary
+
+
+def populate(db, count: int, seed: int = 0, today: datetime | None = None) -> dict:
+    """
+    Inserts count synthetic blocks into db (one transaction). Returns
+    {"blocks", "days", "first_day", "last_day", "midnight_crossing"}.
+    """
+    return _insert(db, generate_days(count, seed, today))
+
+
+def populate_days(
+    db, days: int, blocks_per_day: int, seed: int = 0, today: datetime | None = None
+) -> dict:
+    """
+    Inserts blocks_per_day synthetic blocks on each of the days days ending
+    today (one transaction). Returns the same summary as populate().
+    """
+    rng = random.Random(seed)
+    plan = plan_fixed_days(days, blocks_per_day, today or _start_of_today())
+    return _insert(db, _generate(plan, rng))
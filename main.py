@@ -1,11 +1,40 @@
+import time
+
+# Taken before any other import so the startup timeline includes them
+STARTED = time.perf_counter()
+
 import logging
+import os
 import sys
+
+# "main.py report ..." / "Time Reporter.exe report ...": the read-only CLI
+# (src/cli.py), dispatched before the tracker and UI modules are imported
+REPORT_COMMAND = "report"
+if __name__ == "__main__" and sys.argv[1:2] == [REPORT_COMMAND]:
+    from src.cli import main as report
+
+    sys.exit(report(sys.argv[2:], prog=f"{os.path.basename(sys.argv[0])} report"))
+
 import threading
 from src.db.manager import DatabaseManager
+from src.db.maintenance import MaintenanceWorker
 from src.core.engine import TrackingEngine
-from src.ui.dashboard import DashboardApp
+from src.core.ipc import DashboardLauncher, TrackerClient, TrackerServer
+from src.utils.timeline import StartupTimeline
 from src.utils.tray import TrayIcon
 from src.utils.exporter import ExportManager
+from src.utils.metrics import registry
+
+# Passed by the Windows startup entry: start in the tray, window hidden
+TRAY_ONLY_FLAG = "--tray"
+# Tracker and tray only, without Tk or matplotlib in the process; the
+# dashboard runs as a separate process started on demand
+TRACKER_FLAG = "--tracker"
+# The dashboard process started by a --tracker process
+DASHBOARD_FLAG = "--dashboard"
+
+# Metrics of the last run, rewritten on every exit while collection is on
+METRICS_FILE = "metrics.json"
 
 # Configure logging
 logging.basicConfig(
@@ -15,45 +44,64 @@ logging.basicConfig(
 )
 
 
+def dump_metrics(db_manager):
+    if not registry.enabled:
+        return
+    try:
+        path = registry.dump(os.path.join(db_manager.db_dir, METRICS_FILE))
+        logging.info(f"Metrics saved to {path}")
+    except OSError as e:
+        logging.error(f"Could not save metrics: {e}")
+
+
 def main():
+    timeline = StartupTimeline(STARTED)
+    timeline.mark("imports")
     db_manager = None
     exporter = None
     engine = None
+    maintenance = None
+    app = None
     try:
         # 1. Initialize DB & Exporter
         db_manager = DatabaseManager()
         exporter = ExportManager(db_manager)
+        timeline.mark("database")
 
-        # 2. Cleanup
-        cleanup_days = int(db_manager.get_setting("db_cleanup_days", "30"))
-        db_manager.cleanup_old_data(days=cleanup_days)
+        # 2. Retention and vacuum run later, in the background
+        maintenance = MaintenanceWorker(db_manager)
 
-        # 3. Initialize UI First
-        app = DashboardApp(db_manager)
-
-        # 4. Initialize Engine (10s precision)
-        engine = TrackingEngine(db_manager, interval=10, exporter=exporter)
-        engine.on_idle_return_callback = app.show_idle_confirmation
-        app.set_engine(engine)
+        # 3. Initialize Engine first (wakes on deadlines, at most 60s apart)
+        # so tracking does not wait for the UI
+        engine = TrackingEngine(db_manager, interval=60, exporter=exporter)
 
-        # 5. Start Engine in a background thread
+        # 4. Start Engine in a background thread
         engine_thread = threading.Thread(target=engine.start, daemon=True)
         engine_thread.start()
+        maintenance.start()
+        timeline.mark("tracker")
 
-        # 6. Tray logic
+        # 5. Tray logic (the dashboard may not exist yet when a menu item fires)
         def on_tray_exit(icon):
             logging.info("Exiting via tray...")
+            # Stopping the engine flushes pending write-behind updates first
+            engine.stop()
+            maintenance.stop()
             if exporter:
                 try:
                     exporter.export_today()
                 except Exception as e:
                     logging.error(f"Auto-export failed: {e}")
+            dump_metrics(db_manager)
+            db_manager.close()
             icon.stop()
-            app.destroy()
+            if app:
+                app.destroy()
             sys.exit(0)
 
         def on_tray_show(icon):
-            app.after(0, app.show_window)
+            if app:
+                app.after(0, app.show_window)
 
         def on_toggle_break():
             return engine.toggle_manual_break()
@@ -63,6 +111,17 @@ def main():
         )
         tray_thread = threading.Thread(target=tray.run, daemon=True)
         tray_thread.start()
+        timeline.mark("tray")
+
+        # 6. UI last: customtkinter loads here, matplotlib only when the
+        # Statistics view is first opened
+        from src.ui.dashboard import DashboardApp
+
+        app = DashboardApp(db_manager, start_hidden=TRAY_ONLY_FLAG in sys.argv)
+        engine.on_idle_return_callback = app.show_idle_confirmation
+        app.set_engine(engine)
+        timeline.mark("dashboard")
+        timeline.log()
 
         print("--- Time Reporter is active ---")
         print("Core engine is running in background.")
@@ -73,16 +132,154 @@ def main():
 
     except KeyboardInterrupt:
         print("\nStopping Time Reporter...")
+        if engine:
+            engine.stop()
+        if maintenance:
+            maintenance.stop()
         if exporter:
             try:
                 exporter.export_today()
             except:
                 pass
+        if db_manager:
+            dump_metrics(db_manager)
+            db_manager.close()
         sys.exit(0)
     except Exception as e:
         logging.error(f"Fatal error: {e}")
         sys.exit(1)
 
 
+def dashboard_command() -> list[str]:
+    if getattr(sys, "frozen", False):
+        return [sys.executable, DASHBOARD_FLAG]
+    return [sys.executable, os.path.abspath(sys.argv[0]), DASHBOARD_FLAG]
+
+
+def run_tracker():
+    """Engine, maintenance, tray and the IPC server; the UI lives elsewhere."""
+    timeline = StartupTimeline(STARTED)
+    timeline.mark("imports")
+    db_manager = None
+    exporter = None
+    engine = None
+    maintenance = None
+    server = None
+    launcher = DashboardLauncher(dashboard_command())
+    try:
+        db_manager = DatabaseManager()
+        exporter = ExportManager(db_manager)
+        timeline.mark("database")
+
+        maintenance = MaintenanceWorker(db_manager)
+        engine = TrackingEngine(db_manager, interval=60, exporter=exporter)
+        server = TrackerServer(engine, db_manager.db_dir)
+
+        def on_idle_return(idle_start, idle_end):
+            # The popup lives in the dashboard process; start one to ask
+            if not server.post_event("idle_return", idle_start, idle_end):
+                launcher.ensure_running()
+
+        def on_dashboard_gone(events_waiting):
+            # It may still be exiting; an event for it needs a new process
+            launcher.detach()
+            if events_waiting:
+                launcher.ensure_running()
+
+        engine.on_idle_return_callback = on_idle_return
+        server.on_dashboard_gone = on_dashboard_gone
+        engine_thread = threading.Thread(target=engine.start, daemon=True)
+        engine_thread.start()
+        maintenance.start()
+        server.start()
+        timeline.mark("tracker")
+
+        def on_tray_show(icon):
+            if not server.post_event("show"):
+                launcher.ensure_running()
+
+        def on_tray_exit(icon):
+            logging.info("Exiting via tray...")
+            icon.stop()
+
+        tray = TrayIcon(
+            on_show=on_tray_show,
+            on_exit=on_tray_exit,
+            on_toggle_break=engine.toggle_manual_break,
+        )
+        timeline.mark("tray")
+        timeline.log()
+
+        print("--- Time Reporter is active (tracker process) ---")
+        print("Dashboard opens in its own process from the tray icon.")
+
+        # Tray on the main thread until Exit
+        tray.run()
+
+    except KeyboardInterrupt:
+        print("\nStopping Time Reporter...")
+    except Exception as e:
+        logging.error(f"Fatal error: {e}")
+        sys.exit(1)
+    finally:
+        if server:
+            server.stop()  # Asks the dashboard to quit
+        launcher.stop()
+        # Stopping the engine flushes pending write-behind updates first
+        if engine:
+            engine.stop()
+        if maintenance:
+            maintenance.stop()
+        if exporter:
+            try:
+                exporter.export_today()
+            except Exception as e:
+                logging.error(f"Auto-export failed: {e}")
+        if db_manager:
+            dump_metrics(db_manager)
+            db_manager.close()
+
+
+def run_dashboard():
+    """The on-demand UI process; engine commands go to the tracker over IPC."""
+    from src.ui.dashboard import DashboardApp
+
+    db_manager = DatabaseManager()
+    try:
+        tracker = TrackerClient(db_manager.db_dir)
+        tracker.ping()
+    except (OSError, ValueError) as e:
+        logging.error(f"No tracker process to connect to: {e}")
+        db_manager.close()
+        sys.exit(1)
+
+    # Shown by the tracker's "show" event, or only an idle popup
+    app = DashboardApp(db_manager, start_hidden=True, exit_when_hidden=True)
+    app.set_engine(tracker)
+
+    def on_event(name, *args):
+        try:
+            if name == "show":
+                app.after(0, app.show_window)
+            elif name == "idle_return":
+                app.show_idle_confirmation(*args)
+                # Queued behind the popup, so it is confirmed once shown
+                app.after(0, tracker.acknowledge, name, *args)
+            elif name == "quit":
+                app.after(0, app.destroy)
+        except RuntimeError:
+            pass  # Window already gone; the process is exiting
+
+    tracker.listen(on_event)
+    app.mainloop()
+    tracker.unsubscribe()
+    db_manager.close()
+
+
 if __name__ == "__main__":
-    main()
+    if DASHBOARD_FLAG in sys.argv:
+        run_dashboard()
+    elif TRACKER_FLAG in sys.argv:
+        run_tracker()
+    else:
+        main()
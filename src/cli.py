@@ -0,0 +1,200 @@
+"""
+Command-line reports over a read-only connection to the tracker's
+database, safe to run while the tracker is writing.
+
+    python -m src.cli apps --from 2024-01-01 --to 2024-01-31
+    python -m src.cli categories --days 7 --format json
+    python -m src.cli daily --days 30 --format csv > daily.csv
+    python -m src.cli blocks --from 2024-01-01 --to 2024-12-31 --format json
+    python -m src.cli export --days 7 --dir reports
+
+The built EXE runs the same commands as "Time Reporter.exe report ...".
+"json" output is JSON Lines (one object per row) so it can be streamed;
+"blocks" streams rows straight from the cursor for any range size.
+"""
+
+import argparse
+import csv
+import json
+import logging
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from src.db.manager import DatabaseManager
+from src.utils.exporter import ExportManager
+
+FORMATS = ("table", "json", "csv")
+DATE_FORMAT = "%Y-%m-%d"
+
+# Output columns of each report, in order
+COLUMNS = {
+    "apps": ("app_name", "category", "total_duration"),
+    "categories": ("category", "total_duration"),
+    "daily": ("date", "total_duration"),
+    "blocks": (
+        "id",
+        "start_time",
+        "end_time",
+        "duration_minutes",
+        "app_name",
+        "category",
+        "window_title",
+    ),
+}
+# Table widths (negative: right-aligned); the last column is never padded
+TABLE_WIDTHS = {
+    "app_name": 28,
+    "category": 16,
+    "total_duration": -14,
+    "date": 10,
+    "id": -8,
+    "start_time": 19,
+    "end_time": 19,
+    "duration_minutes": -16,
+}
+
+
+def parse_date(value: str) -> str:
+    try:
+        return datetime.strptime(value, DATE_FORMAT).strftime(DATE_FORMAT)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
+
+
+def add_range_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--from", dest="start", type=parse_date, help="first day (YYYY-MM-DD)"
+    )
+    parser.add_argument(
+        "--to", dest="end", type=parse_date, help="last day (default: today)"
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=1,
+        help="days up to --to when --from is not given (default: 1)",
+    )
+
+
+def build_parser(prog: str | None = None) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Time Reporter reports (read-only)."
+    )
+    parser.add_argument(
+        "--db",
+        default="time_reporter.db",
+        help="database file in the data directory (default: %(default)s)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (
+        ("apps", "minutes per application"),
+        ("categories", "minutes per category"),
+        ("daily", "minutes per day"),
+        ("blocks", "raw activity blocks, streamed"),
+    ):
+        report = commands.add_parser(name, help=help_text)
+        add_range_arguments(report)
+        report.add_argument("--format", choices=FORMATS, default="table")
+    export = commands.add_parser("export", help="write the daily text reports")
+    add_range_arguments(export)
+    export.add_argument("--dir", help="output folder (default: the app's Exports)")
+    return parser
+
+
+def resolve_range(parser: argparse.ArgumentParser, args) -> tuple[str, str]:
+    end = args.end or datetime.now().strftime(DATE_FORMAT)
+    start = args.start
+    if start is None:
+        if args.days < 1:
+            parser.error("--days must be at least 1")
+        first = datetime.strptime(end, DATE_FORMAT) - timedelta(days=args.days - 1)
+        start = first.strftime(DATE_FORMAT)
+    if start > end:
+        parser.error(f"--from {start} is after --to {end}")
+    return start, end
+
+
+def write_rows(rows, columns: tuple, fmt: str, out) -> int:
+    """Writes rows as they arrive; returns how many were written."""
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow([row[c] for c in columns])
+            count += 1
+    elif fmt == "json":
+        for row in rows:
+            out.write(json.dumps({c: row[c] for c in columns}, ensure_ascii=False))
+            out.write("\n")
+            count += 1
+    else:
+        widths = [TABLE_WIDTHS.get(c, 0) for c in columns[:-1]] + [0]
+        out.write(format_line(columns, widths))
+        for row in rows:
+            out.write(
+                format_line(["" if row[c] is None else row[c] for c in columns], widths)
+            )
+            count += 1
+    return count
+
+
+def format_line(values, widths) -> str:
+    cells = []
+    for value, width in zip(values, widths):
+        text = str(value)
+        if width > 0:
+            text = text[:width].ljust(width)
+        elif width < 0:
+            text = text.rjust(-width)
+        cells.append(text)
+    return "  ".join(cells).rstrip() + "\n"
+
+
+def run(db: DatabaseManager, command: str, start: str, end: str, args, out) -> int:
+    if command == "apps":
+        rows = db.get_app_usage_stats(start, end)
+    elif command == "categories":
+        rows = db.get_category_usage_stats(start, end)
+    elif command == "daily":
+        rows = db.get_daily_usage_between(start, end)
+    elif command == "blocks":
+        rows = db.iter_blocks_with_category(start, end)
+    else:
+        exporter = ExportManager(db, export_dir=args.dir)
+        paths = exporter.export_range(start, end)
+        for path in paths:
+            out.write(f"{path}\n")
+        return len(paths)
+    return write_rows(rows, COLUMNS[command], args.format, out)
+
+
+def main(argv: list[str] | None = None, prog: str | None = None) -> int:
+    parser = build_parser(prog)
+    args = parser.parse_args(argv)
+    start, end = resolve_range(parser, args)
+    # stdout carries the report; diagnostics go to stderr
+    logging.basicConfig(
+        level=logging.WARNING, format="%(levelname)s: %(message)s", force=True
+    )
+
+    try:
+        db = DatabaseManager(args.db, read_only=True)
+    except (OSError, RuntimeError, sqlite3.Error) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    try:
+        run(db, args.command, start, end, args, sys.stdout)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        pass  # Output piped into e.g. head, which stopped reading
+    except sqlite3.Error as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(prog="python -m src.cli"))
@@ -0,0 +1,54 @@
+import threading
+from datetime import datetime
+from src.core.sources import Clock
+
+
+class FocusCoalescer:
+    """
+    Collapses bursts of foreground changes (alt-tab storms) into the window
+    that actually kept focus. Every event restarts the settle window; once
+    focus has stayed put for settle_seconds, poll() hands out that single
+    change together with the moment the window gained focus.
+    """
+
+    def __init__(self, clock: Clock, settle_seconds: float = 1.0):
+        self.clock = clock
+        self.settle_seconds = settle_seconds
+        self._lock = threading.Lock()
+        # (app_name, window_title, focused_at, monotonic time of the event)
+        self._pending: tuple[str, str, datetime, float] | None = None
+        self.events_received = 0
+        self.changes_emitted = 0
+
+    @property
+    def has_pending(self) -> bool:
+        return self._pending is not None
+
+    def offer(self, app_name: str, window_title: str):
+        with self._lock:
+            self._pending = (
+                app_name,
+                window_title,
+                self.clock.now(),
+                self.clock.monotonic(),
+            )
+            self.events_received += 1
+
+    def seconds_until_settled(self) -> float | None:
+        with self._lock:
+            if self._pending is None:
+                return None
+            elapsed = self.clock.monotonic() - self._pending[3]
+            return max(0.0, self.settle_seconds - elapsed)
+
+    def poll(self) -> tuple[str, str, datetime] | None:
+        """Returns the settled (app_name, window_title, focused_at), if any."""
+        with self._lock:
+            if self._pending is None:
+                return None
+            app_name, window_title, focused_at, offered_at = self._pending
+            if self.clock.monotonic() - offered_at < self.settle_seconds:
+                return None
+            self._pending = None
+            self.changes_emitted += 1
+        return app_name, window_title, focused_at
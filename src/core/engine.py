@@ -1,70 +1,202 @@
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta
 import threading
 import time
 import logging
+import queue
+from concurrent.futures import Future
 from typing import Callable
-import win32gui
 from src.db.manager import DatabaseManager
-from src.core.tracker import get_active_window_info, WindowEventObserver
-from src.utils.idle import is_user_idle, get_idle_duration
 from src.utils.exporter import ExportManager
+from src.core.sources import (
+    Clock,
+    IdleSource,
+    SystemClock,
+    Win32IdleSource,
+    Win32WindowSource,
+    WindowSource,
+)
+from src.core.writebehind import WriteBehindBuffer
+from src.core.coalescer import FocusCoalescer
+from src.utils.metrics import registry, timed
+
+# While idle only a return needs noticing; its time is back-dated from the
+# idle duration, so a slow poll loses no precision
+IDLE_RETURN_POLL_SECONDS = 30
+# Lower bound between heartbeat wake-ups, and slack added to deadlines so a
+# wake-up lands just after the boundary it waits for
+MIN_SLEEP_SECONDS = 0.5
+DEADLINE_SLACK_SECONDS = 0.05
+# How long callers waiting on a writer command (tray, dashboard) may block
+COMMAND_TIMEOUT_SECONDS = 10
+# Engine attributes a command may change; restored when its writes roll back
+TRACKING_STATE = (
+    "active_block",
+    "previous_block",
+    "idle_block",
+    "is_manual_break",
+    "manual_break_start",
+    "is_in_idle_mode",
+    "idle_started_at",
+    "last_date",
+    "transition_count",
+)
+
+
+@dataclass
+class ActiveBlock:
+    """In-memory mirror of the block currently being tracked."""
+
+    id: int
+    app_name: str
+    window_title: str
+    start_time: datetime
+    duration_minutes: int = 1  # Last value written to the database
+
+    @classmethod
+    def from_row(cls, row: dict) -> "ActiveBlock":
+        return cls(
+            id=row["id"],
+            app_name=row["app_name"],
+            window_title=row["window_title"],
+            start_time=datetime.fromtimestamp(row["start_ts"]),
+            duration_minutes=row["duration_minutes"],
+        )
+
+    def duration_until(self, end_time: datetime) -> int:
+        return max(1, int((end_time - self.start_time).total_seconds() / 60))
 
 
 class TrackingEngine:
     def __init__(
         self,
         db_manager: DatabaseManager,
-        interval: int = 10,
+        interval: int = 60,
         exporter: ExportManager | None = None,
+        window_source: WindowSource | None = None,
+        idle_source: IdleSource | None = None,
+        clock: Clock | None = None,
     ):
         self.db = db_manager
         self.interval = interval
         self.exporter = exporter
         self.is_running = False
-        self.observer = WindowEventObserver(self._on_window_change)
+        # Platform access goes through these; Windows implementations by default
+        self.windows = window_source or Win32WindowSource()
+        self.idle = idle_source or Win32IdleSource()
+        self.clock = clock or SystemClock()
         self._stop_event = threading.Event()
+        # Every mutation of tracking state runs on the writer thread; other
+        # threads queue (func, args, future) commands, or None to wake it
+        self._commands: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer_thread: threading.Thread | None = None
+        self.wakeup_count = 0
+        self.command_count = 0
+        self.batch_count = 0
+
+        # Foreground changes settle here before they become block transitions
+        self.focus = FocusCoalescer(self.clock)
+        self.transition_count = 0
+
+        # Authoritative state of the block being tracked; the database is
+        # only written when it changes. previous_block is kept for merging.
+        self.active_block: ActiveBlock | None = None
+        self.previous_block: ActiveBlock | None = None
+
+        # Coalesces heartbeat duration updates; configured in reload_settings
+        self.write_buffer = WriteBehindBuffer(self.db, clock=self.clock)
+        self._stats_window_start = self.clock.monotonic()
+        self._stats_commit_base = self.db.commit_count
+        self._stats_flush_base = 0
+        self._stats_wakeup_base = 0
+        self._stats_focus_base = (0, 0)
 
         # Smart Idle State
         self.idle_threshold = int(self.db.get_setting("idle_threshold", "300"))
         self.is_in_idle_mode = False
         self.idle_started_at = None
+        self.idle_block: ActiveBlock | None = None  # Block active when idle began
         self.on_idle_return_callback: Callable[[datetime, datetime], None] | None = (
             None  # Will be set by UI
         )
         self.is_manual_break = False
         self.manual_break_start = None
         self.merge_short_browsing = False
-        self.last_date = datetime.now().date()
-        self.reload_settings()
+        self.last_date = self.clock.now().date()
+        self._reload_settings()
+
+        self._focus_events = registry.counter("engine.focus_events")
+        registry.gauge("engine.transitions", lambda: self.transition_count)
+        registry.gauge("engine.wakeups", lambda: self.wakeup_count)
+        registry.gauge("engine.commands", lambda: self.command_count)
+        registry.gauge("engine.pending_commands", self._commands.qsize)
+        registry.gauge("db.commits", lambda: self.db.commit_count)
 
-    def reload_settings(self):
+    def reload_settings(self) -> Future:
         """Reloads configuration from the database."""
+        return self._submit(self._reload_settings)
+
+    def invalidate_categories(self) -> Future:
+        """Drops the cached category mapping (changed by another process)."""
+        return self._submit(self.db.categories.invalidate)
+
+    def _reload_settings(self):
         self.idle_threshold = int(self.db.get_setting("idle_threshold", "300"))
         self.merge_short_browsing = (
             self.db.get_setting("merge_short_browsing", "False") == "True"
         )
+        self.write_buffer.configure(
+            max_data_loss_seconds=int(
+                self.db.get_setting("max_data_loss_seconds", "60")
+            ),
+            flush_on_change=self.db.get_setting("flush_on_change", "True") == "True",
+        )
+        self.focus.settle_seconds = (
+            int(self.db.get_setting("focus_settle_ms", "1000")) / 1000
+        )
+        registry.enabled = self.db.get_setting("metrics_enabled", "True") == "True"
         logging.info(
-            f"Engine settings reloaded. Idle Threshold: {self.idle_threshold}s, Merge Short Browsing: {self.merge_short_browsing}"
+            f"Engine settings reloaded. Idle Threshold: {self.idle_threshold}s, Merge Short Browsing: {self.merge_short_browsing}, "
+            f"Max Data Loss: {self.write_buffer.max_data_loss_seconds}s, Flush On Change: {self.write_buffer.flush_on_change}, "
+            f"Focus Settle: {self.focus.settle_seconds}s"
+        )
+
+    def reconcile_active_block(self):
+        """
+        Reloads the in-memory block state from the database (startup). A
+        break does not survive a restart: a trailing "Break" block stays
+        closed at its stored end and tracking resumes normally.
+        """
+        recent = self.db.get_recent_blocks(limit=2)
+        self.is_manual_break = False
+        self.manual_break_start = None
+        if recent and recent[0]["app_name"] == "Break":
+            self.active_block = self.previous_block = None
+            return
+        self.active_block = ActiveBlock.from_row(recent[0]) if recent else None
+        self.previous_block = (
+            ActiveBlock.from_row(recent[1]) if len(recent) > 1 else None
         )
 
     def start(self):
         self.is_running = True
+        self.reconcile_active_block()
 
         # 1. Start Event Observer in a dedicated thread
-        # This thread will block on win32gui.PumpMessages()
+        # This thread will block on the window source's message pump
         self.observer_thread = threading.Thread(target=self._run_observer, daemon=True)
         self.observer_thread.start()
 
-        # 2. Initial capture
-        info = get_active_window_info()
-        if info:
-            self._on_window_change(info[0], info[1])
-
-        # 3. Start Heartbeat in a dedicated thread
-        self.heartbeat_thread = threading.Thread(
-            target=self._run_heartbeat, daemon=True
+        # 2. Start the writer (commands + heartbeat) in a dedicated thread
+        self._writer_thread = threading.Thread(
+            target=self._run_writer, name="engine-writer", daemon=True
         )
-        self.heartbeat_thread.start()
+        self._writer_thread.start()
+
+        # 3. Initial capture
+        info = self.windows.active_window()
+        if info:
+            self._submit(self._on_window_change, info[0], info[1])
 
         logging.info("Pro-level Tracking Engine started (Multi-threaded).")
 
@@ -76,19 +208,212 @@ class TrackingEngine:
             self.stop()
 
     def _run_observer(self):
-        """Runs the blocking Windows message pump."""
-        if self.observer.start():
-            logging.info("Windows Event Hook active.")
-            win32gui.PumpMessages()
-
-    def _run_heartbeat(self):
-        """Standard 60s timer to increment durations."""
+        """Runs the blocking window source (Windows message pump)."""
+        self.windows.run(self._on_focus_event)
+
+    @timed("engine.focus_event")
+    def _on_focus_event(self, app_name, window_title):
+        """
+        Hook callback: only records the change. The writer thread turns it
+        into a transition once focus has settled.
+        """
+        self._focus_events.inc()
+        if self.focus.settle_seconds <= 0:
+            self._submit(self._on_window_change, app_name, window_title)
+            return
+        self.focus.offer(app_name, window_title)
+        self._commands.put(None)  # Wake the writer to reschedule
+
+    def _apply_settled_focus(self):
+        settled = self.focus.poll()
+        if settled:
+            app_name, window_title, focused_at = settled
+            self._on_window_change(app_name, window_title, at=focused_at)
+
+    def _submit(self, func: Callable, *args) -> Future:
+        """
+        Queues a mutation for the writer thread. Runs it inline when called
+        on the writer thread itself or when no writer is running (replay,
+        dashboard without a tracker, after stop).
+        """
+        future = Future()
+        writer = self._writer_thread
+        if (
+            writer is None
+            or writer is threading.current_thread()
+            or not writer.is_alive()
+        ):
+            future.set_result(func(*args))
+        else:
+            self._commands.put((func, args, future))
+        return future
+
+    def _run_writer(self):
+        """
+        The single thread that mutates tracking state and writes blocks.
+        Sleeps on the command queue until the next heartbeat deadline;
+        commands that queued up together run as one transaction.
+        """
         while not self._stop_event.is_set():
-            time.sleep(self.interval)
             try:
-                self._heartbeat_tick()
-            except Exception as e:
-                logging.error(f"Heartbeat error: {e}")
+                command = self._commands.get(timeout=self.next_wakeup_delay())
+            except queue.Empty:
+                self.wakeup_count += 1
+                try:
+                    self._apply_settled_focus()
+                    self._heartbeat_tick()
+                except Exception as e:
+                    logging.error(f"Heartbeat error: {e}")
+                continue
+            self._run_commands([command, *self._drain_commands()])
+
+        # Commands queued while stopping still run
+        self._run_commands(self._drain_commands())
+
+    def _drain_commands(self) -> list:
+        commands = []
+        while True:
+            try:
+                commands.append(self._commands.get_nowait())
+            except queue.Empty:
+                return commands
+
+    @timed("engine.run_commands")
+    def _run_commands(self, commands: list):
+        commands = [command for command in commands if command]
+        if not commands:
+            return  # Only wake-ups: the deadline is recomputed by the caller
+
+        outcomes = []
+        before_batch = self._capture_state()
+        try:
+            with self.db.batch():
+                for func, args, future in commands:
+                    before = self._capture_state()
+                    try:
+                        # A failing command only undoes its own writes
+                        with self.db.savepoint():
+                            outcomes.append((future, func(*args), None))
+                    except Exception as e:
+                        logging.error(f"Engine command {func.__name__} failed: {e}")
+                        self._restore_state(before)
+                        outcomes.append((future, None, e))
+        except Exception as e:
+            logging.error(f"Engine command batch failed: {e}")
+            self._restore_state(before_batch)
+            outcomes = [(future, None, e) for _, _, future in commands]
+
+        self.command_count += len(commands)
+        self.batch_count += 1
+        for future, result, error in outcomes:
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _capture_state(self) -> tuple:
+        """
+        Tracking state and pending writes before a command runs. Blocks are
+        copied by value and restored in place, since the write-behind buffer
+        and idle_block refer to them by identity.
+        """
+        buffered = self.write_buffer.snapshot()
+        blocks = [self.active_block, self.previous_block, self.idle_block]
+        blocks += [block for block, _, _ in buffered[0].values()]
+        distinct = {id(block): block for block in blocks if block is not None}
+        return (
+            {name: getattr(self, name) for name in TRACKING_STATE},
+            [(block, replace(block)) for block in distinct.values()],
+            buffered,
+        )
+
+    def _restore_state(self, state: tuple):
+        """Puts the in-memory state back in line with rolled-back writes."""
+        attributes, blocks, buffered = state
+        for block, saved in blocks:
+            block.__dict__.update(vars(saved))
+        for name, value in attributes.items():
+            setattr(self, name, value)
+        self.write_buffer.restore(buffered)
+
+    def next_wakeup_delay(self) -> float:
+        """
+        Seconds until the heartbeat has something to do: the active block's
+        next minute boundary, the idle threshold being crossed, midnight or
+        the write-behind flush deadline. Never more than `interval`.
+        """
+        now = self.clock.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        deadlines = [self.interval, (midnight - now).total_seconds()]
+
+        for due in (
+            self.write_buffer.seconds_until_due(),
+            self.focus.seconds_until_settled(),
+        ):
+            if due is not None:
+                deadlines.append(due)
+
+        if self.is_in_idle_mode and not self.is_manual_break:
+            deadlines.append(IDLE_RETURN_POLL_SECONDS)
+        else:
+            if self.active_block:
+                elapsed = (now - self.active_block.start_time).total_seconds()
+                deadlines.append(60 - elapsed % 60)
+            if not self.is_manual_break:
+                idle_sec = self.idle.idle_seconds()
+                deadlines.append(max(0.0, self.idle_threshold - idle_sec))
+
+        return max(MIN_SLEEP_SECONDS, min(deadlines) + DEADLINE_SLACK_SECONDS)
+
+    def _start_block(
+        self, app_name: str, window_title: str, start_time: datetime | None = None
+    ):
+        """Creates a block in the database and makes it the active block."""
+        if start_time is None:
+            start_time = self.clock.now()
+        # Pending updates of the outgoing block must land before the new row
+        self.write_buffer.flush("transition")
+        block_id = self.db.create_block(app_name, window_title, start_time=start_time)
+        self.previous_block = self.active_block
+        self.active_block = ActiveBlock(block_id, app_name, window_title, start_time)
+
+    def _extend_block(
+        self, block: ActiveBlock | None, end_time: datetime, force: bool = False
+    ):
+        """
+        Extends a block to end_time through the write-behind buffer. force
+        flushes immediately (block is being closed or truncated).
+        """
+        if not block:
+            return None
+        duration = block.duration_until(end_time)
+        self.write_buffer.stage(block, duration, end_time)
+        if force:
+            self.write_buffer.flush("transition")
+        return duration
+
+    def _report_write_stats(self):
+        """Logs database commits per hour so the write-behind effect is visible."""
+        elapsed = self.clock.monotonic() - self._stats_window_start
+        if elapsed < 3600:
+            return
+        commits = self.db.commit_count - self._stats_commit_base
+        flushes = self.write_buffer.flush_count - self._stats_flush_base
+        wakeups = self.wakeup_count - self._stats_wakeup_base
+        events = self.focus.events_received - self._stats_focus_base[0]
+        transitions = self.transition_count - self._stats_focus_base[1]
+        logging.info(
+            f"Write stats: {commits * 3600 / elapsed:.0f} commits/hour "
+            f"({flushes} heartbeat flushes, {self.write_buffer.staged_count} updates staged), "
+            f"{wakeups * 3600 / elapsed:.0f} heartbeat wake-ups/hour, "
+            f"{events} focus events -> {transitions} block transitions"
+        )
+        self._stats_window_start = self.clock.monotonic()
+        self._stats_commit_base = self.db.commit_count
+        self._stats_flush_base = self.write_buffer.flush_count
+        self._stats_wakeup_base = self.wakeup_count
+        self._stats_focus_base = (self.focus.events_received, self.transition_count)
+        self.write_buffer.staged_count = 0
 
     def _handle_midnight_transition(self, now: datetime):
         """Truncates current day data and starts fresh for the new day."""
@@ -96,18 +421,10 @@ class TrackingEngine:
         old_date_str = str(old_date)
 
         # 1. Finalize the current block at exactly 23:59:59 of the old day
-        last_block = self.db.get_last_block()
+        last_block = self.active_block
         if last_block:
             end_of_old_day = datetime.combine(old_date, datetime.max.time())
-            start_time = (
-                datetime.fromisoformat(last_block["start_time"])
-                if isinstance(last_block["start_time"], str)
-                else last_block["start_time"]
-            )
-            duration = max(1, int((end_of_old_day - start_time).total_seconds() / 60))
-            self.db.update_last_block(
-                last_block["id"], duration, end_time=end_of_old_day
-            )
+            self._extend_block(last_block, end_of_old_day, force=True)
 
             # 2. Trigger auto-export for the concluded day
             if self.exporter:
@@ -118,36 +435,33 @@ class TrackingEngine:
 
             # 3. Start a new block at 00:00:00 of the new day
             start_of_new_day = datetime.combine(now.date(), datetime.min.time())
-            self.db.create_block(
-                last_block["app_name"],
-                last_block["window_title"],
+            self._start_block(
+                last_block.app_name,
+                last_block.window_title,
                 start_time=start_of_new_day,
             )
 
         self.last_date = now.date()
         logging.info(f"Day transition complete. New day is {self.last_date}")
 
-    def toggle_manual_break(self):
+    def toggle_manual_break(self) -> bool:
         """Toggles manual break state. Returns True if break started, False if ended."""
-        now = datetime.now()
+        return self._submit(self._toggle_manual_break).result(
+            timeout=COMMAND_TIMEOUT_SECONDS
+        )
+
+    def _toggle_manual_break(self) -> bool:
+        now = self.clock.now()
         if not self.is_manual_break:
             # Start Break
             self.is_manual_break = True
             self.manual_break_start = now
 
             # Finalize current block until now
-            last_block = self.db.get_last_block()
-            if last_block:
-                start_time = (
-                    datetime.fromisoformat(last_block["start_time"])
-                    if isinstance(last_block["start_time"], str)
-                    else last_block["start_time"]
-                )
-                duration = max(1, int((now - start_time).total_seconds() / 60))
-                self.db.update_last_block(last_block["id"], duration, end_time=now)
+            self._extend_block(self.active_block, now, force=True)
 
             # Create a special "Break" block
-            self.db.create_block("Break", "Manual Break Session")
+            self._start_block("Break", "Manual Break Session", start_time=now)
             logging.info("Manual break started.")
             return True
         else:
@@ -155,75 +469,81 @@ class TrackingEngine:
             self.is_manual_break = False
 
             # Finalize the break block
-            last_block = self.db.get_last_block()
-            if last_block and last_block["app_name"] == "Break":
-                start_time = (
-                    datetime.fromisoformat(last_block["start_time"])
-                    if isinstance(last_block["start_time"], str)
-                    else last_block["start_time"]
-                )
-                duration = max(1, int((now - start_time).total_seconds() / 60))
-                self.db.update_last_block(last_block["id"], duration, end_time=now)
+            if self.active_block and self.active_block.app_name == "Break":
+                self._extend_block(self.active_block, now, force=True)
 
             self.manual_break_start = None
 
             # Start tracking current window again
-            info = get_active_window_info()
+            info = self.windows.active_window()
             if info:
-                self.db.create_block(info[0], info[1])
+                self._start_block(info[0], info[1])
 
             logging.info("Manual break ended.")
             return False
 
-    def _on_window_change(self, app_name, window_title):
-        """Called immediately by the Windows Hook signal."""
+    @timed("engine.window_change")
+    def _on_window_change(self, app_name, window_title, at: datetime | None = None):
+        """
+        Applies a foreground change that happened at `at` (default: now):
+        settled hook events, or a change the heartbeat noticed itself.
+        """
         if self.is_manual_break:
             return
 
-        idle_sec = get_idle_duration()
+        idle_sec = self.idle.idle_seconds()
         logging.debug(f"Window Change: {app_name} (Idle: {idle_sec:.1f}s)")
 
         # If we are in idle mode and suddenly return (hook catches it before heartbeat)
         if self.is_in_idle_mode and idle_sec < self.idle_threshold:
             self.is_in_idle_mode = False
-            return_time = datetime.now()
+            return_time = at or self.clock.now()
             logging.info(f"User returned from idle (via Hook) at: {return_time}")
             if self.on_idle_return_callback and self.idle_started_at:
                 self.on_idle_return_callback(self.idle_started_at, return_time)
             self.idle_started_at = None
 
             # Start a new block for the window we returned to
-            self.db.create_block(app_name, window_title)
+            self._start_block(app_name, window_title, start_time=return_time)
             return
 
         # Normal case: check if we should ignore changes during idle
         if idle_sec > self.idle_threshold:
             return
 
-        last_block = self.db.get_last_block()
+        now = at or self.clock.now()
+        last_block = self.active_block
 
         # Feature: Merge short browsing into development
         if (
             self.merge_short_browsing
             and last_block
-            and last_block["duration_minutes"] < 5
+            and self.previous_block
+            and last_block.duration_until(now) < 5
         ):
-            last_cat = self.db.get_app_category(last_block["app_name"])
+            last_cat = self.db.get_app_category(last_block.app_name)
             if last_cat == "Browsing":
-                blocks = self.db.get_recent_blocks(limit=2)
-                if len(blocks) == 2:
-                    prev_cat = self.db.get_app_category(blocks[1]["app_name"])
-                    if prev_cat == "Development":
-                        self.db.merge_last_two_blocks()
-                        last_block = self.db.get_last_block()  # Refresh after merge
-
-        if not last_block or last_block["app_name"] != app_name:
-            self.db.create_block(app_name, window_title)
+                prev_cat = self.db.get_app_category(self.previous_block.app_name)
+                if prev_cat == "Development":
+                    self._extend_block(last_block, now, force=True)
+                    self.db.merge_blocks(self.previous_block.id, last_block.id)
+                    merged = self.previous_block
+                    merged.duration_minutes = merged.duration_until(now)
+                    self.active_block, self.previous_block = merged, None
+                    last_block = merged
+
+        if not last_block or last_block.app_name != app_name:
+            # Close the outgoing block at the moment focus left it
+            self._extend_block(last_block, now, force=True)
+            self._start_block(app_name, window_title, start_time=now)
+            self.transition_count += 1
             logging.info(f"Signal: New block -> {app_name}")
 
+    @timed("engine.heartbeat_tick")
     def _heartbeat_tick(self):
         """Increments duration of the active block or detects return from idle."""
-        now = datetime.now()
+        now = self.clock.now()
+        self._report_write_stats()
 
         # Midnight Watcher: Handle date transitions
         if now.date() != self.last_date:
@@ -235,20 +555,11 @@ class TrackingEngine:
 
         if self.is_manual_break:
             # Just increment the "Break" block duration
-            last_block = self.db.get_last_block()
-            if last_block and last_block["app_name"] == "Break":
-                start_time = (
-                    datetime.fromisoformat(last_block["start_time"])
-                    if isinstance(last_block["start_time"], str)
-                    else last_block["start_time"]
-                )
-                new_duration = max(
-                    1, int((datetime.now() - start_time).total_seconds() / 60)
-                )
-                self.db.update_last_block(last_block["id"], new_duration)
+            if self.active_block and self.active_block.app_name == "Break":
+                self._extend_block(self.active_block, now)
             return
 
-        idle_sec = get_idle_duration()
+        idle_sec = self.idle.idle_seconds()
         logging.debug(
             f"Heartbeat tick (Idle: {idle_sec:.1f}s, Threshold: {self.idle_threshold}s)"
         )
@@ -256,14 +567,17 @@ class TrackingEngine:
         if idle_sec > self.idle_threshold:
             if not self.is_in_idle_mode:
                 self.is_in_idle_mode = True
-                self.idle_started_at = datetime.now() - timedelta(seconds=idle_sec)
+                self.idle_started_at = now - timedelta(seconds=idle_sec)
+                self.idle_block = self.active_block
+                self.write_buffer.flush("idle")
                 logging.info(f"Idle mode entered. Started at: {self.idle_started_at}")
             return
 
-        # Return from idle detection (Heartbeat case)
+        # Return from idle detection (Heartbeat case). Input resumed idle_sec
+        # ago, which may be well before this (slow) poll.
         if self.is_in_idle_mode:
             self.is_in_idle_mode = False
-            return_time = datetime.now()
+            return_time = now - timedelta(seconds=idle_sec)
             logging.info(f"User returned from idle (via Heartbeat) at: {return_time}")
             if self.on_idle_return_callback and self.idle_started_at:
                 self.on_idle_return_callback(self.idle_started_at, return_time)
@@ -271,71 +585,126 @@ class TrackingEngine:
             return
 
         # Normal tracking
-        info = get_active_window_info()
+        info = self.windows.active_window()
         if not info:
             return
 
         app_name, window_title = info
-        last_block = self.db.get_last_block()
+        last_block = self.active_block
 
-        if last_block and last_block["app_name"] == app_name:
+        if last_block and last_block.app_name == app_name:
             # Duration is time from start to now
-            start_time = (
-                datetime.fromisoformat(last_block["start_time"])
-                if isinstance(last_block["start_time"], str)
-                else last_block["start_time"]
-            )
-            new_duration = max(
-                1, int((datetime.now() - start_time).total_seconds() / 60)
-            )
-            self.db.update_last_block(last_block["id"], new_duration)
-            logging.info(f"Heartbeat: {app_name} ({new_duration} min)")
-        else:
+            previous = last_block.duration_minutes
+            new_duration = self._extend_block(last_block, now)
+            if new_duration != previous:
+                logging.info(f"Heartbeat: {app_name} ({new_duration} min)")
+        elif not self.focus.has_pending:
             # This handles cases where focus didn't change but app name might have (rare)
-            # or if we missed an event
+            # or if we missed an event. A pending hook event is still settling.
             self._on_window_change(app_name, window_title)
 
     def handle_idle_decision(
         self, decision: str, idle_start: datetime, idle_end: datetime
-    ):
+    ) -> Future:
         """Processes the user's choice regarding the idle period."""
+        return self._submit(self._handle_idle_decision, decision, idle_start, idle_end)
+
+    @timed("engine.idle_decision")
+    def _handle_idle_decision(
+        self, decision: str, idle_start: datetime, idle_end: datetime
+    ):
+        # The decision applies to the block that was active when idle began,
+        # even if the hook already opened a new block on return.
+        idle_block = self.idle_block or self.active_block
+        self.idle_block = None
+
         if decision == "break":
-            last_block = self.db.get_last_block()
-            if last_block:
-                start_time = (
-                    datetime.fromisoformat(last_block["start_time"])
-                    if isinstance(last_block["start_time"], str)
-                    else last_block["start_time"]
-                )
+            if idle_block:
                 # Calculate duration until the moment idle started
-                duration = max(1, int((idle_start - start_time).total_seconds() / 60))
-                self.db.update_last_block(
-                    last_block["id"], duration, end_time=idle_start
-                )
+                duration = self._extend_block(idle_block, idle_start, force=True)
                 logging.info(
                     f"Idle Decision: Break. Block truncated to {duration} min."
                 )
 
-            # Start a new block for the current active window
-            info = get_active_window_info()
-            if info:
-                self.db.create_block(info[0], info[1])
+            # Start a new block for the current active window, unless the
+            # return from idle already did
+            if self.active_block is idle_block:
+                info = self.windows.active_window()
+                if info:
+                    self._start_block(info[0], info[1])
         else:
             # "work" - Include the idle time in the current block
-            last_block = self.db.get_last_block()
-            if last_block:
-                start_time = (
-                    datetime.fromisoformat(last_block["start_time"])
-                    if isinstance(last_block["start_time"], str)
-                    else last_block["start_time"]
-                )
-                duration = max(1, int((idle_end - start_time).total_seconds() / 60))
-                self.db.update_last_block(last_block["id"], duration, end_time=idle_end)
+            if idle_block:
+                duration = self._extend_block(idle_block, idle_end, force=True)
                 logging.info(f"Idle Decision: Work. Gap included ({duration} min).")
 
+    def delete_block(self, block_id: int):
+        """Deletes a block and drops it from the in-memory state if tracked."""
+        self._submit(self._delete_block, block_id).result(
+            timeout=COMMAND_TIMEOUT_SECONDS
+        )
+
+    def _delete_block(self, block_id: int):
+        self.write_buffer.discard(block_id)
+        self.db.delete_block(block_id)
+        if self.previous_block and self.previous_block.id == block_id:
+            self.previous_block = None
+        if self.active_block and self.active_block.id == block_id:
+            # The next tick or window change opens a fresh block
+            self.active_block = None
+
+    def record_break(self, start_time: datetime, end_time: datetime) -> int:
+        """
+        Marks [start_time, end_time) as a break after the fact: whatever was
+        tracked in that interval is trimmed, split or deleted. Returns the
+        break block's id.
+        """
+        return self._submit(self._record_break, start_time, end_time).result(
+            timeout=COMMAND_TIMEOUT_SECONDS
+        )
+
+    def _record_break(self, start_time: datetime, end_time: datetime) -> int:
+        if end_time > self.clock.now():
+            raise ValueError("A recorded break cannot end in the future")
+        # Carving works on the stored rows, so they must be current
+        self.write_buffer.flush("transition")
+        changes = self.db.carve_interval(start_time, end_time)
+        block_id = self.db.insert_block(
+            "Break", "Manual Break Session", start_time, end_time
+        )
+
+        touched = set(changes["deleted"]) | set(changes["trimmed"])
+        touched |= set(changes["split"])
+        if self.previous_block and self.previous_block.id in touched:
+            # Its stored span changed; don't merge into it
+            self.previous_block = None
+        block = self.active_block
+        if block and block.id in touched:
+            if block.id in changes["split"]:
+                # Keep tracking the part after the break
+                block.id = changes["split"][block.id]
+                block.start_time = end_time
+            elif block.id in changes["trimmed"] and block.start_time >= start_time:
+                block.start_time = end_time
+            else:
+                # Deleted, or cut off at the break's start: start afresh
+                self.active_block = None
+            if self.active_block:
+                block.duration_minutes = block.duration_until(self.clock.now())
+        logging.info(
+            f"Break recorded {start_time:%H:%M}-{end_time:%H:%M}: "
+            f"{len(changes['deleted'])} deleted, {len(changes['trimmed'])} trimmed, "
+            f"{len(changes['split'])} split."
+        )
+        return block_id
+
     def stop(self):
+        """Stops tracking; returns once pending updates are written."""
+        self._submit(self._shutdown).result(timeout=COMMAND_TIMEOUT_SECONDS)
+
+    def _shutdown(self):
         self.is_running = False
         self._stop_event.set()
-        self.observer.stop()
-        # Note: win32gui.PostQuitMessage(0) could be used to stop PumpMessages
+        self.windows.stop()
+        self.write_buffer.flush("shutdown")
         logging.info("Tracking engine stopped.")
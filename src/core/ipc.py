@@ -0,0 +1,332 @@
+import json
+import logging
+import os
+import subprocess
+import threading
+from concurrent.futures import Future
+from multiprocessing.connection import AuthenticationError, Client, Listener
+from src.core.engine import COMMAND_TIMEOUT_SECONDS
+from src.utils.metrics import registry
+
+# Written by the tracker next to the database: where to connect and the key
+ENDPOINT_FILE = "tracker.ipc"
+# Events the dashboard must confirm; until then a lost dashboard means resending
+ACKNOWLEDGED_EVENTS = ("idle_return",)
+
+
+def endpoint_path(db_dir: str) -> str:
+    return os.path.join(db_dir, ENDPOINT_FILE)
+
+
+class TrackerServer:
+    """
+    Tracker side of the local channel between the tracker process and an
+    on-demand dashboard process. Data itself is shared through the WAL
+    database; this only carries commands that must run on the engine's
+    writer (idle decisions, breaks, deletes, settings and category reloads)
+    and events for the dashboard ("show", "idle_return", "quit").
+
+    Listens on 127.0.0.1 with a random key that only the current user can
+    read (it lives in their AppData), so other local users cannot connect.
+
+    The subscribed dashboard's connection is read on its own thread, so a
+    dashboard that unsubscribes or dies is noticed right away instead of by
+    a later send. on_dashboard_gone(events_waiting) is then called;
+    unacknowledged events are put back for the next dashboard.
+    """
+
+    def __init__(self, engine, db_dir: str):
+        self.engine = engine
+        self.path = endpoint_path(db_dir)
+        self._authkey = os.urandom(32)
+        self._listener = None
+        self._lock = threading.Lock()
+        self._events = None  # Connection of the subscribed dashboard
+        self._pending: list[tuple] = []  # Events waiting for a dashboard
+        self._unacked: list[tuple] = []  # Sent, not yet confirmed
+        self.on_dashboard_gone = None
+        self._received = registry.counter("ipc.requests")
+        self._commands = {
+            "ping": lambda: os.getpid(),
+            "metrics": registry.snapshot,
+            "idle_decision": lambda decision, start, end: (
+                self.engine.handle_idle_decision(decision, start, end).result(
+                    timeout=COMMAND_TIMEOUT_SECONDS
+                )
+            ),
+            "toggle_break": lambda: self.engine.toggle_manual_break(),
+            "record_break": lambda start, end: self.engine.record_break(start, end),
+            "delete_block": lambda block_id: self.engine.delete_block(block_id),
+            "reload_settings": lambda: self.engine.reload_settings().result(
+                timeout=COMMAND_TIMEOUT_SECONDS
+            ),
+            "invalidate_categories": lambda: self.engine.invalidate_categories().result(
+                timeout=COMMAND_TIMEOUT_SECONDS
+            ),
+        }
+
+    def start(self):
+        self._listener = Listener(("127.0.0.1", 0), authkey=self._authkey)
+        host, port = self._listener.address
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"port": port, "authkey": self._authkey.hex()}, f)
+        os.replace(tmp_path, self.path)
+        threading.Thread(target=self._accept_loop, name="ipc", daemon=True).start()
+        logging.info(f"Tracker IPC listening on {host}:{port}")
+
+    def stop(self):
+        """Tells a connected dashboard to quit and closes the channel."""
+        self.send_event("quit")
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.close()
+        with self._lock:
+            if self._events is not None:
+                self._events.close()
+                self._events = None
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def send_event(self, *event) -> bool:
+        """Sends an event to the dashboard if one is connected."""
+        with self._lock:
+            return self._send_locked(event)
+
+    def post_event(self, *event) -> bool:
+        """
+        Like send_event, but keeps the event for the next dashboard to
+        connect when none is. False means a dashboard should be started.
+        """
+        with self._lock:
+            if self._send_locked(event):
+                return True
+            self._pending.append(event)
+            return False
+
+    def _send_locked(self, event) -> bool:
+        if self._events is None:
+            return False
+        try:
+            self._events.send(event)
+        except OSError:
+            # The dashboard went away
+            self._disconnect_locked()
+            return False
+        if event[0] in ACKNOWLEDGED_EVENTS:
+            self._unacked.append(event)
+        return True
+
+    def _disconnect_locked(self):
+        """Drops the subscription; unconfirmed events wait for the next one."""
+        self._events.close()
+        self._events = None
+        self._pending[:0], self._unacked = self._unacked, []
+
+    def _accept_loop(self):
+        while self._listener is not None:
+            try:
+                conn = self._listener.accept()
+            except AuthenticationError:
+                logging.warning("Rejected IPC connection with a wrong key")
+                continue
+            except OSError:
+                return  # Listener closed by stop()
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        """Answers one client's requests until it disconnects."""
+        try:
+            while True:
+                command, *args = conn.recv()
+                self._received.inc()
+                if command == "subscribe":
+                    self._subscribe(conn)
+                    self._watch_subscription(conn)
+                    return  # The connection now carries events
+                handler = self._commands.get(command)
+                try:
+                    if handler is None:
+                        raise ValueError(f"Unknown command: {command}")
+                    conn.send(("ok", handler(*args)))
+                except Exception as e:
+                    logging.error(f"IPC command {command} failed: {e}")
+                    conn.send(("error", f"{type(e).__name__}: {e}"))
+        except (EOFError, OSError):
+            pass
+        conn.close()
+
+    def _subscribe(self, conn):
+        with self._lock:
+            if self._events is not None:
+                # A newer dashboard replaces the old one
+                self._disconnect_locked()
+            self._events = conn
+            pending, self._pending = self._pending, []
+            for i, event in enumerate(pending):
+                if not self._send_locked(event):
+                    self._pending[:0] = pending[i:]
+                    break
+
+    def _watch_subscription(self, conn):
+        """Reads acks from the dashboard until it unsubscribes or goes away."""
+        try:
+            while True:
+                command, *event = conn.recv()
+                if command == "ack":
+                    with self._lock:
+                        if tuple(event) in self._unacked:
+                            self._unacked.remove(tuple(event))
+                elif command == "unsubscribe":
+                    break
+        except (EOFError, OSError):
+            pass
+        with self._lock:
+            if self._events is not conn:
+                return  # Replaced by a newer dashboard, or stopped
+            self._disconnect_locked()
+            events_waiting = bool(self._pending)
+        if self.on_dashboard_gone is not None:
+            self.on_dashboard_gone(events_waiting)
+
+
+class TrackerClient:
+    """
+    Dashboard side: the engine methods the dashboard calls, forwarded to
+    the tracker process. Futures are returned already completed, matching
+    the in-process engine's signatures.
+    """
+
+    def __init__(self, db_dir: str):
+        with open(endpoint_path(db_dir), encoding="utf-8") as f:
+            endpoint = json.load(f)
+        self.address = ("127.0.0.1", endpoint["port"])
+        self._authkey = bytes.fromhex(endpoint["authkey"])
+        self._events = None
+        self._events_lock = threading.Lock()
+
+    def _call(self, command: str, *args):
+        with Client(self.address, authkey=self._authkey) as conn:
+            conn.send((command, *args))
+            status, result = conn.recv()
+        if status == "error":
+            raise RuntimeError(f"Tracker: {result}")
+        return result
+
+    def _call_future(self, command: str, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(self._call(command, *args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def ping(self) -> int:
+        """The tracker's process id; raises if it is not reachable."""
+        return self._call("ping")
+
+    def metrics_snapshot(self) -> dict:
+        """The tracker process's metrics (see src.utils.metrics)."""
+        return self._call("metrics")
+
+    def handle_idle_decision(self, decision, idle_start, idle_end) -> Future:
+        return self._call_future("idle_decision", decision, idle_start, idle_end)
+
+    def toggle_manual_break(self) -> bool:
+        return self._call("toggle_break")
+
+    def record_break(self, start_time, end_time) -> int:
+        return self._call("record_break", start_time, end_time)
+
+    def delete_block(self, block_id: int):
+        return self._call("delete_block", block_id)
+
+    def reload_settings(self) -> Future:
+        return self._call_future("reload_settings")
+
+    def invalidate_categories(self) -> Future:
+        return self._call_future("invalidate_categories")
+
+    def listen(self, on_event):
+        """
+        Receives tracker events on a background thread and calls
+        on_event(name, *args) for each. A lost tracker arrives as "quit".
+        """
+        conn = Client(self.address, authkey=self._authkey)
+        conn.send(("subscribe",))
+        self._events = conn
+
+        def receive():
+            try:
+                while True:
+                    event = conn.recv()
+                    on_event(*event)
+                    if event[0] == "quit":
+                        return
+            except (EOFError, OSError):
+                on_event("quit")
+            finally:
+                conn.close()
+
+        threading.Thread(target=receive, name="ipc-events", daemon=True).start()
+
+    def acknowledge(self, *event):
+        """Confirms an event from ACKNOWLEDGED_EVENTS has been handled."""
+        self._reply(("ack", *event))
+
+    def unsubscribe(self):
+        """Stops events before exiting, so none is sent to a closing process."""
+        self._reply(("unsubscribe",))
+
+    def _reply(self, message):
+        with self._events_lock:
+            if self._events is None:
+                return
+            try:
+                self._events.send(message)
+            except OSError:
+                pass  # The tracker went away; listen() reports it as "quit"
+
+
+class DashboardLauncher:
+    """Starts the dashboard process on demand and stops it on exit."""
+
+    def __init__(self, command: list[str]):
+        self.command = command
+        self.process = None
+        self._exiting: list[subprocess.Popen] = []
+        self._lock = threading.Lock()
+
+    def running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def ensure_running(self):
+        with self._lock:
+            if not self.running():
+                self.process = subprocess.Popen(self.command)
+                logging.info(f"Dashboard process started (pid {self.process.pid}).")
+
+    def detach(self):
+        """
+        Forgets a dashboard that has left the tracker, so ensure_running
+        starts a new one instead of waiting for it to finish exiting.
+        """
+        with self._lock:
+            self._exiting = [p for p in self._exiting if p.poll() is None]
+            if self.process is not None:
+                self._exiting.append(self.process)
+                self.process = None
+
+    def stop(self, timeout: float = 5.0):
+        """Waits for dashboards told to quit; terminates any that hang."""
+        with self._lock:
+            processes = [p for p in (self.process, *self._exiting) if p is not None]
+        for process in processes:
+            if process.poll() is not None:
+                continue
+            try:
+                process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                process.terminate()
@@ -0,0 +1,288 @@
+import heapq
+import json
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Iterable
+from src.db.manager import DatabaseManager
+from src.core.engine import TrackingEngine
+from src.core.sources import Clock, IdleSource, WindowSource
+
+
+@dataclass
+class TraceEvent:
+    """
+    One entry of a replay trace. `at` is seconds since the trace start.
+      - kind "focus": the foreground window became app_name / window_title
+      - kind "idle": no user input from `at` for `duration` seconds
+    Traces are stored as JSON lines, one event per line.
+    """
+
+    at: float
+    kind: str
+    app_name: str = ""
+    window_title: str = ""
+    duration: float = 0.0
+
+
+def load_trace(path: str) -> list[TraceEvent]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [TraceEvent(**json.loads(line)) for line in f if line.strip()]
+
+
+def save_trace(trace: Iterable[TraceEvent], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        for event in trace:
+            f.write(json.dumps(asdict(event)) + "\n")
+
+
+SYNTHETIC_APPS = [
+    ("code.exe", "engine.py - Time Reporter - Visual Studio Code"),
+    ("chrome.exe", "sqlite3 - Python documentation - Google Chrome"),
+    ("slack.exe", "Slack | general"),
+    ("explorer.exe", "File Explorer"),
+    ("WindowsTerminal.exe", "Windows PowerShell"),
+    ("spotify.exe", "Spotify Premium"),
+]
+
+
+def synthetic_trace(
+    hours: float = 8,
+    seed: int = 0,
+    idle_every_minutes: float = 90,
+    burst_probability: float = 0.15,
+) -> list[TraceEvent]:
+    """
+    A workday of focus changes with occasional idle periods and alt-tab
+    storms (deterministic per seed).
+    """
+    rng = random.Random(seed)
+    trace = []
+    t = 0.0
+    end = hours * 3600
+    while t < end:
+        if rng.random() < burst_probability:
+            # Alt-tab storm: a few sub-second flips before focus settles
+            for _ in range(rng.randint(2, 8)):
+                trace.append(TraceEvent(t, "focus", *rng.choice(SYNTHETIC_APPS)))
+                t += rng.uniform(0.1, 0.6)
+        app_name, window_title = rng.choice(SYNTHETIC_APPS)
+        trace.append(TraceEvent(t, "focus", app_name, window_title))
+        # Mostly short switches, sometimes long focused stretches
+        dwell = (
+            rng.expovariate(1 / 45) if rng.random() < 0.8 else rng.uniform(300, 1800)
+        )
+        if rng.random() < dwell / (idle_every_minutes * 60):
+            idle_at = t + rng.uniform(0, dwell)
+            trace.append(TraceEvent(idle_at, "idle", duration=rng.uniform(360, 1200)))
+            dwell = trace[-1].at + trace[-1].duration - t + 1
+        t += max(1.0, dwell)
+    return trace
+
+
+class VirtualClock(Clock):
+    def __init__(self, start: datetime):
+        self.start = start
+        self.elapsed = 0.0
+
+    def now(self) -> datetime:
+        return self.start + timedelta(seconds=self.elapsed)
+
+    def monotonic(self) -> float:
+        return self.elapsed
+
+    def advance_to(self, elapsed: float):
+        self.elapsed = max(self.elapsed, elapsed)
+
+
+class ReplayWindowSource(WindowSource):
+    """Foreground window set by the replay; changes are delivered by the harness."""
+
+    def __init__(self):
+        self.current: tuple[str, str] | None = None
+
+    def active_window(self) -> tuple[str, str] | None:
+        return self.current
+
+    def run(self, on_change: Callable[[str, str], None]):
+        pass
+
+
+class ReplayIdleSource(IdleSource):
+    def __init__(self, clock: VirtualClock):
+        self.clock = clock
+        self.idle_since: float | None = None
+
+    def idle_seconds(self) -> float:
+        if self.idle_since is None:
+            return 0.0
+        return self.clock.monotonic() - self.idle_since
+
+
+@dataclass
+class ReplayResult:
+    focus_events: int = 0
+    transitions: int = 0
+    idle_periods: int = 0
+    ticks: int = 0
+    elapsed_seconds: float = 0.0
+    virtual_seconds: float = 0.0
+    statements: int = 0
+    commits: int = 0
+    blocks: list[dict] = field(default_factory=list)
+
+    @property
+    def events(self) -> int:
+        """Engine callbacks delivered: focus changes, idle transitions and ticks."""
+        return self.focus_events + 2 * self.idle_periods + self.ticks
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def wakeups_per_hour(self) -> float:
+        return self.ticks * 3600 / self.virtual_seconds if self.virtual_seconds else 0.0
+
+    @property
+    def statements_per_event(self) -> float:
+        return self.statements / self.events if self.events else 0.0
+
+
+class ReplayHarness:
+    """
+    Drives the real TrackingEngine through a trace on a virtual clock,
+    without threads, hooks or a desktop session. Heartbeats follow the
+    engine's deadline scheduler, or fire every `tick_interval` virtual
+    seconds when one is given (the old fixed loop without focus coalescing,
+    for comparison).
+    Idle-return popups are answered with `idle_decision` ("work" or "break")
+    right after the event that raised them.
+    """
+
+    # Event ordering for equal timestamps: input resumes, focus, idle
+    _IDLE_END, _FOCUS, _IDLE_START = range(3)
+
+    def __init__(
+        self,
+        db: DatabaseManager,
+        start: datetime = datetime(2024, 1, 8, 9, 0),
+        tick_interval: int | None = None,
+        idle_decision: str = "work",
+    ):
+        self.db = db
+        self.tick_interval = tick_interval
+        self.idle_decision = idle_decision
+        self.clock = VirtualClock(start)
+        self.windows = ReplayWindowSource()
+        self.idle = ReplayIdleSource(self.clock)
+        self.engine = TrackingEngine(
+            db,
+            window_source=self.windows,
+            idle_source=self.idle,
+            clock=self.clock,
+        )
+        self.engine.on_idle_return_callback = self._on_idle_return
+        if tick_interval:
+            # The old loop handled every hook event immediately
+            self.engine.focus.settle_seconds = 0
+        self._decisions: list[tuple[datetime, datetime]] = []
+
+    def _on_idle_return(self, idle_start: datetime, idle_end: datetime):
+        # The real popup answers asynchronously, after the callback returns
+        self._decisions.append((idle_start, idle_end))
+
+    def _timeline(self, trace: list[TraceEvent]):
+        heap = []
+        for event in trace:
+            if event.kind == "focus":
+                heap.append((event.at, self._FOCUS, len(heap), event))
+            elif event.kind == "idle":
+                heap.append((event.at, self._IDLE_START, len(heap), event))
+                heap.append(
+                    (event.at + event.duration, self._IDLE_END, len(heap), event)
+                )
+            else:
+                raise ValueError(f"Unknown trace event kind: {event.kind}")
+        heapq.heapify(heap)
+        return heap
+
+    def run(self, trace: list[TraceEvent]) -> ReplayResult:
+        result = ReplayResult()
+        heap = self._timeline(trace)
+        end = max((entry[0] for entry in heap), default=0.0)
+
+        conn = self.db._get_connection()
+        statements = []
+
+        def trace(sql):
+            # Each trigger program re-reports the statement that fired it
+            if not statements or statements[-1] != sql:
+                statements.append(sql)
+
+        conn.set_trace_callback(trace)
+        commits_before = self.db.commit_count
+        started = time.perf_counter()
+        try:
+            self.engine.is_running = True
+            self.engine.reconcile_active_block()
+            next_tick = self._next_tick()
+            while heap or next_tick <= end:
+                if heap and heap[0][0] <= next_tick:
+                    at, kind, _, event = heapq.heappop(heap)
+                    self.clock.advance_to(at)
+                    self._apply(kind, event, result)
+                    if not self.tick_interval:
+                        # The writer recomputes its deadline after every command
+                        next_tick = self._next_tick()
+                else:
+                    self.clock.advance_to(next_tick)
+                    self.engine._apply_settled_focus()
+                    self.engine._heartbeat_tick()
+                    result.ticks += 1
+                    next_tick = self._next_tick(next_tick)
+                while self._decisions:
+                    idle_start, idle_end = self._decisions.pop(0)
+                    self.engine.handle_idle_decision(
+                        self.idle_decision, idle_start, idle_end
+                    )
+            # Let a change still settling at the end of the trace land
+            self.clock.advance_to(
+                self.clock.monotonic() + self.engine.focus.settle_seconds
+            )
+            self.engine._apply_settled_focus()
+            self.engine.stop()
+        finally:
+            result.elapsed_seconds = time.perf_counter() - started
+            result.virtual_seconds = self.clock.monotonic()
+            conn.set_trace_callback(None)
+
+        result.transitions = self.engine.transition_count
+        result.statements = len(statements)
+        result.commits = self.db.commit_count - commits_before
+        result.blocks = [
+            dict(row)
+            for row in self.db.iter_blocks_with_category(
+                self.clock.start.strftime("%Y-%m-%d"),
+                self.clock.now().strftime("%Y-%m-%d"),
+            )
+        ]
+        return result
+
+    def _next_tick(self, previous: float = 0.0) -> float:
+        if self.tick_interval:
+            return previous + self.tick_interval
+        return self.clock.monotonic() + self.engine.next_wakeup_delay()
+
+    def _apply(self, kind: int, event: TraceEvent, result: ReplayResult):
+        if kind == self._FOCUS:
+            self.windows.current = (event.app_name, event.window_title)
+            self.engine._on_focus_event(event.app_name, event.window_title)
+            result.focus_events += 1
+        elif kind == self._IDLE_START:
+            self.idle.idle_since = self.clock.monotonic()
+            result.idle_periods += 1
+        else:
+            # Input resumes; the next tick or focus change notices the return
+            self.idle.idle_since = None
@@ -0,0 +1,81 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable
+
+
+class Clock(ABC):
+    """Wall-clock and monotonic time as seen by the engine."""
+
+    @abstractmethod
+    def now(self) -> datetime:
+        """Current local time."""
+
+    @abstractmethod
+    def monotonic(self) -> float:
+        """Seconds from an arbitrary point; never goes backwards."""
+
+
+class WindowSource(ABC):
+    """Foreground window information and focus change notifications."""
+
+    @abstractmethod
+    def active_window(self) -> tuple[str, str] | None:
+        """Current (app_name, window_title), or None if unavailable."""
+
+    @abstractmethod
+    def run(self, on_change: Callable[[str, str], None]):
+        """Blocks delivering focus changes to on_change until stop()."""
+
+    def stop(self):
+        pass
+
+
+class IdleSource(ABC):
+    """Seconds since the user's last keyboard/mouse input."""
+
+    @abstractmethod
+    def idle_seconds(self) -> float:
+        """Seconds since the last input."""
+
+
+class SystemClock(Clock):
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+
+class Win32WindowSource(WindowSource):
+    """Foreground hook and polling through win32gui (imported on first use)."""
+
+    def __init__(self):
+        self.observer = None
+
+    def active_window(self) -> tuple[str, str] | None:
+        from src.core.tracker import get_active_window_info
+
+        return get_active_window_info()
+
+    def run(self, on_change: Callable[[str, str], None]):
+        import win32gui
+        from src.core.tracker import WindowEventObserver
+
+        self.observer = WindowEventObserver(on_change)
+        if self.observer.start():
+            logging.info("Windows Event Hook active.")
+            win32gui.PumpMessages()
+
+    def stop(self):
+        if self.observer:
+            self.observer.stop()
+        # Note: win32gui.PostQuitMessage(0) could be used to stop PumpMessages
+
+
+class Win32IdleSource(IdleSource):
+    def idle_seconds(self) -> float:
+        from src.utils.idle import get_idle_duration
+
+        return get_idle_duration()
@@ -6,13 +6,35 @@ import ctypes.wintypes
 import psutil
 import pywintypes
 import logging
+import threading
+from collections import OrderedDict
+from src.utils.metrics import registry
 
 # Windows constants for events
 EVENT_SYSTEM_FOREGROUND = 0x0003
 WINEVENT_OUTOFCONTEXT = 0x0000
 
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
 # Function prototypes for WinAPI
 user32 = ctypes.windll.user32
+kernel32 = ctypes.windll.kernel32
+kernel32.OpenProcess.restype = ctypes.wintypes.HANDLE
+kernel32.OpenProcess.argtypes = (
+    ctypes.wintypes.DWORD,
+    ctypes.wintypes.BOOL,
+    ctypes.wintypes.DWORD,
+)
+kernel32.GetProcessTimes.restype = ctypes.wintypes.BOOL
+kernel32.GetProcessTimes.argtypes = (
+    ctypes.wintypes.HANDLE,
+    ctypes.POINTER(ctypes.wintypes.FILETIME),
+    ctypes.POINTER(ctypes.wintypes.FILETIME),
+    ctypes.POINTER(ctypes.wintypes.FILETIME),
+    ctypes.POINTER(ctypes.wintypes.FILETIME),
+)
+kernel32.CloseHandle.restype = ctypes.wintypes.BOOL
+kernel32.CloseHandle.argtypes = (ctypes.wintypes.HANDLE,)
 WinEventProcType = ctypes.WINFUNCTYPE(
     None,
     ctypes.wintypes.HANDLE,
@@ -25,6 +47,82 @@ WinEventProcType = ctypes.WINFUNCTYPE(
 )
 
 
+def get_process_create_time(pid: int) -> int | float | None:
+    """
+    Creation time of a process, used to tell a reused PID apart. A cheap
+    GetProcessTimes call; psutil only when the process can't be opened.
+    """
+    handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if handle:
+        try:
+            creation, exit_time, kernel_time, user_time = (
+                ctypes.wintypes.FILETIME() for _ in range(4)
+            )
+            if kernel32.GetProcessTimes(
+                handle,
+                ctypes.byref(creation),
+                ctypes.byref(exit_time),
+                ctypes.byref(kernel_time),
+                ctypes.byref(user_time),
+            ):
+                return (creation.dwHighDateTime << 32) | creation.dwLowDateTime
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        return psutil.Process(pid).create_time()
+    except psutil.Error:
+        return None
+
+
+class ProcessNameCache:
+    """
+    Bounded LRU of process names keyed by (pid, create time), so a reused
+    PID is a miss instead of a wrong name.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._names: OrderedDict[tuple, str] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, cache: OrderedDict, key, value):
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > self.max_size:
+            cache.popitem(last=False)
+
+    def name(self, pid: int) -> str:
+        key = (pid, get_process_create_time(pid))
+        with self._lock:
+            name = self._names.get(key)
+            if name is not None:
+                self._names.move_to_end(key)
+                self.hits += 1
+                return name
+            self.misses += 1
+
+        name = psutil.Process(pid).name()
+        if key[1] is not None:
+            with self._lock:
+                self._remember(self._names, key, name)
+        return name
+
+
+process_names = ProcessNameCache()
+
+# ((hwnd, thread id, pid), app_name) of the last foreground window seen by
+# the poller. Handles of destroyed windows are reused, so the owner is
+# re-read (a cheap user32 call) rather than trusting the hwnd alone.
+_last_foreground: tuple[tuple, str] | None = None
+fast_path_count = 0
+
+registry.gauge("tracker.process_name_hits", lambda: process_names.hits)
+registry.gauge("tracker.process_name_misses", lambda: process_names.misses)
+registry.gauge("tracker.foreground_fast_path", lambda: fast_path_count)
+
+
 def get_window_info(hwnd):
     """Helper to get info from a specific HWND"""
     try:
@@ -33,8 +131,7 @@ def get_window_info(hwnd):
 
         window_title = win32gui.GetWindowText(hwnd)
         _, pid = win32process.GetWindowThreadProcessId(hwnd)
-        process = psutil.Process(pid)
-        app_name = process.name()
+        app_name = process_names.name(pid)
         return app_name, window_title
     except Exception as e:
         logging.debug(f"Could not get window info for {hwnd}: {e}")
@@ -43,8 +140,27 @@ def get_window_info(hwnd):
 
 def get_active_window_info() -> tuple[str, str] | None:
     """Current active window info (polling fallback)"""
+    global _last_foreground, fast_path_count
     hwnd = win32gui.GetForegroundWindow()
-    return get_window_info(hwnd)
+    if not hwnd or not win32gui.IsWindow(hwnd):
+        _last_foreground = None
+        return None
+    try:
+        owner = (hwnd, *win32process.GetWindowThreadProcessId(hwnd))
+    except pywintypes.error:
+        _last_foreground = None
+        return None
+
+    # Same window of the same owner as the last poll: only the title can
+    # have changed
+    last = _last_foreground
+    if last and owner == last[0]:
+        fast_path_count += 1
+        return last[1], win32gui.GetWindowText(hwnd)
+
+    info = get_window_info(hwnd)
+    _last_foreground = (owner, info[0]) if info else None
+    return info
 
 
 class WindowEventObserver:
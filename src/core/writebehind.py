@@ -0,0 +1,99 @@
+import logging
+import threading
+from datetime import datetime
+from src.db.manager import DatabaseManager
+from src.core.sources import Clock, SystemClock
+
+
+class WriteBehindBuffer:
+    """
+    Coalesces heartbeat duration/end_time updates in memory and writes them
+    to the database according to a flush policy:
+      - flush_on_change: write as soon as a block's minute duration changes
+      - max_data_loss_seconds: never keep an update unflushed longer than this
+      - flush(): explicit flushes on transitions, breaks, idle and shutdown
+    """
+
+    def __init__(
+        self,
+        db_manager: DatabaseManager,
+        max_data_loss_seconds: int = 60,
+        flush_on_change: bool = True,
+        clock: Clock | None = None,
+    ):
+        self.db = db_manager
+        self.clock = clock or SystemClock()
+        self.max_data_loss_seconds = max_data_loss_seconds
+        self.flush_on_change = flush_on_change
+        self._lock = threading.Lock()
+        # block id -> (block, duration_minutes, end_time)
+        self._pending: dict[int, tuple] = {}
+        self._oldest_pending_at: float | None = None
+        self.staged_count = 0
+        self.flush_count = 0
+
+    def configure(self, max_data_loss_seconds: int, flush_on_change: bool):
+        with self._lock:
+            self.max_data_loss_seconds = max(1, max_data_loss_seconds)
+            self.flush_on_change = flush_on_change
+
+    def stage(self, block, duration: int, end_time: datetime):
+        """
+        Records the latest duration/end_time of a block. `block` is the
+        engine's ActiveBlock; its duration_minutes holds the last value
+        written. Returns True if the update was flushed immediately.
+        """
+        now = self.clock.monotonic()
+        with self._lock:
+            self._pending[block.id] = (block, duration, end_time)
+            self.staged_count += 1
+            if self._oldest_pending_at is None:
+                self._oldest_pending_at = now
+            due = (self.flush_on_change and duration != block.duration_minutes) or (
+                now - self._oldest_pending_at >= self.max_data_loss_seconds
+            )
+        if due:
+            self.flush("policy")
+        return due
+
+    def discard(self, block_id: int):
+        """Drops a pending update (e.g. the block was deleted)."""
+        with self._lock:
+            self._pending.pop(block_id, None)
+            if not self._pending:
+                self._oldest_pending_at = None
+
+    def snapshot(self) -> tuple:
+        """Pending updates, to restore() after their transaction rolled back."""
+        with self._lock:
+            return dict(self._pending), self._oldest_pending_at
+
+    def restore(self, state: tuple):
+        pending, oldest_pending_at = state
+        with self._lock:
+            self._pending = dict(pending)
+            self._oldest_pending_at = oldest_pending_at
+
+    def seconds_until_due(self) -> float | None:
+        """Time left before the loss-window deadline, or None if nothing is pending."""
+        with self._lock:
+            if self._oldest_pending_at is None:
+                return None
+            elapsed = self.clock.monotonic() - self._oldest_pending_at
+            return max(0.0, self.max_data_loss_seconds - elapsed)
+
+    def flush(self, reason: str = "manual") -> int:
+        """Writes every pending update. Returns the number of blocks written."""
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+            self._oldest_pending_at = None
+
+        for block, duration, end_time in pending:
+            self.db.update_last_block(block.id, duration, end_time=end_time)
+            block.duration_minutes = duration
+
+        if pending:
+            self.flush_count += 1
+            logging.debug(f"Write-behind flush ({reason}): {len(pending)} block(s)")
+        return len(pending)
@@ -0,0 +1,222 @@
+import logging
+import os
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ARCHIVE_FILE_PATTERN = re.compile(r"^blocks-(\d{4}-\d{2})\.db$")
+
+# Same normalized layout as the live database, plus the month's own rollup.
+# No triggers: an archive file is written once and then only read.
+ARCHIVE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS apps (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS titles (
+        id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS blocks (
+        id INTEGER PRIMARY KEY,
+        app_id INTEGER NOT NULL,
+        title_id INTEGER,
+        start_ts INTEGER NOT NULL,
+        end_ts INTEGER NOT NULL,
+        duration_minutes INTEGER DEFAULT 1
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS daily_app_usage (
+        day TEXT NOT NULL,
+        app_name TEXT NOT NULL,
+        minutes INTEGER NOT NULL DEFAULT 0,
+        block_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, app_name)
+    ) WITHOUT ROWID
+    """,
+)
+
+
+def month_end(month: str) -> str:
+    """Last day (YYYY-MM-DD) of month (YYYY-MM)."""
+    first = datetime.strptime(f"{month}-01", "%Y-%m-%d")
+    following = (first + timedelta(days=32)).replace(day=1)
+    return (following - timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+class ArchiveStore:
+    """
+    Cold tier: one compact SQLite file per closed month under
+    <data dir>/archive. DatabaseManager moves old months here during
+    maintenance and reads them back, a month at a time, only when a
+    requested range reaches into them.
+    """
+
+    def __init__(self, archive_dir: str, live_db_path: str):
+        self.archive_dir = archive_dir
+        self.live_db_path = live_db_path
+        self._months: list[str] = []
+        self._months_stamp = None
+
+    def path_for(self, month: str) -> str:
+        return os.path.join(self.archive_dir, f"blocks-{month}.db")
+
+    def months(self) -> list[str]:
+        """Archived months (YYYY-MM), oldest first."""
+        try:
+            # Adding a file (ours or another process's) bumps the mtime
+            stamp = os.stat(self.archive_dir).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        if stamp != self._months_stamp:
+            months = []
+            for name in os.listdir(self.archive_dir):
+                match = ARCHIVE_FILE_PATTERN.match(name)
+                if match:
+                    months.append(match.group(1))
+            self._months = sorted(months)
+            self._months_stamp = stamp
+        return self._months
+
+    def overlaps(self, start_date: str, end_date: str) -> bool:
+        """True if any archived month falls inside start_date..end_date."""
+        return any(start_date[:7] <= month <= end_date[:7] for month in self.months())
+
+    def partitions(self, start_date: str, end_date: str) -> list[tuple]:
+        """
+        Splits start_date..end_date (inclusive) into consecutive
+        (month, first_day, last_day) runs. month is the archived month
+        serving that run, or None where the live database does.
+        """
+        archived = set(self.months())
+        if not any(start_date[:7] <= month <= end_date[:7] for month in archived):
+            return [(None, start_date, end_date)]
+
+        runs = []
+        day = start_date
+        while day <= end_date:
+            month = day[:7]
+            last_day = min(end_date, month_end(month))
+            source = month if month in archived else None
+            if source is None and runs and runs[-1][0] is None:
+                runs[-1] = (None, runs[-1][1], last_day)
+            else:
+                runs.append((source, day, last_day))
+            day = (
+                datetime.strptime(last_day, "%Y-%m-%d") + timedelta(days=1)
+            ).strftime("%Y-%m-%d")
+        return runs
+
+    def connect(self, month: str) -> sqlite3.Connection:
+        """Read-only connection to one archived month."""
+        uri = Path(self.path_for(month)).absolute().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def write_month(self, month: str, start_ts: int, end_ts: int) -> int:
+        """
+        Copies the live blocks of month (start_ts <= start < end_ts) into its
+        archive file and rebuilds the file's rollup. Only reads the live
+        database, so the tracker is never blocked. A new file is built
+        under a temporary name and renamed into place once complete;
+        re-running for an existing month adds whatever is still missing.
+        Returns the number of blocks the archive holds for the month.
+        """
+        os.makedirs(self.archive_dir, exist_ok=True)
+        final_path = self.path_for(month)
+        exists = os.path.exists(final_path)
+        path = final_path if exists else final_path + ".tmp"
+        if not exists and os.path.exists(path):
+            os.remove(path)  # Left over from an interrupted run
+
+        live_uri = Path(self.live_db_path).absolute().as_uri() + "?mode=ro"
+        # URI filenames on so the ATTACH below can open the live file read-only
+        conn = sqlite3.connect(Path(path).absolute().as_uri(), uri=True)
+        try:
+            conn.execute("ATTACH DATABASE ? AS live", (live_uri,))
+            with conn:
+                for statement in ARCHIVE_SCHEMA:
+                    conn.execute(statement)
+                conn.execute(
+                    """
+                    INSERT OR IGNORE INTO apps (name)
+                    SELECT DISTINCT a.name FROM live.blocks b
+                    JOIN live.apps a ON a.id = b.app_id
+                    WHERE b.start_ts >= ? AND b.start_ts < ?
+                    """,
+                    (start_ts, end_ts),
+                )
+                conn.execute(
+                    """
+                    INSERT OR IGNORE INTO titles (title)
+                    SELECT DISTINCT t.title FROM live.blocks b
+                    JOIN live.titles t ON t.id = b.title_id
+                    WHERE b.start_ts >= ? AND b.start_ts < ?
+                    """,
+                    (start_ts, end_ts),
+                )
+                # Block ids are kept, so a repeated run refreshes rows that
+                # changed since instead of duplicating them
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO blocks
+                        (id, app_id, title_id, start_ts, end_ts, duration_minutes)
+                    SELECT b.id, aa.id, at.id, b.start_ts, b.end_ts, b.duration_minutes
+                    FROM live.blocks b
+                    JOIN live.apps a ON a.id = b.app_id
+                    JOIN apps aa ON aa.name = a.name
+                    LEFT JOIN live.titles t ON t.id = b.title_id
+                    LEFT JOIN titles at ON at.title = t.title
+                    WHERE b.start_ts >= ? AND b.start_ts < ?
+                    """,
+                    (start_ts, end_ts),
+                )
+                conn.execute("DELETE FROM daily_app_usage")
+                conn.execute("""
+                    INSERT INTO daily_app_usage (day, app_name, minutes, block_count)
+                    SELECT date(b.start_ts, 'unixepoch', 'localtime'), a.name,
+                           SUM(COALESCE(b.duration_minutes, 0)), COUNT(*)
+                    FROM blocks b JOIN apps a ON a.id = b.app_id
+                    GROUP BY 1, 2
+                    """)
+                missing = conn.execute(
+                    """
+                    SELECT COUNT(*) FROM live.blocks b
+                    WHERE b.start_ts >= ? AND b.start_ts < ?
+                      AND NOT EXISTS (SELECT 1 FROM blocks x WHERE x.id = b.id)
+                    """,
+                    (start_ts, end_ts),
+                ).fetchone()[0]
+                if missing:
+                    raise RuntimeError(f"{missing} block(s) of {month} not archived")
+            conn.execute("DETACH DATABASE live")
+            conn.execute("VACUUM")
+            archived = conn.execute("SELECT COUNT(*) FROM blocks").fetchone()[0]
+        finally:
+            conn.close()
+
+        if not exists:
+            os.replace(path, final_path)
+        logging.info(
+            f"Archived {archived} block(s) of {month} "
+            f"({os.path.getsize(final_path) / 1024:.0f} KB)"
+        )
+        return archived
+
+    def archived_rows(self, month: str) -> list[tuple]:
+        """(id, start_ts, end_ts, duration_minutes) of every archived block of month."""
+        conn = self.connect(month)
+        try:
+            return conn.execute(
+                "SELECT id, start_ts, end_ts, duration_minutes FROM blocks ORDER BY id"
+            ).fetchall()
+        finally:
+            conn.close()
@@ -0,0 +1,77 @@
+import threading
+from typing import Callable
+
+DEFAULT_CATEGORY = "Uncategorized"
+
+
+class CategoryResolver:
+    """
+    In-process cache of the app -> category mapping and the category list.
+
+    Loaded lazily with one query each, then served from dicts. A single
+    instance is shared by every thread through DatabaseManager, whose write
+    methods keep it up to date; invalidate() forces a reload.
+    """
+
+    def __init__(
+        self,
+        load_mappings: Callable[[], dict],
+        load_categories: Callable[[], list[str]],
+    ):
+        self._load_mappings = load_mappings
+        self._load_categories = load_categories
+        self._lock = threading.Lock()
+        self._mappings: dict[str, str] | None = None
+        self._categories: list[str] | None = None
+        self.load_count = 0
+
+    def _ensure_mappings(self) -> dict[str, str]:
+        mappings = self._mappings
+        if mappings is None:
+            with self._lock:
+                if self._mappings is None:
+                    self._mappings = self._load_mappings()
+                    self.load_count += 1
+                mappings = self._mappings
+        return mappings
+
+    def resolve(self, app_name: str) -> str:
+        return self._ensure_mappings().get(app_name, DEFAULT_CATEGORY)
+
+    def all_mappings(self) -> dict[str, str]:
+        return dict(self._ensure_mappings())
+
+    def categories(self) -> list[str]:
+        categories = self._categories
+        if categories is None:
+            with self._lock:
+                if self._categories is None:
+                    self._categories = self._load_categories()
+                categories = self._categories
+        return list(categories)
+
+    def set_mapping(self, app_name: str, category: str):
+        with self._lock:
+            if self._mappings is not None:
+                # Copy-on-write so readers never see a dict being mutated
+                self._mappings = {**self._mappings, app_name: category}
+
+    def category_added(self, name: str):
+        with self._lock:
+            if self._categories is not None and name not in self._categories:
+                self._categories = sorted([*self._categories, name])
+
+    def category_deleted(self, name: str):
+        with self._lock:
+            if self._categories is not None:
+                self._categories = [c for c in self._categories if c != name]
+            if self._mappings is not None:
+                self._mappings = {
+                    app: (DEFAULT_CATEGORY if cat == name else cat)
+                    for app, cat in self._mappings.items()
+                }
+
+    def invalidate(self):
+        with self._lock:
+            self._mappings = None
+            self._categories = None
@@ -0,0 +1,93 @@
+import logging
+import threading
+import time
+
+# First run waits until startup has settled, then repeats a few times a day
+FIRST_RUN_DELAY_SECONDS = 120
+RUN_INTERVAL_SECONDS = 6 * 3600
+# Gap between retention chunks / vacuum steps so the tracker can take the lock
+CHUNK_PAUSE_SECONDS = 0.05
+VACUUM_STEP_PAGES = 256
+
+
+class MaintenanceWorker:
+    """
+    Background database housekeeping: moves months past the retention
+    window to the archive (deleting them from the live file in small
+    transactions), hands freed pages back to the OS with incremental
+    vacuum and refreshes planner statistics. Nothing here runs on the
+    startup path.
+    """
+
+    def __init__(
+        self,
+        db,
+        first_delay: float = FIRST_RUN_DELAY_SECONDS,
+        interval: float = RUN_INTERVAL_SECONDS,
+        pause: float = CHUNK_PAUSE_SECONDS,
+    ):
+        self.db = db
+        self.first_delay = first_delay
+        self.interval = interval
+        self.pause = pause
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.last_run: dict | None = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="db-maintenance", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Interrupts a run between chunks and waits for the thread to exit."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        if self._stop_event.wait(self.first_delay):
+            return
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                logging.error(f"Database maintenance failed: {e}")
+            if self._stop_event.wait(self.interval):
+                return
+
+    def _yield(self) -> bool:
+        """Sleeps between chunks; False once a stop was requested."""
+        return not self._stop_event.wait(self.pause)
+
+    def run_once(self) -> dict:
+        started = time.perf_counter()
+        size_before = self.db.get_database_size()
+
+        days = int(self.db.get_setting("db_cleanup_days", "30"))
+        rows = self.db.archive_old_data(days=days, between_chunks=self._yield)
+        titles = self.db.purge_unused_titles() if rows else 0
+
+        self.db.enable_incremental_vacuum()
+        pages = 0
+        while not self._stop_event.is_set():
+            freed = self.db.reclaim_space(VACUUM_STEP_PAGES)
+            pages += freed
+            if freed < VACUUM_STEP_PAGES or not self._yield():
+                break
+        self.db.optimize()
+
+        reclaimed = max(0, size_before - self.db.get_database_size())
+        self.last_run = {
+            "rows_archived": rows,
+            "titles_deleted": titles,
+            "pages_freed": pages,
+            "bytes_reclaimed": reclaimed,
+            "seconds": time.perf_counter() - started,
+        }
+        logging.info(
+            f"Database maintenance: {rows} old rows archived, {titles} unused titles deleted, "
+            f"{reclaimed / 1024:.0f} KB reclaimed in {self.last_run['seconds']:.2f}s"
+        )
+        return self.last_run
@@ -2,255 +2,659 @@ import sqlite3
 from datetime import datetime, timedelta
 import os
 import logging
-
-
+import threading
+from collections import defaultdict
+from contextlib import closing, contextmanager
+from pathlib import Path
+from src.db.archive import ArchiveStore, month_end
+from src.db.categories import CategoryResolver
+from src.db.migrations import (
+    LATEST_VERSION,
+    apply_migrations,
+    read_schema_version,
+    rebuild_daily_app_usage,
+)
+from src.utils.metrics import instrument_methods
+
+# Hot-path statements are kept as constants so every call hits the same entry
+# in sqlite3's per-connection prepared statement cache.
+SQL_GET_SETTING = "SELECT value FROM settings WHERE key = ?"
+# Blocks are stored normalized (see migrations._normalized_blocks); reads go
+# through the activity_blocks view, writes straight to the blocks table.
+# Newest by start time: a break recorded after the fact gets the highest id
+# but is not the block in progress
+SQL_GET_LAST_BLOCK = (
+    "SELECT * FROM activity_blocks ORDER BY start_ts DESC, id DESC LIMIT 1"
+)
+SQL_GET_RECENT_BLOCKS = (
+    "SELECT * FROM activity_blocks ORDER BY start_ts DESC, id DESC LIMIT ?"
+)
+SQL_GET_APP_ID = "SELECT id FROM apps WHERE name = ?"
+SQL_ADD_APP = "INSERT INTO apps (name) VALUES (?)"
+SQL_GET_TITLE_ID = "SELECT id FROM titles WHERE title = ?"
+SQL_ADD_TITLE = "INSERT INTO titles (title) VALUES (?)"
+SQL_ROLLUP_RANGE = """
+    SELECT day, app_name, minutes FROM daily_app_usage WHERE day >= ? AND day < ?
+"""
+SQL_BLOCK_SPANS = """
+    SELECT start_ts, end_ts, app_id FROM blocks
+    WHERE start_ts >= ? AND start_ts < ?
+    ORDER BY start_ts
+"""
+SQL_CREATE_BLOCK = """
+    INSERT INTO blocks (app_id, title_id, start_ts, end_ts, duration_minutes)
+    VALUES (?, ?, ?, ?, 1)
+"""
+SQL_UPDATE_BLOCK = "UPDATE blocks SET end_ts = ?, duration_minutes = ? WHERE id = ?"
+SQL_DELETE_BLOCK = "DELETE FROM blocks WHERE id = ?"
+SQL_GET_BLOCK_SPAN = "SELECT start_ts, end_ts FROM blocks WHERE id = ?"
+# Blocks overlapping [a, b): the R*Tree yields the candidate ids on its own
+# (its float bounds are rounded outwards), the rowid lookups on blocks redo
+# the exact check. Joining the two instead lets the planner add a Bloom
+# filter on blocks, which scans the whole table whenever there is a hit.
+SQL_OVERLAPPING_IDS = """
+    SELECT id FROM blocks
+    WHERE id IN (
+        SELECT id FROM block_intervals WHERE start_ts < :end AND end_ts > :start
+    )
+      AND start_ts < :end AND end_ts > :start
+"""
+SQL_OVERLAPPING_IDS_FALLBACK = """
+    SELECT id FROM blocks WHERE start_ts < :end AND end_ts > :start
+"""
+
+# Pragmas applied once per connection when it is opened.
+CONNECTION_PRAGMAS = (
+    # Must precede journal_mode, which creates the file. Only a brand-new
+    # database picks it up; older ones are converted by background
+    # maintenance (enable_incremental_vacuum).
+    "PRAGMA auto_vacuum=INCREMENTAL",
+    "PRAGMA journal_mode=WAL",  # Daha iyi performans ve eşzamanlılık
+    "PRAGMA synchronous=NORMAL",  # WAL ile güvenli, commit başına fsync yok
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=67108864",  # 64 MB
+    "PRAGMA cache_size=-8000",  # ~8 MB page cache
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA journal_size_limit=1048576",  # Shrink the WAL back after bursts (retention)
+)
+# Read-only connections (reporting CLI) only get the read-side pragmas
+READ_ONLY_PRAGMAS = (
+    "PRAGMA query_only=ON",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=67108864",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA busy_timeout=5000",
+)
+STATEMENT_CACHE_SIZE = 64
+# Rows deleted per retention transaction
+RETENTION_CHUNK_SIZE = 500
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class BlockOverlapError(ValueError):
+    """A write would overlap existing blocks (kept in .blocks)."""
+
+    def __init__(self, blocks: list[dict]):
+        self.blocks = blocks
+        ids = ", ".join(str(b["id"]) for b in blocks)
+        super().__init__(f"Interval overlaps existing block(s): {ids}")
+
+
+def to_datetime(value: datetime | str) -> datetime:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def to_epoch(value: datetime | str) -> int:
+    """Epoch seconds for a naive local timestamp."""
+    return int(to_datetime(value).timestamp())
+
+
+def span_minutes(start_ts: int, end_ts: int) -> int:
+    """Whole minutes between two epochs, at least 1 (block duration rule)."""
+    return max(1, int((end_ts - start_ts) / 60))
+
+
+def day_start_epoch(date_str: str) -> int:
+    """Epoch seconds of local midnight at the start of date_str (YYYY-MM-DD)."""
+    return int(datetime.strptime(date_str, "%Y-%m-%d").timestamp())
+
+
+def next_day(date_str: str) -> str:
+    return (datetime.strptime(date_str, "%Y-%m-%d") + timedelta(days=1)).strftime(
+        "%Y-%m-%d"
+    )
+
+
+# batch/savepoint are context managers: calling them only creates the manager
+@instrument_methods("db", exclude=("batch", "savepoint"))
 class DatabaseManager:
-    def __init__(self, db_name: str = "time_reporter.db"):
+    def __init__(self, db_name: str = "time_reporter.db", read_only: bool = False):
         # Profesyonel yaklaşım: Verileri AppData altında sakla
         app_data = os.getenv("APPDATA") or os.path.expanduser("~")
         self.db_dir = os.path.join(app_data, "TimeReporter")
+        # read_only: mode=ro connections that never write or migrate, so
+        # reporting never contends with the tracker for the write lock
+        self.read_only = read_only
 
-        if not os.path.exists(self.db_dir):
+        self.db_path = os.path.join(self.db_dir, db_name)
+        if read_only:
+            if not os.path.exists(self.db_path):
+                raise FileNotFoundError(f"No database at {self.db_path}")
+        elif not os.path.exists(self.db_dir):
             os.makedirs(self.db_dir)
+        # Closed months moved out of the live file (see archive_old_data)
+        self.archive = ArchiveStore(
+            os.path.join(self.db_dir, "archive", os.path.splitext(db_name)[0]),
+            self.db_path,
+        )
 
-        self.db_path = os.path.join(self.db_dir, db_name)
+        # One long-lived connection per thread (hook, heartbeat, tray, Tk).
+        self._connections: dict[int, sqlite3.Connection] = {}
+        self._connections_lock = threading.Lock()
+        self._local = threading.local()  # Per-thread batch() nesting depth
+        self.commit_count = 0
+        self.categories = CategoryResolver(
+            self._load_app_categories, self._load_categories
+        )
         self._init_db()
 
-    def _get_connection(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA journal_mode=WAL")  # Daha iyi performans ve eşzamanlılık
+    def _open_connection(self) -> sqlite3.Connection:
+        # check_same_thread is off only so close() can release every
+        # connection from the shutdown thread; each one is otherwise used by
+        # the thread that opened it.
+        target, pragmas = self.db_path, CONNECTION_PRAGMAS
+        if self.read_only:
+            target = Path(self.db_path).absolute().as_uri() + "?mode=ro"
+            pragmas = READ_ONLY_PRAGMAS
+        conn = sqlite3.connect(
+            target,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            uri=self.read_only,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in pragmas:
+            conn.execute(pragma)
         return conn
 
-    def _init_db(self):
+    def _get_connection(self) -> sqlite3.Connection:
+        """Returns the calling thread's persistent connection."""
+        thread_id = threading.get_ident()
+        conn = self._connections.get(thread_id)
+        if conn is None:
+            conn = self._open_connection()
+            with self._connections_lock:
+                self._connections[thread_id] = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        """Transaction on the calling thread's connection; counts successful commits."""
         conn = self._get_connection()
+        if getattr(self._local, "batch_depth", 0):
+            # Part of an enclosing batch(), which commits
+            yield conn
+            return
+        with conn:
+            # Take the write lock up front: lookups made before the first
+            # write (e.g. interning a title) must not race maintenance.
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+        with self._connections_lock:
+            self.commit_count += 1
+
+    @contextmanager
+    def batch(self):
+        """
+        Runs every _write() of the calling thread inside one transaction,
+        committed when the outermost batch exits (rolled back on error).
+        """
+        conn = self._get_connection()
+        depth = getattr(self._local, "batch_depth", 0)
+        self._local.batch_depth = depth + 1
         try:
-            with conn:
-                # Activity blocks table
-                conn.execute("""
-                    CREATE TABLE IF NOT EXISTS activity_blocks (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        app_name TEXT NOT NULL,
-                        window_title TEXT,
-                        start_time DATETIME NOT NULL,
-                        end_time DATETIME NOT NULL,
-                        duration_minutes INTEGER DEFAULT 1
-                    )
-                """)
-
-                # Categories table
-                conn.execute("""
-                    CREATE TABLE IF NOT EXISTS categories (
-                        name TEXT PRIMARY KEY
-                    )
-                """)
-
-                # Add default categories
-                default_categories = [
-                    ("Development",),
-                    ("Browsing",),
-                    ("Entertainment",),
-                    ("Social",),
-                    ("System",),
-                    ("Work",),
-                    ("Education",),
-                    ("Uncategorized",),
-                ]
-                conn.executemany(
-                    "INSERT OR IGNORE INTO categories (name) VALUES (?)",
-                    default_categories,
-                )
+            if depth:
+                yield conn
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+            with self._connections_lock:
+                self.commit_count += 1
+        finally:
+            self._local.batch_depth = depth
 
-                # App categories mapping table
-                conn.execute("""
-                    CREATE TABLE IF NOT EXISTS app_categories (
-                        app_name TEXT PRIMARY KEY,
-                        category TEXT NOT NULL
-                    )
-                """)
-
-                # Add some default mappings
-                default_mappings = [
-                    ("code.exe", "Development"),
-                    ("pycharm64.exe", "Development"),
-                    ("chrome.exe", "Browsing"),
-                    ("msedge.exe", "Browsing"),
-                    ("vlc.exe", "Entertainment"),
-                    ("spotify.exe", "Entertainment"),
-                    ("discord.exe", "Social"),
-                    ("slack.exe", "Social"),
-                    ("cmd.exe", "System"),
-                    ("powershell.exe", "System"),
-                    ("explorer.exe", "System"),
-                ]
-                conn.executemany(
-                    "INSERT OR IGNORE INTO app_categories (app_name, category) VALUES (?, ?)",
-                    default_mappings,
-                )
+    @contextmanager
+    def savepoint(self, name: str = "command"):
+        """Nested step of a batch(): its writes are undone alone on error."""
+        conn = self._get_connection()
+        conn.execute(f"SAVEPOINT {name}")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute(f"ROLLBACK TO {name}")
+            conn.execute(f"RELEASE {name}")
+            raise
+        conn.execute(f"RELEASE {name}")
+
+    def close(self):
+        """Closes every pooled connection. Safe to call more than once."""
+        with self._connections_lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+
+        for i, conn in enumerate(connections):
+            try:
+                if i == 0 and not self.read_only:
+                    conn.execute("PRAGMA optimize")
+                conn.close()
+            except sqlite3.Error as e:
+                logging.error(f"Failed to close database connection: {e}")
+        if connections:
+            logging.info(f"Database closed ({len(connections)} connection(s)).")
 
-                # Settings table
-                conn.execute("""
-                    CREATE TABLE IF NOT EXISTS settings (
-                        key TEXT PRIMARY KEY,
-                        value TEXT NOT NULL
-                    )
-                """)
-
-                # Add default settings
-                default_settings = [
-                    ("idle_threshold", "300"),
-                    ("db_cleanup_days", "30"),
-                    ("export_on_exit", "True"),
-                    ("merge_short_browsing", "False"),
-                ]
-                conn.executemany(
-                    "INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)",
-                    default_settings,
+    def _init_db(self):
+        conn = self._get_connection()
+        if self.read_only:
+            version = read_schema_version(conn)
+            if version < LATEST_VERSION:
+                raise RuntimeError(
+                    f"Database schema is at version {version}, expected "
+                    f"{LATEST_VERSION}; start Time Reporter once to upgrade it"
                 )
-        finally:
-            conn.close()
+        else:
+            apply_migrations(conn)
+        self.has_interval_index = (
+            conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'block_intervals'"
+            ).fetchone()
+            is not None
+        )
 
     def get_setting(self, key: str, default: str = "") -> str:
         conn = self._get_connection()
-        try:
-            cursor = conn.execute("SELECT value FROM settings WHERE key = ?", (key,))
-            row = cursor.fetchone()
-            return row[0] if row else default
-        finally:
-            conn.close()
+        cursor = conn.execute(SQL_GET_SETTING, (key,))
+        row = cursor.fetchone()
+        return row[0] if row else default
 
     def set_setting(self, key: str, value: str):
-        conn = self._get_connection()
-        try:
-            with conn:
-                conn.execute(
-                    "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
-                    (key, str(value)),
-                )
-        finally:
-            conn.close()
+        with self._write() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                (key, str(value)),
+            )
 
-    def cleanup_old_data(self, days: int = 30):
+    def cleanup_old_data(
+        self,
+        days: int = 30,
+        chunk_size: int = RETENTION_CHUNK_SIZE,
+        between_chunks=None,
+    ) -> int:
+        """Permanently deletes blocks that started before the retention window."""
         cutoff_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        total = self.delete_blocks_between(
+            None, day_start_epoch(cutoff_date), chunk_size, between_chunks
+        )
+        if total > 0:
+            logging.info(f"Cleaned up {total} records older than {cutoff_date}")
+        return total
+
+    def delete_blocks_between(
+        self,
+        start_ts: int | None,
+        end_ts: int,
+        chunk_size: int = RETENTION_CHUNK_SIZE,
+        between_chunks=None,
+    ) -> int:
+        """
+        Deletes blocks with start_ts <= start < end_ts (no lower bound when
+        start_ts is None), chunk_size rows per transaction so the write lock
+        is only ever held briefly. between_chunks() is called after every
+        full chunk; returning False stops early. Returns the rows deleted.
+        """
+        lower = -1 if start_ts is None else start_ts
+        total = 0
+        while True:
+            with self._write() as conn:
+                count = conn.execute(
+                    """
+                    DELETE FROM blocks WHERE id IN (
+                        SELECT id FROM blocks WHERE start_ts >= ? AND start_ts < ?
+                        ORDER BY start_ts LIMIT ?
+                    )
+                    """,
+                    (lower, end_ts, chunk_size),
+                ).rowcount
+            total += count
+            if count < chunk_size:
+                break
+            if between_chunks is not None and between_chunks() is False:
+                break
+        return total
+
+    def delete_archived_blocks(
+        self,
+        rows: list[tuple],
+        chunk_size: int = RETENTION_CHUNK_SIZE,
+        between_chunks=None,
+    ) -> int:
+        """
+        Deletes the live blocks that still match rows of
+        (id, start_ts, end_ts, duration_minutes), chunk_size rows per
+        transaction. between_chunks() works as in delete_blocks_between.
+        Returns the rows deleted.
+        """
+        total = 0
+        for i in range(0, len(rows), chunk_size):
+            with self._write() as conn:
+                total += conn.executemany(
+                    """
+                    DELETE FROM blocks
+                    WHERE id = ? AND start_ts = ? AND end_ts = ?
+                      AND duration_minutes IS ?
+                    """,
+                    rows[i : i + chunk_size],
+                ).rowcount
+            if i + chunk_size >= len(rows):
+                break
+            if between_chunks is not None and between_chunks() is False:
+                break
+        return total
+
+    def archive_old_data(self, days: int = 30, between_chunks=None) -> int:
+        """
+        Moves every closed month that ended before the retention window
+        into its archive file, then deletes it from the live database in
+        small chunks. Returns the number of blocks moved.
+
+        Only blocks still identical to their archived copy are deleted: one
+        inserted or changed (e.g. by carving) after the copy stays live and
+        is archived by the next run.
+        """
+        cutoff_month = (datetime.now() - timedelta(days=days)).strftime("%Y-%m")
         conn = self._get_connection()
-        try:
-            with conn:
-                cursor = conn.execute(
-                    "DELETE FROM activity_blocks WHERE date(start_time) < ?",
-                    (cutoff_date,),
+        months = [
+            row[0]
+            for row in conn.execute(
+                """
+                SELECT DISTINCT strftime('%Y-%m', start_ts, 'unixepoch', 'localtime')
+                FROM blocks WHERE start_ts < ?
+                """,
+                (day_start_epoch(f"{cutoff_month}-01"),),
+            )
+        ]
+
+        moved = 0
+        for month in sorted(months):
+            start_ts = day_start_epoch(f"{month}-01")
+            end_ts = day_start_epoch(next_day(month_end(month)))
+            # The archive is complete before anything is deleted here, and
+            # readers already prefer it for this month once it exists.
+            self.archive.write_month(month, start_ts, end_ts)
+            moved += self.delete_archived_blocks(
+                self.archive.archived_rows(month), between_chunks=between_chunks
+            )
+            if between_chunks is not None and between_chunks() is False:
+                break
+        return moved
+
+    def purge_unused_titles(self) -> int:
+        """
+        Drops window titles no block refers to any more (left behind by
+        retention). One pass over blocks, so it belongs in maintenance.
+        """
+        with self._write() as conn:
+            return conn.execute("""
+                DELETE FROM titles WHERE id NOT IN (
+                    SELECT title_id FROM blocks WHERE title_id IS NOT NULL
                 )
-                count = cursor.rowcount
-                if count > 0:
-                    logging.info(f"Cleaned up {count} records older than {cutoff_date}")
-                return count
-        finally:
-            conn.close()
+            """).rowcount
+
+    def get_database_size(self) -> int:
+        """Bytes in use by the main database file (WAL excluded)."""
+        conn = self._get_connection()
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return page_count * page_size
+
+    def enable_incremental_vacuum(self) -> bool:
+        """
+        Switches a database created without auto_vacuum to INCREMENTAL. That
+        needs one full VACUUM, so it is only done from background
+        maintenance. Returns True if the file was rebuilt.
+        """
+        conn = self._get_connection()
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+            return False
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+        logging.info("Database rebuilt with incremental auto-vacuum")
+        return True
+
+    def reclaim_space(self, max_pages: int) -> int:
+        """Returns up to max_pages free pages to the OS; returns how many were freed."""
+        conn = self._get_connection()
+        before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if before == 0:
+            return 0
+        # execute() steps a result-less statement once, which frees a single
+        # page; executescript() runs it to completion.
+        conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages)});")
+        return before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    def optimize(self):
+        """Refreshes planner statistics and folds the WAL back into the file."""
+        conn = self._get_connection()
+        conn.execute("PRAGMA optimize")
+        conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
 
     def get_categories(self) -> list[str]:
+        return self.categories.categories()
+
+    def _load_categories(self) -> list[str]:
         conn = self._get_connection()
-        try:
-            cursor = conn.execute("SELECT name FROM categories ORDER BY name ASC")
-            return [row[0] for row in cursor.fetchall()]
-        finally:
-            conn.close()
+        cursor = conn.execute("SELECT name FROM categories ORDER BY name ASC")
+        return [row[0] for row in cursor.fetchall()]
 
     def add_category(self, name: str):
-        conn = self._get_connection()
-        try:
-            with conn:
-                conn.execute(
-                    "INSERT OR IGNORE INTO categories (name) VALUES (?)", (name,)
-                )
-                logging.info(f"Category added to DB: {name}")
-        finally:
-            conn.close()
+        with self._write() as conn:
+            conn.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", (name,))
+            logging.info(f"Category added to DB: {name}")
+        self.categories.category_added(name)
 
     def delete_category(self, name: str):
         if name == "Uncategorized":
             return False
-        conn = self._get_connection()
-        try:
-            with conn:
-                conn.execute(
-                    "UPDATE app_categories SET category = 'Uncategorized' WHERE category = ?",
-                    (name,),
-                )
-                conn.execute("DELETE FROM categories WHERE name = ?", (name,))
-                logging.info(f"Category deleted from DB: {name}")
-            return True
-        finally:
-            conn.close()
+        with self._write() as conn:
+            conn.execute(
+                "UPDATE app_categories SET category = 'Uncategorized' WHERE category = ?",
+                (name,),
+            )
+            conn.execute("DELETE FROM categories WHERE name = ?", (name,))
+            logging.info(f"Category deleted from DB: {name}")
+        self.categories.category_deleted(name)
+        return True
 
     def set_app_category(self, app_name: str, category: str):
-        conn = self._get_connection()
-        try:
-            with conn:
-                conn.execute(
-                    "INSERT OR REPLACE INTO app_categories (app_name, category) VALUES (?, ?)",
-                    (app_name, category),
-                )
-                logging.info(f"Mapping saved: {app_name} -> {category}")
-        finally:
-            conn.close()
+        with self._write() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO app_categories (app_name, category) VALUES (?, ?)",
+                (app_name, category),
+            )
+            logging.info(f"Mapping saved: {app_name} -> {category}")
+        self.categories.set_mapping(app_name, category)
 
     def get_app_category(self, app_name: str) -> str:
-        conn = self._get_connection()
-        try:
-            cursor = conn.execute(
-                "SELECT category FROM app_categories WHERE app_name = ?", (app_name,)
-            )
-            row = cursor.fetchone()
-            return row[0] if row else "Uncategorized"
-        finally:
-            conn.close()
+        """Served from the in-process CategoryResolver cache."""
+        return self.categories.resolve(app_name)
 
     def get_all_app_categories(self) -> dict:
+        return self.categories.all_mappings()
+
+    def _load_app_categories(self) -> dict:
         conn = self._get_connection()
-        try:
-            cursor = conn.execute("SELECT app_name, category FROM app_categories")
-            return {row[0]: row[1] for row in cursor.fetchall()}
-        finally:
-            conn.close()
+        cursor = conn.execute("SELECT app_name, category FROM app_categories")
+        return {row[0]: row[1] for row in cursor.fetchall()}
+
+    def get_known_apps(self) -> list[str]:
+        """Distinct app names with recorded activity (read from the rollup)."""
+        conn = self._get_connection()
+        cursor = conn.execute(
+            "SELECT DISTINCT app_name FROM daily_app_usage ORDER BY app_name"
+        )
+        return [row[0] for row in cursor.fetchall()]
 
     def get_last_block(self) -> dict | None:
         conn = self._get_connection()
-        conn.row_factory = sqlite3.Row
-        try:
-            cursor = conn.execute(
-                "SELECT * FROM activity_blocks ORDER BY id DESC LIMIT 1"
-            )
-            row = cursor.fetchone()
-            return dict(row) if row else None
-        finally:
-            conn.close()
+        cursor = conn.execute(SQL_GET_LAST_BLOCK)
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    @staticmethod
+    def _intern(conn: sqlite3.Connection, select_sql: str, insert_sql: str, value):
+        """Id of value in a dictionary table (apps/titles), added if new."""
+        if value is None:
+            return None
+        row = conn.execute(select_sql, (value,)).fetchone()
+        if row:
+            return row[0]
+        return conn.execute(insert_sql, (value,)).lastrowid
 
     def create_block(
         self, app_name: str, window_title: str, start_time: datetime | None = None
-    ):
+    ) -> int:
+        """Inserts a new block and returns its id."""
         if start_time is None:
             start_time = datetime.now()
+        with self._write() as conn:
+            start_ts = to_epoch(start_time)
+            cursor = conn.execute(
+                SQL_CREATE_BLOCK,
+                (
+                    self._intern(conn, SQL_GET_APP_ID, SQL_ADD_APP, app_name),
+                    self._intern(conn, SQL_GET_TITLE_ID, SQL_ADD_TITLE, window_title),
+                    start_ts,
+                    start_ts,
+                ),
+            )
+        return cursor.lastrowid
+
+    def get_data_version(self) -> tuple:
+        """
+        Cheap change marker for polling readers: the newest block id plus
+        SQLite's data_version (bumped by commits from other connections) and
+        this connection's own total_changes.
+        """
         conn = self._get_connection()
-        try:
-            with conn:
-                conn.execute(
-                    """
-                    INSERT INTO activity_blocks (app_name, window_title, start_time, end_time, duration_minutes)
-                    VALUES (?, ?, ?, ?, ?)
-                    """,
-                    (app_name, window_title, start_time, start_time, 1),
-                )
-        finally:
-            conn.close()
+        max_id = conn.execute("SELECT MAX(id) FROM blocks").fetchone()[0]
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        return (max_id, data_version, conn.total_changes)
 
     def get_recent_blocks(self, limit: int = 20) -> list[dict]:
         conn = self._get_connection()
-        conn.row_factory = sqlite3.Row
-        try:
+        cursor = conn.execute(SQL_GET_RECENT_BLOCKS, (limit,))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def iter_blocks_with_category(self, start_date: str, end_date: str):
+        """
+        Yields blocks starting between start_date and end_date (inclusive,
+        YYYY-MM-DD) in chronological order, each joined with its category.
+        Rows are streamed from the cursor, so memory use is constant.
+        Archived months in the range are read from their archive files.
+        """
+        for month, first_day, last_day in self.archive.partitions(start_date, end_date):
+            if month is None:
+                yield from self._iter_live_blocks(first_day, last_day)
+            else:
+                yield from self._iter_archived_blocks(month, first_day, last_day)
+
+    def _iter_live_blocks(self, start_date: str, end_date: str):
+        conn = self._get_connection()
+        cursor = conn.execute(
+            """
+            SELECT b.id, a.name AS app_name, t.title AS window_title,
+                   datetime(b.start_ts, 'unixepoch', 'localtime') AS start_time,
+                   datetime(b.end_ts, 'unixepoch', 'localtime') AS end_time,
+                   b.duration_minutes,
+                   date(b.start_ts, 'unixepoch', 'localtime') AS day,
+                   b.start_ts, b.end_ts,
+                   COALESCE(ac.category, 'Uncategorized') as category
+            FROM blocks b
+            JOIN apps a ON a.id = b.app_id
+            LEFT JOIN titles t ON t.id = b.title_id
+            LEFT JOIN app_categories ac ON a.name = ac.app_name
+            WHERE b.start_ts >= ? AND b.start_ts < ?
+            ORDER BY b.start_ts ASC
+            """,
+            (day_start_epoch(start_date), day_start_epoch(next_day(end_date))),
+        )
+        yield from cursor
+
+    def _iter_archived_blocks(self, month: str, start_date: str, end_date: str):
+        # Same row shape as _iter_live_blocks; categories are current ones
+        with closing(self.archive.connect(month)) as conn:
             cursor = conn.execute(
-                "SELECT * FROM activity_blocks ORDER BY id DESC LIMIT ?", (limit,)
+                """
+                SELECT b.id, a.name AS app_name, t.title AS window_title,
+                       datetime(b.start_ts, 'unixepoch', 'localtime') AS start_time,
+                       datetime(b.end_ts, 'unixepoch', 'localtime') AS end_time,
+                       b.duration_minutes,
+                       date(b.start_ts, 'unixepoch', 'localtime') AS day,
+                       b.start_ts, b.end_ts
+                FROM blocks b
+                JOIN apps a ON a.id = b.app_id
+                LEFT JOIN titles t ON t.id = b.title_id
+                WHERE b.start_ts >= ? AND b.start_ts < ?
+                ORDER BY b.start_ts ASC
+                """,
+                (day_start_epoch(start_date), day_start_epoch(next_day(end_date))),
             )
-            return [dict(row) for row in cursor.fetchall()]
-        finally:
-            conn.close()
+            for row in cursor:
+                block = dict(row)
+                block["category"] = self.categories.resolve(block["app_name"])
+                yield block
+
+    def iter_block_spans(self, start_date: str, end_date: str):
+        """
+        Bulk form of the range for analytics: yields one
+        ({app_id: app_name}, [(start_ts, end_ts, app_id), ...]) pair per
+        storage partition (live database or archived month). App ids are
+        only meaningful within their own pair.
+        """
+        for month, first_day, last_day in self.archive.partitions(start_date, end_date):
+            args = (day_start_epoch(first_day), day_start_epoch(next_day(last_day)))
+            if month is None:
+                yield self._block_spans(self._get_connection(), args)
+            else:
+                with closing(self.archive.connect(month)) as conn:
+                    yield self._block_spans(conn, args)
+
+    @staticmethod
+    def _block_spans(conn: sqlite3.Connection, args: tuple) -> tuple[dict, list]:
+        cursor = conn.cursor()
+        cursor.row_factory = None  # Plain tuples, straight into NumPy
+        apps = dict(cursor.execute("SELECT id, name FROM apps").fetchall())
+        return apps, cursor.execute(SQL_BLOCK_SPANS, args).fetchall()
+
+    def _iter_rollup(self, start_date: str, end_date: str):
+        """(day, app_name, minutes) rollup rows of the range, live and archived."""
+        for month, first_day, last_day in self.archive.partitions(start_date, end_date):
+            args = (first_day, next_day(last_day))
+            if month is None:
+                yield from self._get_connection().execute(SQL_ROLLUP_RANGE, args)
+            else:
+                with closing(self.archive.connect(month)) as conn:
+                    yield from conn.execute(SQL_ROLLUP_RANGE, args).fetchall()
+
+    def _sum_rollup(self, start_date: str, end_date: str, key) -> dict:
+        totals = defaultdict(int)
+        for day, app_name, minutes in self._iter_rollup(start_date, end_date):
+            totals[key(day, app_name)] += minutes
+        return totals
 
     def get_app_usage_stats(
         self, start_date: str | None = None, end_date: str | None = None
@@ -260,24 +664,32 @@ class DatabaseManager:
         if not end_date:
             end_date = start_date
 
+        if self.archive.overlaps(start_date, end_date):
+            totals = self._sum_rollup(start_date, end_date, lambda day, app: app)
+            stats = [
+                {
+                    "app_name": app_name,
+                    "total_duration": minutes,
+                    "category": self.categories.resolve(app_name),
+                }
+                for app_name, minutes in totals.items()
+            ]
+            return sorted(stats, key=lambda s: s["total_duration"], reverse=True)
+
         conn = self._get_connection()
-        conn.row_factory = sqlite3.Row
-        try:
-            cursor = conn.execute(
-                """
-                SELECT ab.app_name, SUM(ab.duration_minutes) as total_duration, 
-                       COALESCE(ac.category, 'Uncategorized') as category
-                FROM activity_blocks ab
-                LEFT JOIN app_categories ac ON ab.app_name = ac.app_name
-                WHERE date(ab.start_time) BETWEEN date(?) AND date(?)
-                GROUP BY ab.app_name
-                ORDER BY total_duration DESC
-                """,
-                (start_date, end_date),
-            )
-            return [dict(row) for row in cursor.fetchall()]
-        finally:
-            conn.close()
+        cursor = conn.execute(
+            """
+            SELECT r.app_name, SUM(r.minutes) as total_duration,
+                   COALESCE(ac.category, 'Uncategorized') as category
+            FROM daily_app_usage r
+            LEFT JOIN app_categories ac ON r.app_name = ac.app_name
+            WHERE r.day >= ? AND r.day < ?
+            GROUP BY r.app_name
+            ORDER BY total_duration DESC
+            """,
+            (start_date, next_day(end_date)),
+        )
+        return [dict(row) for row in cursor.fetchall()]
 
     def get_category_usage_stats(
         self, start_date: str | None = None, end_date: str | None = None
@@ -287,91 +699,249 @@ class DatabaseManager:
         if not end_date:
             end_date = start_date
 
-        conn = self._get_connection()
-        conn.row_factory = sqlite3.Row
-        try:
-            cursor = conn.execute(
-                """
-                SELECT COALESCE(ac.category, 'Uncategorized') as category, 
-                       SUM(ab.duration_minutes) as total_duration
-                FROM activity_blocks ab
-                LEFT JOIN app_categories ac ON ab.app_name = ac.app_name
-                WHERE date(ab.start_time) BETWEEN date(?) AND date(?)
-                GROUP BY category
-                ORDER BY total_duration DESC
-                """,
-                (start_date, end_date),
+        if self.archive.overlaps(start_date, end_date):
+            totals = self._sum_rollup(
+                start_date, end_date, lambda day, app: self.categories.resolve(app)
             )
-            return [dict(row) for row in cursor.fetchall()]
-        finally:
-            conn.close()
+            stats = [
+                {"category": category, "total_duration": minutes}
+                for category, minutes in totals.items()
+            ]
+            return sorted(stats, key=lambda s: s["total_duration"], reverse=True)
+
+        conn = self._get_connection()
+        cursor = conn.execute(
+            """
+            SELECT COALESCE(ac.category, 'Uncategorized') as category,
+                   SUM(r.minutes) as total_duration
+            FROM daily_app_usage r
+            LEFT JOIN app_categories ac ON r.app_name = ac.app_name
+            WHERE r.day >= ? AND r.day < ?
+            GROUP BY category
+            ORDER BY total_duration DESC
+            """,
+            (start_date, next_day(end_date)),
+        )
+        return [dict(row) for row in cursor.fetchall()]
 
     def get_daily_usage_stats(self, days: int = 7) -> list[dict]:
         start_date = (datetime.now() - timedelta(days=days - 1)).strftime("%Y-%m-%d")
         end_date = datetime.now().strftime("%Y-%m-%d")
+        return self.get_daily_usage_between(start_date, end_date)
+
+    def get_daily_usage_between(self, start_date: str, end_date: str) -> list[dict]:
+        """Total minutes per day from start_date to end_date (inclusive)."""
+        if self.archive.overlaps(start_date, end_date):
+            totals = self._sum_rollup(start_date, end_date, lambda day, app: day)
+            return [
+                {"date": day, "total_duration": totals[day]} for day in sorted(totals)
+            ]
 
         conn = self._get_connection()
-        conn.row_factory = sqlite3.Row
-        try:
+        cursor = conn.execute(
+            """
+            SELECT day as date, SUM(minutes) as total_duration
+            FROM daily_app_usage
+            WHERE day >= ? AND day < ?
+            GROUP BY day
+            ORDER BY day ASC
+            """,
+            (start_date, next_day(end_date)),
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def rebuild_daily_rollup(self):
+        """Recomputes daily_app_usage from raw activity_blocks."""
+        with self._write() as conn:
+            rebuild_daily_app_usage(conn)
+        logging.info("Daily usage rollup rebuilt.")
+
+    def check_daily_rollup(self) -> list[dict]:
+        """
+        Compares daily_app_usage with totals computed from raw blocks.
+        Returns the mismatching (day, app_name) rows; empty means consistent.
+        """
+        conn = self._get_connection()
+        cursor = conn.execute("""
+            WITH raw AS (
+                SELECT day, app_name, SUM(COALESCE(duration_minutes, 0)) AS minutes,
+                       COUNT(*) AS block_count
+                FROM activity_blocks
+                GROUP BY day, app_name
+            )
+            SELECT raw.day, raw.app_name, raw.minutes AS raw_minutes,
+                   raw.block_count AS raw_blocks, r.minutes AS rollup_minutes,
+                   r.block_count AS rollup_blocks
+            FROM raw
+            LEFT JOIN daily_app_usage r
+                ON r.day = raw.day AND r.app_name = raw.app_name
+            WHERE r.minutes IS NOT raw.minutes OR r.block_count IS NOT raw.block_count
+            UNION ALL
+            SELECT r.day, r.app_name, NULL, NULL, r.minutes, r.block_count
+            FROM daily_app_usage r
+            WHERE NOT EXISTS (
+                SELECT 1 FROM raw WHERE raw.day = r.day AND raw.app_name = r.app_name
+            )
+            """)
+        return [dict(row) for row in cursor.fetchall()]
+
+    def _overlapping_ids(self, conn, start_ts: int, end_ts: int) -> list[int]:
+        sql = (
+            SQL_OVERLAPPING_IDS
+            if self.has_interval_index
+            else SQL_OVERLAPPING_IDS_FALLBACK
+        )
+        return [row[0] for row in conn.execute(sql, {"start": start_ts, "end": end_ts})]
+
+    def get_blocks_overlapping(
+        self, start_time: datetime | str, end_time: datetime | str
+    ) -> list[dict]:
+        """
+        Blocks overlapping [start_time, end_time) in chronological order.
+        Covers the live database; archived months are closed history.
+        """
+        conn = self._get_connection()
+        ids = self._overlapping_ids(conn, to_epoch(start_time), to_epoch(end_time))
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        cursor = conn.execute(
+            f"SELECT * FROM activity_blocks WHERE id IN ({placeholders}) "
+            "ORDER BY start_ts, id",
+            ids,
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_block_at(self, when: datetime | str) -> dict | None:
+        """The block active at `when` (start <= when < end), if any."""
+        when_ts = to_epoch(when)
+        blocks = self.get_blocks_overlapping(
+            datetime.fromtimestamp(when_ts), datetime.fromtimestamp(when_ts + 1)
+        )
+        return blocks[-1] if blocks else None
+
+    def carve_interval(
+        self, start_time: datetime | str, end_time: datetime | str
+    ) -> dict:
+        """
+        Empties [start_time, end_time): blocks inside it are deleted, blocks
+        sticking out on one side are trimmed and a block covering it is
+        split in two. Returns {"deleted": [ids], "trimmed": [ids],
+        "split": {id: id of the new right-hand part}}.
+        """
+        start_ts, end_ts = to_epoch(start_time), to_epoch(end_time)
+        changes = {"deleted": [], "trimmed": [], "split": {}}
+        with self._write() as conn:
+            ids = self._overlapping_ids(conn, start_ts, end_ts)
+            for block_id in ids:
+                block = conn.execute(
+                    "SELECT * FROM blocks WHERE id = ?", (block_id,)
+                ).fetchone()
+                inside_left = block["start_ts"] >= start_ts
+                inside_right = block["end_ts"] <= end_ts
+                if inside_left and inside_right:
+                    conn.execute(SQL_DELETE_BLOCK, (block_id,))
+                    changes["deleted"].append(block_id)
+                elif inside_left:
+                    # Sticks out on the right: starts when the interval ends
+                    conn.execute(
+                        "UPDATE blocks SET start_ts = ?, duration_minutes = ? WHERE id = ?",
+                        (
+                            end_ts,
+                            span_minutes(end_ts, block["end_ts"]),
+                            block_id,
+                        ),
+                    )
+                    changes["trimmed"].append(block_id)
+                else:
+                    conn.execute(
+                        SQL_UPDATE_BLOCK,
+                        (start_ts, span_minutes(block["start_ts"], start_ts), block_id),
+                    )
+                    if inside_right:
+                        changes["trimmed"].append(block_id)
+                    else:
+                        right_id = conn.execute(
+                            """
+                            INSERT INTO blocks
+                                (app_id, title_id, start_ts, end_ts, duration_minutes)
+                            VALUES (?, ?, ?, ?, ?)
+                            """,
+                            (
+                                block["app_id"],
+                                block["title_id"],
+                                end_ts,
+                                block["end_ts"],
+                                span_minutes(end_ts, block["end_ts"]),
+                            ),
+                        ).lastrowid
+                        changes["split"][block_id] = right_id
+        return changes
+
+    def insert_block(
+        self,
+        app_name: str,
+        window_title: str,
+        start_time: datetime | str,
+        end_time: datetime | str,
+        on_overlap: str = "reject",
+    ) -> int:
+        """
+        Inserts a finished block for [start_time, end_time), e.g. a break
+        recorded after the fact. Overlapping blocks make it raise
+        BlockOverlapError (on_overlap="reject") or are carved away first
+        (on_overlap="split"). Returns the new block's id.
+        """
+        start_ts, end_ts = to_epoch(start_time), to_epoch(end_time)
+        if end_ts <= start_ts:
+            raise ValueError("Block must end after it starts")
+        # batch() so carve_interval's writes join this transaction
+        with self.batch() as conn:
+            if on_overlap == "split":
+                self.carve_interval(start_time, end_time)
+            else:
+                overlapping = self.get_blocks_overlapping(start_time, end_time)
+                if overlapping:
+                    raise BlockOverlapError(overlapping)
             cursor = conn.execute(
                 """
-                SELECT date(start_time) as date, SUM(duration_minutes) as total_duration
-                FROM activity_blocks
-                WHERE date(start_time) BETWEEN date(?) AND date(?)
-                GROUP BY date(start_time)
-                ORDER BY date(start_time) ASC
+                INSERT INTO blocks (app_id, title_id, start_ts, end_ts, duration_minutes)
+                VALUES (?, ?, ?, ?, ?)
                 """,
-                (start_date, end_date),
+                (
+                    self._intern(conn, SQL_GET_APP_ID, SQL_ADD_APP, app_name),
+                    self._intern(conn, SQL_GET_TITLE_ID, SQL_ADD_TITLE, window_title),
+                    start_ts,
+                    end_ts,
+                    span_minutes(start_ts, end_ts),
+                ),
             )
-            return [dict(row) for row in cursor.fetchall()]
-        finally:
-            conn.close()
+        return cursor.lastrowid
 
     def merge_last_two_blocks(self):
         """Merges the very last block into the one before it."""
         blocks = self.get_recent_blocks(limit=2)
-        if len(blocks) < 2:
-            return
-
-        last = blocks[0]
-        prev = blocks[1]
-
-        # Calculate new duration and end_time
-        new_end = last["end_time"]
-        p_start = (
-            datetime.fromisoformat(prev["start_time"])
-            if isinstance(prev["start_time"], str)
-            else prev["start_time"]
-        )
-        l_end = (
-            datetime.fromisoformat(last["end_time"])
-            if isinstance(last["end_time"], str)
-            else last["end_time"]
-        )
-        new_duration = max(1, int((l_end - p_start).total_seconds() / 60))
-
-        conn = self._get_connection()
-        try:
-            with conn:
-                # Update previous block
-                conn.execute(
-                    "UPDATE activity_blocks SET end_time = ?, duration_minutes = ? WHERE id = ?",
-                    (new_end, new_duration, prev["id"]),
-                )
-                # Delete last block
-                conn.execute("DELETE FROM activity_blocks WHERE id = ?", (last["id"],))
-                logging.info(f"Merged block {last['id']} into {prev['id']}")
-        finally:
-            conn.close()
+        if len(blocks) == 2:
+            self.merge_blocks(blocks[1]["id"], blocks[0]["id"])
+
+    def merge_blocks(self, keep_id: int, drop_id: int):
+        """Extends block keep_id to the end of drop_id, then deletes drop_id."""
+        with self._write() as conn:
+            keep = conn.execute(SQL_GET_BLOCK_SPAN, (keep_id,)).fetchone()
+            drop = conn.execute(SQL_GET_BLOCK_SPAN, (drop_id,)).fetchone()
+            if keep is None or drop is None:
+                logging.warning(f"Cannot merge {drop_id} into {keep_id}: missing")
+                return
+            new_end_ts = drop["end_ts"]
+            new_duration = span_minutes(keep["start_ts"], new_end_ts)
+            conn.execute(SQL_UPDATE_BLOCK, (new_end_ts, new_duration, keep_id))
+            conn.execute(SQL_DELETE_BLOCK, (drop_id,))
+            logging.info(f"Merged block {drop_id} into {keep_id}")
 
     def delete_block(self, block_id: int):
-        conn = self._get_connection()
-        try:
-            with conn:
-                conn.execute("DELETE FROM activity_blocks WHERE id = ?", (block_id,))
-                logging.info(f"Block deleted: {block_id}")
-        finally:
-            conn.close()
+        with self._write() as conn:
+            conn.execute(SQL_DELETE_BLOCK, (block_id,))
+            logging.info(f"Block deleted: {block_id}")
 
     def update_last_block(
         self, block_id: int, duration_minutes: int, end_time: datetime | None = None
@@ -379,16 +949,24 @@ class DatabaseManager:
         if end_time is None:
             end_time = datetime.now()
 
-        conn = self._get_connection()
-        try:
-            with conn:
-                conn.execute(
-                    """
-                    UPDATE activity_blocks 
-                    SET end_time = ?, duration_minutes = ?
-                    WHERE id = ?
-                    """,
-                    (end_time, duration_minutes, block_id),
-                )
-        finally:
-            conn.close()
+        with self._write() as conn:
+            conn.execute(
+                SQL_UPDATE_BLOCK, (to_epoch(end_time), duration_minutes, block_id)
+            )
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Maintenance entry point: python -m src.db.manager [check-rollup|rebuild-rollup]
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    db = DatabaseManager()
+    command = sys.argv[1] if len(sys.argv) > 1 else "check-rollup"
+    if command == "rebuild-rollup":
+        db.rebuild_daily_rollup()
+    mismatches = db.check_daily_rollup()
+    for row in mismatches:
+        logging.warning(f"Rollup mismatch: {row}")
+    logging.info(f"Rollup check: {len(mismatches)} mismatching row(s).")
+    db.close()
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,494 @@
+import logging
+import sqlite3
+from datetime import datetime
+
+
+def _initial_schema(conn: sqlite3.Connection):
+    """Base tables and default data (matches databases created before versioning)."""
+    # Activity blocks table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS activity_blocks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            app_name TEXT NOT NULL,
+            window_title TEXT,
+            start_time DATETIME NOT NULL,
+            end_time DATETIME NOT NULL,
+            duration_minutes INTEGER DEFAULT 1
+        )
+    """)
+
+    # Categories table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS categories (
+            name TEXT PRIMARY KEY
+        )
+    """)
+
+    # Add default categories
+    default_categories = [
+        ("Development",),
+        ("Browsing",),
+        ("Entertainment",),
+        ("Social",),
+        ("System",),
+        ("Work",),
+        ("Education",),
+        ("Uncategorized",),
+    ]
+    conn.executemany(
+        "INSERT OR IGNORE INTO categories (name) VALUES (?)",
+        default_categories,
+    )
+
+    # App categories mapping table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS app_categories (
+            app_name TEXT PRIMARY KEY,
+            category TEXT NOT NULL
+        )
+    """)
+
+    # Add some default mappings
+    default_mappings = [
+        ("code.exe", "Development"),
+        ("pycharm64.exe", "Development"),
+        ("chrome.exe", "Browsing"),
+        ("msedge.exe", "Browsing"),
+        ("vlc.exe", "Entertainment"),
+        ("spotify.exe", "Entertainment"),
+        ("discord.exe", "Social"),
+        ("slack.exe", "Social"),
+        ("cmd.exe", "System"),
+        ("powershell.exe", "System"),
+        ("explorer.exe", "System"),
+    ]
+    conn.executemany(
+        "INSERT OR IGNORE INTO app_categories (app_name, category) VALUES (?, ?)",
+        default_mappings,
+    )
+
+    # Settings table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    """)
+
+    # Add default settings
+    default_settings = [
+        ("idle_threshold", "300"),
+        ("db_cleanup_days", "30"),
+        ("export_on_exit", "True"),
+        ("merge_short_browsing", "False"),
+    ]
+    conn.executemany(
+        "INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)",
+        default_settings,
+    )
+
+
+def _indexed_time_columns(conn: sqlite3.Connection):
+    """
+    Adds comparable time columns so range filters can use an index instead of
+    evaluating date(start_time) on every row:
+      day      - local calendar day of start_time ('YYYY-MM-DD')
+      start_ts - start_time as epoch seconds
+      end_ts   - end_time as epoch seconds
+    """
+    conn.execute("ALTER TABLE activity_blocks ADD COLUMN day TEXT")
+    conn.execute("ALTER TABLE activity_blocks ADD COLUMN start_ts INTEGER")
+    conn.execute("ALTER TABLE activity_blocks ADD COLUMN end_ts INTEGER")
+
+    # Stored times are naive local timestamps; the 'utc' modifier converts them
+    # to UTC so strftime('%s') yields a real epoch.
+    conn.execute("""
+        UPDATE activity_blocks SET
+            day = date(start_time),
+            start_ts = CAST(strftime('%s', start_time, 'utc') AS INTEGER),
+            end_ts = CAST(strftime('%s', end_time, 'utc') AS INTEGER)
+    """)
+
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_blocks_day_app "
+        "ON activity_blocks (day, app_name, duration_minutes)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_blocks_start_ts ON activity_blocks (start_ts)"
+    )
+
+
+def _daily_app_usage_rollup(conn: sqlite3.Connection):
+    """
+    Per-day, per-app totals kept in step with activity_blocks by triggers, so
+    every insert/extend/merge/delete updates the rollup in the same
+    transaction. Categories are joined at query time, so reclassifying an
+    app never invalidates it.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS daily_app_usage (
+            day TEXT NOT NULL,
+            app_name TEXT NOT NULL,
+            minutes INTEGER NOT NULL DEFAULT 0,
+            block_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, app_name)
+        ) WITHOUT ROWID
+    """)
+
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_insert
+        AFTER INSERT ON activity_blocks
+        BEGIN
+            INSERT INTO daily_app_usage (day, app_name, minutes, block_count)
+            VALUES (NEW.day, NEW.app_name, COALESCE(NEW.duration_minutes, 0), 1)
+            ON CONFLICT (day, app_name) DO UPDATE SET
+                minutes = minutes + excluded.minutes,
+                block_count = block_count + 1;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_delete
+        AFTER DELETE ON activity_blocks
+        BEGIN
+            UPDATE daily_app_usage SET
+                minutes = minutes - COALESCE(OLD.duration_minutes, 0),
+                block_count = block_count - 1
+            WHERE day = OLD.day AND app_name = OLD.app_name;
+            DELETE FROM daily_app_usage
+            WHERE day = OLD.day AND app_name = OLD.app_name AND block_count <= 0;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_update
+        AFTER UPDATE OF duration_minutes, day, app_name ON activity_blocks
+        BEGIN
+            UPDATE daily_app_usage SET
+                minutes = minutes - COALESCE(OLD.duration_minutes, 0),
+                block_count = block_count - 1
+            WHERE day = OLD.day AND app_name = OLD.app_name;
+            DELETE FROM daily_app_usage
+            WHERE day = OLD.day AND app_name = OLD.app_name AND block_count <= 0;
+            INSERT INTO daily_app_usage (day, app_name, minutes, block_count)
+            VALUES (NEW.day, NEW.app_name, COALESCE(NEW.duration_minutes, 0), 1)
+            ON CONFLICT (day, app_name) DO UPDATE SET
+                minutes = minutes + excluded.minutes,
+                block_count = block_count + 1;
+        END
+    """)
+
+    rebuild_daily_app_usage(conn)
+
+
+def _normalized_blocks(conn: sqlite3.Connection):
+    """
+    Compact storage: app names and window titles are interned in `apps` and
+    `titles`, and `blocks` keeps integer ids and epoch-second times only.
+    `activity_blocks` becomes a view with the previous row shape, so readers
+    (and INSERTs of old-style rows) keep working unchanged. Every row is
+    checked against the old table before it is dropped.
+    """
+    conn.execute("ALTER TABLE activity_blocks RENAME TO activity_blocks_legacy")
+    for name in ("trg_rollup_insert", "trg_rollup_delete", "trg_rollup_update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    conn.execute("DROP INDEX IF EXISTS idx_blocks_day_app")
+    conn.execute("DROP INDEX IF EXISTS idx_blocks_start_ts")
+
+    conn.execute("""
+        CREATE TABLE apps (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE titles (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL UNIQUE
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE blocks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            app_id INTEGER NOT NULL REFERENCES apps (id),
+            title_id INTEGER REFERENCES titles (id),
+            start_ts INTEGER NOT NULL,
+            end_ts INTEGER NOT NULL,
+            duration_minutes INTEGER DEFAULT 1
+        )
+    """)
+
+    conn.execute("""
+        INSERT INTO apps (name)
+        SELECT DISTINCT app_name FROM activity_blocks_legacy
+    """)
+    conn.execute("""
+        INSERT INTO titles (title)
+        SELECT DISTINCT window_title FROM activity_blocks_legacy
+        WHERE window_title IS NOT NULL
+    """)
+    conn.execute("""
+        INSERT INTO blocks (id, app_id, title_id, start_ts, end_ts, duration_minutes)
+        SELECT l.id, a.id, t.id,
+               COALESCE(l.start_ts, CAST(strftime('%s', l.start_time, 'utc') AS INTEGER)),
+               COALESCE(l.end_ts, CAST(strftime('%s', l.end_time, 'utc') AS INTEGER)),
+               l.duration_minutes
+        FROM activity_blocks_legacy l
+        JOIN apps a ON a.name = l.app_name
+        LEFT JOIN titles t ON t.title = l.window_title
+        ORDER BY l.id
+    """)
+    # Ids of deleted blocks are never handed out again
+    conn.execute("""
+        UPDATE sqlite_sequence
+        SET seq = MAX(seq, COALESCE(
+            (SELECT seq FROM sqlite_sequence WHERE name = 'activity_blocks_legacy'), 0))
+        WHERE name = 'blocks'
+    """)
+    conn.execute("""
+        INSERT INTO sqlite_sequence (name, seq)
+        SELECT 'blocks', seq FROM sqlite_sequence
+        WHERE name = 'activity_blocks_legacy'
+          AND NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'blocks')
+    """)
+    conn.execute("CREATE INDEX idx_blocks_start_ts ON blocks (start_ts)")
+
+    conn.execute("""
+        CREATE VIEW activity_blocks AS
+        SELECT b.id, a.name AS app_name, t.title AS window_title,
+               datetime(b.start_ts, 'unixepoch', 'localtime') AS start_time,
+               datetime(b.end_ts, 'unixepoch', 'localtime') AS end_time,
+               b.duration_minutes,
+               date(b.start_ts, 'unixepoch', 'localtime') AS day,
+               b.start_ts, b.end_ts
+        FROM blocks b
+        JOIN apps a ON a.id = b.app_id
+        LEFT JOIN titles t ON t.id = b.title_id
+    """)
+    conn.execute("""
+        CREATE TRIGGER activity_blocks_insert
+        INSTEAD OF INSERT ON activity_blocks
+        BEGIN
+            INSERT OR IGNORE INTO apps (name) VALUES (NEW.app_name);
+            INSERT OR IGNORE INTO titles (title)
+            SELECT NEW.window_title WHERE NEW.window_title IS NOT NULL;
+            INSERT INTO blocks (id, app_id, title_id, start_ts, end_ts, duration_minutes)
+            VALUES (
+                NEW.id,
+                (SELECT id FROM apps WHERE name = NEW.app_name),
+                (SELECT id FROM titles WHERE title = NEW.window_title),
+                COALESCE(NEW.start_ts, CAST(strftime('%s', NEW.start_time, 'utc') AS INTEGER)),
+                COALESCE(NEW.end_ts, CAST(strftime('%s', NEW.end_time, 'utc') AS INTEGER)),
+                COALESCE(NEW.duration_minutes, 1)
+            );
+        END
+    """)
+
+    mismatches = conn.execute("""
+        SELECT COUNT(*) FROM activity_blocks_legacy l
+        LEFT JOIN activity_blocks v ON v.id = l.id
+        WHERE v.id IS NULL
+           OR v.app_name IS NOT l.app_name
+           OR v.window_title IS NOT l.window_title
+           OR v.duration_minutes IS NOT l.duration_minutes
+           OR v.start_ts IS NOT COALESCE(l.start_ts, CAST(strftime('%s', l.start_time, 'utc') AS INTEGER))
+           OR v.end_ts IS NOT COALESCE(l.end_ts, CAST(strftime('%s', l.end_time, 'utc') AS INTEGER))
+    """).fetchone()[0]
+    if mismatches:
+        raise RuntimeError(f"{mismatches} block(s) did not survive normalization")
+    conn.execute("DROP TABLE activity_blocks_legacy")
+
+    # Rollup maintenance moves to the new table; day is the local start date
+    conn.execute("""
+        CREATE TRIGGER trg_rollup_insert
+        AFTER INSERT ON blocks
+        BEGIN
+            INSERT INTO daily_app_usage (day, app_name, minutes, block_count)
+            VALUES (
+                date(NEW.start_ts, 'unixepoch', 'localtime'),
+                (SELECT name FROM apps WHERE id = NEW.app_id),
+                COALESCE(NEW.duration_minutes, 0),
+                1
+            )
+            ON CONFLICT (day, app_name) DO UPDATE SET
+                minutes = minutes + excluded.minutes,
+                block_count = block_count + 1;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER trg_rollup_delete
+        AFTER DELETE ON blocks
+        BEGIN
+            UPDATE daily_app_usage SET
+                minutes = minutes - COALESCE(OLD.duration_minutes, 0),
+                block_count = block_count - 1
+            WHERE day = date(OLD.start_ts, 'unixepoch', 'localtime')
+              AND app_name = (SELECT name FROM apps WHERE id = OLD.app_id);
+            DELETE FROM daily_app_usage
+            WHERE day = date(OLD.start_ts, 'unixepoch', 'localtime')
+              AND app_name = (SELECT name FROM apps WHERE id = OLD.app_id)
+              AND block_count <= 0;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER trg_rollup_update
+        AFTER UPDATE OF duration_minutes, start_ts, app_id ON blocks
+        BEGIN
+            UPDATE daily_app_usage SET
+                minutes = minutes - COALESCE(OLD.duration_minutes, 0),
+                block_count = block_count - 1
+            WHERE day = date(OLD.start_ts, 'unixepoch', 'localtime')
+              AND app_name = (SELECT name FROM apps WHERE id = OLD.app_id);
+            DELETE FROM daily_app_usage
+            WHERE day = date(OLD.start_ts, 'unixepoch', 'localtime')
+              AND app_name = (SELECT name FROM apps WHERE id = OLD.app_id)
+              AND block_count <= 0;
+            INSERT INTO daily_app_usage (day, app_name, minutes, block_count)
+            VALUES (
+                date(NEW.start_ts, 'unixepoch', 'localtime'),
+                (SELECT name FROM apps WHERE id = NEW.app_id),
+                COALESCE(NEW.duration_minutes, 0),
+                1
+            )
+            ON CONFLICT (day, app_name) DO UPDATE SET
+                minutes = minutes + excluded.minutes,
+                block_count = block_count + 1;
+        END
+    """)
+
+    rebuild_daily_app_usage(conn)
+
+
+def rtree_available(conn: sqlite3.Connection) -> bool:
+    """Whether this SQLite build ships the R*Tree module."""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.rtree_probe USING rtree(id, a, b)")
+    except sqlite3.OperationalError:
+        return False
+    conn.execute("DROP TABLE temp.rtree_probe")
+    return True
+
+
+def _interval_index(conn: sqlite3.Connection):
+    """
+    R*Tree over every block's [start_ts, end_ts], kept in step by triggers,
+    so point-in-time and overlap lookups are logarithmic. R*Tree coordinates
+    are 32-bit floats rounded outwards: it narrows candidates and queries
+    recheck the exact columns on blocks. Without the module (unusual SQLite
+    builds) the index is skipped and lookups fall back to the start_ts index.
+    """
+    if not rtree_available(conn):
+        logging.warning("SQLite has no R*Tree module; interval index not created")
+        return
+
+    conn.execute(
+        "CREATE VIRTUAL TABLE block_intervals USING rtree(id, start_ts, end_ts)"
+    )
+    # A block briefly ending before it starts must not break the min <= max rule
+    conn.execute("""
+        INSERT INTO block_intervals (id, start_ts, end_ts)
+        SELECT id, start_ts, MAX(start_ts, end_ts) FROM blocks
+    """)
+    conn.execute("""
+        CREATE TRIGGER trg_intervals_insert
+        AFTER INSERT ON blocks
+        BEGIN
+            INSERT INTO block_intervals (id, start_ts, end_ts)
+            VALUES (NEW.id, NEW.start_ts, MAX(NEW.start_ts, NEW.end_ts));
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER trg_intervals_update
+        AFTER UPDATE OF start_ts, end_ts ON blocks
+        BEGIN
+            UPDATE block_intervals
+            SET start_ts = NEW.start_ts, end_ts = MAX(NEW.start_ts, NEW.end_ts)
+            WHERE id = NEW.id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER trg_intervals_delete
+        AFTER DELETE ON blocks
+        BEGIN
+            DELETE FROM block_intervals WHERE id = OLD.id;
+        END
+    """)
+
+
+def rebuild_daily_app_usage(conn: sqlite3.Connection):
+    """Recomputes the whole rollup from raw blocks (caller owns the transaction)."""
+    conn.execute("DELETE FROM daily_app_usage")
+    conn.execute("""
+        INSERT INTO daily_app_usage (day, app_name, minutes, block_count)
+        SELECT day, app_name, SUM(COALESCE(duration_minutes, 0)), COUNT(*)
+        FROM activity_blocks
+        GROUP BY day, app_name
+    """)
+
+
+# Ordered (version, description, migration). Append only; never renumber.
+MIGRATIONS = [
+    (1, "initial schema", _initial_schema),
+    (2, "indexed day/epoch time columns", _indexed_time_columns),
+    (3, "daily_app_usage rollup", _daily_app_usage_rollup),
+    (4, "normalized apps/titles and epoch blocks", _normalized_blocks),
+    (5, "R*Tree interval index on blocks", _interval_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at DATETIME NOT NULL
+        )
+    """)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def read_schema_version(conn: sqlite3.Connection) -> int:
+    """Like get_schema_version, but never writes (read-only connections)."""
+    try:
+        row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except sqlite3.OperationalError:
+        return 0  # Brand-new database
+    return row[0] or 0
+
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    """Runs every pending migration, each in its own transaction. Returns the new version."""
+    # Fast path for every start after the first: one read, no write transaction
+    current = read_schema_version(conn)
+    if current >= LATEST_VERSION:
+        return current
+
+    with conn:
+        current = get_schema_version(conn)
+
+    for version, description, migration in MIGRATIONS:
+        if version <= current:
+            continue
+        # Explicit BEGIN so DDL statements are part of the transaction too;
+        # IMMEDIATE so a second process cannot apply the same step concurrently.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                current = version
+                continue
+            migration(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                (version, description, datetime.now()),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logging.error(f"Schema migration {version} failed: {description}")
+            raise
+        logging.info(f"Applied schema migration {version}: {description}")
+        current = version
+
+    return current
@@ -0,0 +1,209 @@
+import math
+from abc import ABC, abstractmethod
+from datetime import datetime
+import customtkinter as ctk
+import matplotlib
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from src.utils.analytics import WEEKDAYS
+
+# Set matplotlib to work with tkinter (this module is the only one that
+# imports it, on first use of the Statistics view)
+matplotlib.use("TkAgg")
+
+BACKGROUND = "#2B2B2B"
+PIE_START_ANGLE = 140
+PIE_LABEL_DISTANCE = 1.1
+PIE_PCT_DISTANCE = 0.6
+
+
+def pie_series(stats, label_key, top_n=6):
+    """Top entries plus an aggregated "Others" slice."""
+    top_stats = stats[:top_n]
+    labels = [s[label_key] for s in top_stats]
+    sizes = [s["total_duration"] for s in top_stats]
+
+    if len(stats) > top_n:
+        others_duration = sum(s["total_duration"] for s in stats[top_n:])
+        labels.append("Others")
+        sizes.append(others_duration)
+    return labels, sizes
+
+
+def bar_series(stats):
+    """Day labels (DD/MM) and hours from daily usage stats."""
+    # Convert YYYY-MM-DD to DD/MM
+    labels = [datetime.strptime(s["date"], "%Y-%m-%d").strftime("%d/%m") for s in stats]
+    durations = [s["total_duration"] / 60 for s in stats]  # Hours
+    return labels, durations
+
+
+def heatmap_series(categories, heatmap, selected=None):
+    """
+    Weekday labels and the 7x24 grid of active minutes (flattened) for the
+    selected category, or for all categories combined.
+    """
+    if selected in categories:
+        grid = heatmap[categories.index(selected)]
+    else:
+        grid = heatmap.sum(axis=0) if len(categories) else np.zeros((7, 24))
+    values = [round(float(v), 1) for v in grid.ravel()] if grid.any() else []
+    return list(WEEKDAYS), values
+
+
+class ChartPanel(ABC):
+    """
+    A figure and Tk canvas created once per container. update() redraws only
+    when the series differs from the one currently displayed.
+    """
+
+    def __init__(self, container):
+        self.container = container
+        self.figure = Figure(figsize=(5, 5), facecolor=BACKGROUND)
+        self.ax = self.figure.add_subplot()
+        self.ax.set_facecolor(BACKGROUND)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=container)
+        self.widget = self.canvas.get_tk_widget()
+        self.empty_label = ctk.CTkLabel(container, text="No data available yet.")
+        self._series_hash = None
+        self._showing = None
+
+    def _show(self, has_data: bool):
+        if self._showing == has_data:
+            return
+        if has_data:
+            self.empty_label.pack_forget()
+            self.widget.pack(fill="both", expand=True)
+        else:
+            self.widget.pack_forget()
+            self.empty_label.pack(expand=True)
+        self._showing = has_data
+
+    def update(self, labels, values, title) -> bool:
+        """Returns True if the chart was redrawn, False if unchanged."""
+        series_hash = hash((tuple(labels), tuple(values), title))
+        if series_hash == self._series_hash:
+            return False
+        self._series_hash = series_hash
+
+        self._show(bool(values))
+        if values:
+            self._draw(labels, values)
+            self.ax.set_title(title, color="white", pad=10)
+            self.canvas.draw_idle()
+        return True
+
+    @abstractmethod
+    def _draw(self, labels, values):
+        """Draws a non-empty series on self.ax."""
+
+
+class PieChartPanel(ChartPanel):
+    def __init__(self, container):
+        super().__init__(container)
+        self.wedges = []
+        self.texts = []
+        self.autotexts = []
+
+    def _draw(self, labels, sizes):
+        if len(sizes) != len(self.wedges):
+            self._rebuild(labels, sizes)
+            return
+
+        # Same number of slices: move the existing artists
+        total = float(sum(sizes)) or 1.0
+        theta1 = PIE_START_ANGLE
+        for wedge, text, autotext, label, size in zip(
+            self.wedges, self.texts, self.autotexts, labels, sizes
+        ):
+            theta2 = theta1 + 360.0 * size / total
+            wedge.set_theta1(theta1)
+            wedge.set_theta2(theta2)
+
+            mid = math.radians((theta1 + theta2) / 2)
+            x, y = math.cos(mid), math.sin(mid)
+            text.set_text(label)
+            text.set_position((PIE_LABEL_DISTANCE * x, PIE_LABEL_DISTANCE * y))
+            text.set_horizontalalignment("left" if x > 0 else "right")
+            autotext.set_text(f"{100.0 * size / total:.1f}%")
+            autotext.set_position((PIE_PCT_DISTANCE * x, PIE_PCT_DISTANCE * y))
+            theta1 = theta2
+
+    def _rebuild(self, labels, sizes):
+        self.ax.clear()
+        colors = matplotlib.colormaps["Paired"](range(len(labels)))
+        self.wedges, self.texts, self.autotexts = self.ax.pie(
+            sizes,
+            labels=labels,
+            autopct="%1.1f%%",
+            startangle=PIE_START_ANGLE,
+            colors=colors,
+            textprops={"color": "w"},
+            labeldistance=PIE_LABEL_DISTANCE,
+            pctdistance=PIE_PCT_DISTANCE,
+        )
+
+
+class BarChartPanel(ChartPanel):
+    def __init__(self, container):
+        super().__init__(container)
+        self.bars = []
+        self.value_texts = []
+
+    def _draw(self, labels, durations):
+        if len(durations) != len(self.bars):
+            self._rebuild(labels, durations)
+        else:
+            for bar, text, height in zip(self.bars, self.value_texts, durations):
+                bar.set_height(height)
+                text.set_y(height)
+                text.set_text(f"{height:.1f}h")
+            self.ax.relim()
+            self.ax.autoscale_view()
+        self.ax.set_xticks(range(len(labels)), labels)
+
+    def _rebuild(self, labels, durations):
+        self.ax.clear()
+        self.bars = list(self.ax.bar(range(len(labels)), durations, color="#1f538d"))
+        self.ax.set_ylabel("Hours", color="white")
+        self.ax.tick_params(axis="x", colors="white")
+        self.ax.tick_params(axis="y", colors="white")
+
+        # Add value labels on top of bars
+        self.value_texts = [
+            self.ax.text(
+                bar.get_x() + bar.get_width() / 2.0,
+                bar.get_height(),
+                f"{bar.get_height():.1f}h",
+                ha="center",
+                va="bottom",
+                color="white",
+            )
+            for bar in self.bars
+        ]
+
+
+class HeatmapPanel(ChartPanel):
+    """Hour-of-day x weekday grid of active minutes."""
+
+    def __init__(self, container):
+        super().__init__(container)
+        self.image = None
+
+    def _draw(self, labels, values):
+        grid = np.asarray(values).reshape(len(labels), 24)
+        if self.image is None:
+            self.image = self.ax.imshow(grid, aspect="auto", cmap="viridis")
+            self.ax.set_yticks(range(len(labels)), labels)
+            self.ax.set_xticks(
+                range(0, 24, 3), [f"{h:02d}:00" for h in range(0, 24, 3)]
+            )
+            self.ax.tick_params(axis="x", colors="white")
+            self.ax.tick_params(axis="y", colors="white")
+            colorbar = self.figure.colorbar(self.image, ax=self.ax, label="Minutes")
+            colorbar.ax.tick_params(colors="white")
+            colorbar.ax.yaxis.label.set_color("white")
+        else:
+            self.image.set_data(grid)
+        self.image.set_clim(0, max(grid.max(), 1))
@@ -2,24 +2,95 @@ import customtkinter as ctk
 from datetime import datetime, timedelta
 import logging
 import os
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib
+import time
 from src.utils.startup import StartupManager
 from src.utils.exporter import ExportManager
 from src.utils.resources import get_resource_path
+from src.ui.data_service import DashboardDataService
+from src.core.engine import COMMAND_TIMEOUT_SECONDS
+from src.utils.metrics import format_snapshot, registry, timed
 
-# Set matplotlib to work with tkinter
-matplotlib.use("TkAgg")
+# matplotlib and NumPy (src.ui.charts, src.utils.analytics) are imported
+# when the Statistics view is first opened, not at startup.
+
+ALL_CATEGORIES = "All Categories"
+
+
+class RecentBlockRow:
+    """Reusable widget row of the recent-activity list."""
+
+    def __init__(self, parent, on_delete):
+        self.on_delete = on_delete
+        self.block_id = None
+        self.grid_row = None
+        self.values = (None, None, None)
+
+        self.frame = ctk.CTkFrame(parent, fg_color="transparent")
+        self.time_label = ctk.CTkLabel(self.frame, text="", width=60)
+        self.time_label.pack(side="left")
+        self.app_label = ctk.CTkLabel(
+            self.frame, text="", font=ctk.CTkFont(weight="bold")
+        )
+        self.app_label.pack(side="left", padx=20)
+        self.duration_label = ctk.CTkLabel(self.frame, text="")
+        self.duration_label.pack(side="right")
+
+        del_btn = ctk.CTkButton(
+            self.frame,
+            text="🗑",
+            width=30,
+            fg_color="transparent",
+            hover_color="#A30000",
+            command=self._delete,
+        )
+        del_btn.pack(side="right", padx=(10, 0))
+
+    def _delete(self):
+        if self.block_id is not None:
+            self.on_delete(self.block_id)
+
+    def show(self, block, grid_row):
+        """Binds the row to a block, touching only widgets whose value changed."""
+        self.block_id = block["id"]
+        time_str = (
+            datetime.fromisoformat(block["start_time"]).strftime("%H:%M")
+            if isinstance(block["start_time"], str)
+            else block["start_time"].strftime("%H:%M")
+        )
+        values = (time_str, block["app_name"], f"{block['duration_minutes']} min")
+        labels = (self.time_label, self.app_label, self.duration_label)
+        for label, old, new in zip(labels, self.values, values):
+            if old != new:
+                label.configure(text=new)
+        self.values = values
+
+        if grid_row != self.grid_row:
+            self.frame.grid(row=grid_row, column=0, padx=10, pady=5, sticky="ew")
+            self.grid_row = grid_row
+
+    def hide(self):
+        self.frame.grid_forget()
+        self.block_id = None
+        self.grid_row = None
 
 
 class DashboardApp(ctk.CTk):
-    def __init__(self, db_manager):
+    def __init__(
+        self, db_manager, start_hidden: bool = False, exit_when_hidden: bool = False
+    ):
         super().__init__()
 
         self.db = db_manager
         self.engine = None
+        # Separate dashboard process: closing the window ends the process
+        # (and its UI memory); the tracker starts a new one when needed
+        self.exit_when_hidden = exit_when_hidden
         self.exporter = ExportManager(db_manager)
+        self.data = DashboardDataService(self)
+        self.data.request(
+            "settings", "settings", self._load_settings, self._apply_settings
+        )
+        registry.gauge("ui.coalesced_requests", lambda: self.data.coalesced_count)
         self.title("Time Reporter")
         self.geometry("1100x750")
 
@@ -112,19 +183,30 @@ class DashboardApp(ctk.CTk):
         )
         self.browse_button.pack(side="left", padx=(5, 10), pady=10)
 
-        # View Frames
+        # Recent blocks list state: displayed rows keyed by block id, a pool
+        # of hidden rows for reuse and the last seen database data version
+        self._recent_rows: dict[int, RecentBlockRow] = {}
+        self._row_pool: list[RecentBlockRow] = []
+        self._data_version = None
+
+        # View Frames; their contents are built on first navigation
         self.dashboard_frame = ctk.CTkFrame(self, corner_radius=15)
         self.stats_frame = ctk.CTkFrame(self, corner_radius=15)
         self.categories_frame = ctk.CTkFrame(self, corner_radius=15)
         self.settings_frame = ctk.CTkFrame(self, corner_radius=15)
-
-        self._setup_dashboard_view()
-        self._setup_stats_view()
-        self._setup_categories_view()
-        self._setup_settings_view()
-
-        # Show initial view
-        self.show_dashboard()
+        self._view_setups = {
+            "dashboard": self._setup_dashboard_view,
+            "stats": self._setup_stats_view,
+            "categories": self._setup_categories_view,
+            "settings": self._setup_settings_view,
+        }
+        self._built_views: set[str] = set()
+
+        if start_hidden:
+            # Tray-only start (e.g. at login): nothing is built until shown
+            self.withdraw()
+        else:
+            self.show_dashboard()
 
         # Initial refresh
         self.refresh_data()
@@ -133,12 +215,34 @@ class DashboardApp(ctk.CTk):
         self.protocol("WM_DELETE_WINDOW", self.hide_window)
 
     def hide_window(self):
-        self.withdraw()
+        if self.exit_when_hidden:
+            self.destroy()
+        else:
+            self.withdraw()
+
+    def _exit_if_unused(self):
+        """Ends a dashboard process started only to ask about an idle period."""
+        if self.exit_when_hidden and self.state() == "withdrawn":
+            self.destroy()
 
     def show_window(self):
+        if not self._built_views:
+            self.show_dashboard()
         self.deiconify()
         self.focus_force()
 
+    def _ensure_view(self, name: str) -> bool:
+        """Builds a view's widgets the first time it is shown. True if built now."""
+        if name in self._built_views:
+            return False
+        started = time.perf_counter()
+        self._view_setups[name]()
+        self._built_views.add(name)
+        logging.info(
+            f"Built {name} view in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return True
+
     def _setup_dashboard_view(self):
         self.dashboard_frame.grid_columnconfigure(0, weight=1)
         self.dashboard_frame.grid_rowconfigure(2, weight=1)
@@ -169,8 +273,11 @@ class DashboardApp(ctk.CTk):
             self.dashboard_frame, label_text="Recent Blocks"
         )
         self.scrollable_frame.grid(row=2, column=0, padx=20, pady=20, sticky="nsew")
+        self.scrollable_frame.grid_columnconfigure(0, weight=1)
 
     def _setup_stats_view(self):
+        from src.ui.charts import BarChartPanel, HeatmapPanel, PieChartPanel
+
         self.stats_frame.grid_columnconfigure(0, weight=1)
         self.stats_frame.grid_rowconfigure(1, weight=1)
 
@@ -184,7 +291,7 @@ class DashboardApp(ctk.CTk):
         # Range selector
         self.range_selector = ctk.CTkSegmentedButton(
             self.stats_frame,
-            values=["Today", "Last 7 Days", "Last 30 Days"],
+            values=["Today", "Last 7 Days", "Last 30 Days", "Last Year"],
             command=lambda v: self.render_stats_charts(),
         )
         self.range_selector.grid(row=0, column=0, padx=20, pady=(20, 10), sticky="e")
@@ -196,6 +303,7 @@ class DashboardApp(ctk.CTk):
         self.stats_tabview.add("By Application")
         self.stats_tabview.add("By Category")
         self.stats_tabview.add("Weekly Trends")
+        self.stats_tabview.add("Activity Heatmap")
 
         # Containers for the charts
         self.app_chart_container = ctk.CTkFrame(
@@ -213,6 +321,24 @@ class DashboardApp(ctk.CTk):
         )
         self.weekly_chart_container.pack(fill="both", expand=True)
 
+        heatmap_tab = self.stats_tabview.tab("Activity Heatmap")
+        self.heatmap_category = ctk.CTkOptionMenu(
+            heatmap_tab,
+            values=[ALL_CATEGORIES],
+            command=lambda v: self._draw_heatmap(),
+        )
+        self.heatmap_category.pack(anchor="e", padx=10, pady=(0, 5))
+        self.heatmap_container = ctk.CTkFrame(heatmap_tab, fg_color="transparent")
+        self.heatmap_container.pack(fill="both", expand=True)
+
+        # Figures are created once and updated in place on every refresh
+        self.app_chart = PieChartPanel(self.app_chart_container)
+        self.cat_chart = PieChartPanel(self.cat_chart_container)
+        self.weekly_chart = BarChartPanel(self.weekly_chart_container)
+        self.heatmap_chart = HeatmapPanel(self.heatmap_container)
+        # (range label, category names, per-category heatmap) of the last load
+        self._heatmap = None
+
     def _setup_categories_view(self):
         self.categories_frame.grid_columnconfigure(0, weight=1)
         self.categories_frame.grid_rowconfigure(2, weight=1)
@@ -277,31 +403,25 @@ class DashboardApp(ctk.CTk):
             idle_group, text="Idle Detection Threshold (minutes):", anchor="w"
         ).pack(side="left", padx=20, pady=10)
 
-        current_idle_min = int(self.db.get_setting("idle_threshold", "300")) // 60
         self.idle_entry = ctk.CTkEntry(idle_group, width=60)
-        self.idle_entry.insert(0, str(current_idle_min))
         self.idle_entry.pack(side="right", padx=20, pady=10)
 
-        # 2. DB Cleanup
+        # 2. DB Retention (older months move to the archive)
         cleanup_group = ctk.CTkFrame(container)
         cleanup_group.pack(fill="x", pady=10)
 
         ctk.CTkLabel(
-            cleanup_group, text="Data Retention Policy (days):", anchor="w"
+            cleanup_group, text="Archive activity older than (days):", anchor="w"
         ).pack(side="left", padx=20, pady=10)
 
-        current_cleanup = self.db.get_setting("db_cleanup_days", "30")
         self.cleanup_entry = ctk.CTkEntry(cleanup_group, width=60)
-        self.cleanup_entry.insert(0, current_cleanup)
         self.cleanup_entry.pack(side="right", padx=20, pady=10)
 
         # 3. Export on Exit
         export_group = ctk.CTkFrame(container)
         export_group.pack(fill="x", pady=10)
 
-        self.export_on_exit_var = ctk.BooleanVar(
-            value=self.db.get_setting("export_on_exit", "True") == "True"
-        )
+        self.export_on_exit_var = ctk.BooleanVar()
         ctk.CTkCheckBox(
             export_group,
             text="Auto-export report on exit",
@@ -312,7 +432,7 @@ class DashboardApp(ctk.CTk):
         startup_group = ctk.CTkFrame(container)
         startup_group.pack(fill="x", pady=10)
 
-        self.startup_var = ctk.BooleanVar(value=StartupManager.is_startup_enabled())
+        self.startup_var = ctk.BooleanVar()
         ctk.CTkCheckBox(
             startup_group,
             text="Run automatically when Windows starts",
@@ -323,9 +443,7 @@ class DashboardApp(ctk.CTk):
         merge_group = ctk.CTkFrame(container)
         merge_group.pack(fill="x", pady=10)
 
-        self.merge_browsing_var = ctk.BooleanVar(
-            value=self.db.get_setting("merge_short_browsing", "False") == "True"
-        )
+        self.merge_browsing_var = ctk.BooleanVar()
         ctk.CTkCheckBox(
             merge_group,
             text="Merge short browsing (<5m) into Development",
@@ -347,37 +465,107 @@ class DashboardApp(ctk.CTk):
         self.theme_option.set("Dark")
         self.theme_option.pack(side="right", padx=20, pady=10)
 
-        # Save Button
+        # 7. Diagnostics (latency histograms and counters, src.utils.metrics)
+        diagnostics_group = ctk.CTkFrame(container)
+        diagnostics_group.pack(fill="x", pady=10)
+
+        diagnostics_bar = ctk.CTkFrame(diagnostics_group, fg_color="transparent")
+        diagnostics_bar.pack(fill="x", padx=10, pady=(10, 0))
+        self.metrics_enabled_var = ctk.BooleanVar()
+        ctk.CTkCheckBox(
+            diagnostics_bar,
+            text="Collect performance metrics",
+            variable=self.metrics_enabled_var,
+        ).pack(side="left", padx=10)
+        ctk.CTkButton(
+            diagnostics_bar, text="Save to JSON", width=110, command=self.dump_metrics
+        ).pack(side="right", padx=5)
+        ctk.CTkButton(
+            diagnostics_bar, text="Refresh", width=80, command=self.refresh_diagnostics
+        ).pack(side="right", padx=5)
+
+        self.diagnostics_text = ctk.CTkTextbox(
+            diagnostics_group, height=240, font=ctk.CTkFont(family="Consolas", size=12)
+        )
+        self.diagnostics_text.pack(fill="x", padx=10, pady=10)
+
+        # Save Button (enabled once the stored values are in the widgets)
         self.save_settings_btn = ctk.CTkButton(
             self.settings_frame,
             text="Save & Apply Settings",
             command=self.save_settings,
+            state="disabled",
         )
         self.save_settings_btn.grid(row=2, column=0, padx=20, pady=20)
 
+        self.data.request(
+            "settings", "settings", self._load_settings, self._apply_settings
+        )
+
+    def _load_settings(self) -> dict:
+        """Worker thread: the stored values behind the Settings view."""
+        return {
+            "idle_minutes": int(self.db.get_setting("idle_threshold", "300")) // 60,
+            "cleanup_days": self.db.get_setting("db_cleanup_days", "30"),
+            "export_on_exit": self.db.get_setting("export_on_exit", "True") == "True",
+            "startup": StartupManager.is_startup_enabled(),
+            "merge_short_browsing": (
+                self.db.get_setting("merge_short_browsing", "False") == "True"
+            ),
+            "metrics_enabled": self.db.get_setting("metrics_enabled", "True") == "True",
+        }
+
+    def _apply_settings(self, settings: dict):
+        registry.enabled = settings["metrics_enabled"]
+        if "settings" not in self._built_views:
+            return  # Loaded again when the view is built
+        self.idle_entry.delete(0, "end")
+        self.idle_entry.insert(0, str(settings["idle_minutes"]))
+        self.cleanup_entry.delete(0, "end")
+        self.cleanup_entry.insert(0, settings["cleanup_days"])
+        self.export_on_exit_var.set(settings["export_on_exit"])
+        self.startup_var.set(settings["startup"])
+        self.merge_browsing_var.set(settings["merge_short_browsing"])
+        self.metrics_enabled_var.set(settings["metrics_enabled"])
+        self.save_settings_btn.configure(state="normal")
+
+    def destroy(self):
+        self.data.shutdown()
+        super().destroy()
+
     def show_dashboard(self):
+        built = self._ensure_view("dashboard")
         self._hide_all_frames()
         self.dashboard_frame.grid(row=0, column=1, padx=20, pady=20, sticky="nsew")
         self._update_button_colors(self.dashboard_button)
+        if built:
+            self.update_activity_views(force=True)
 
     def show_stats(self):
+        self._ensure_view("stats")
         self._hide_all_frames()
         self.stats_frame.grid(row=0, column=1, padx=20, pady=20, sticky="nsew")
         self._update_button_colors(self.stats_button)
         self.render_stats_charts()
 
     def show_categories(self):
+        self._ensure_view("categories")
         self._hide_all_frames()
         self.categories_frame.grid(row=0, column=1, padx=20, pady=20, sticky="nsew")
         self._update_button_colors(self.categories_button)
         self.render_categories_list()
 
     def show_settings(self):
+        self._ensure_view("settings")
         self._hide_all_frames()
         self.settings_frame.grid(row=0, column=1, padx=20, pady=20, sticky="nsew")
         self._update_button_colors(self.settings_button)
+        self.refresh_diagnostics()
 
     def _hide_all_frames(self):
+        # Results still in flight for views being hidden are no longer wanted
+        self.data.invalidate("stats")
+        self.data.invalidate("categories")
         self.dashboard_frame.grid_forget()
         self.stats_frame.grid_forget()
         self.categories_frame.grid_forget()
@@ -396,65 +584,80 @@ class DashboardApp(ctk.CTk):
                 btn.configure(fg_color=ctk.ThemeManager.theme["CTkButton"]["fg_color"])
 
     def refresh_data(self):
-        """Fetches data from DB and updates UI components."""
-        # Update Live Card
-        last_block = self.db.get_last_block()
-        if last_block:
-            cat = self.db.get_app_category(last_block["app_name"])
-            self.live_app_label.configure(
-                text=f"{last_block['app_name']} [{cat}] - {last_block['duration_minutes']} min"
-            )
+        """Periodic refresh of the dashboard (and charts when visible)."""
+        self.update_activity_views()
+        self.after(30000, self.refresh_data)
 
-        # Update Recent Blocks List
-        recent_blocks = self.db.get_recent_blocks(limit=15)
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+    def update_activity_views(self, force: bool = False):
+        """
+        Fetches data from DB (in the background) and updates UI components.
+        Skipped entirely when the database's data version shows nothing
+        changed since last time.
+        """
+        self.data.request(
+            "activity",
+            ("activity", force),
+            self._load_activity,
+            self._apply_activity,
+            None if force else self._data_version,
+        )
 
-        for block in recent_blocks:
-            row = ctk.CTkFrame(self.scrollable_frame, fg_color="transparent")
-            row.pack(fill="x", padx=10, pady=5)
+    def _load_activity(self, known_version):
+        """Worker thread: returns None when nothing changed since known_version."""
+        version = self.db.get_data_version()
+        if version == known_version:
+            return None
+        last_block = self.db.get_last_block()
+        category = (
+            self.db.get_app_category(last_block["app_name"]) if last_block else None
+        )
+        return version, last_block, category, self.db.get_recent_blocks(limit=15)
 
-            time_str = (
-                datetime.fromisoformat(block["start_time"]).strftime("%H:%M")
-                if isinstance(block["start_time"], str)
-                else block["start_time"].strftime("%H:%M")
-            )
+    @timed("ui.apply_activity")
+    def _apply_activity(self, snapshot):
+        if snapshot is None or "dashboard" not in self._built_views:
+            return  # Unchanged, or hidden since startup; reloaded when built
+        self._data_version, last_block, cat, recent_blocks = snapshot
 
-            ctk.CTkLabel(row, text=time_str, width=60).pack(side="left")
-            ctk.CTkLabel(
-                row, text=block["app_name"], font=ctk.CTkFont(weight="bold")
-            ).pack(side="left", padx=20)
-            ctk.CTkLabel(row, text=f"{block['duration_minutes']} min").pack(
-                side="right"
-            )
+        # Update Live Card
+        if last_block:
+            live_text = f"{last_block['app_name']} [{cat}] - {last_block['duration_minutes']} min"
+            if self.live_app_label.cget("text") != live_text:
+                self.live_app_label.configure(text=live_text)
 
-            del_btn = ctk.CTkButton(
-                row,
-                text="🗑",
-                width=30,
-                fg_color="transparent",
-                hover_color="#A30000",
-                command=lambda b_id=block["id"]: self.delete_activity_block(b_id),
-            )
-            del_btn.pack(side="right", padx=(10, 0))
+        # Update Recent Blocks List
+        self._update_recent_rows(recent_blocks)
 
         # Auto refresh charts if stats view is active
         if self.stats_frame.winfo_viewable():
             self.render_stats_charts()
 
-        self.after(30000, self.refresh_data)
+    def _update_recent_rows(self, recent_blocks):
+        """Diffs the recent blocks against the displayed rows, keyed by block id."""
+        wanted_ids = {block["id"] for block in recent_blocks}
+
+        # Rows for blocks that dropped out go back to the pool
+        for block_id in list(self._recent_rows):
+            if block_id not in wanted_ids:
+                row = self._recent_rows.pop(block_id)
+                row.hide()
+                self._row_pool.append(row)
+
+        for index, block in enumerate(recent_blocks):
+            row = self._recent_rows.get(block["id"])
+            if row is None:
+                row = (
+                    self._row_pool.pop()
+                    if self._row_pool
+                    else RecentBlockRow(
+                        self.scrollable_frame, self.delete_activity_block
+                    )
+                )
+                self._recent_rows[block["id"]] = row
+            row.show(block, index)
 
     def render_stats_charts(self):
-        """Renders application, category and weekly trend charts."""
-        # Clear containers
-        for container in [
-            self.app_chart_container,
-            self.cat_chart_container,
-            self.weekly_chart_container,
-        ]:
-            for widget in container.winfo_children():
-                widget.destroy()
-
+        """Requests the chart data for the selected range; drawn on arrival."""
         # Calculate date range
         range_val = self.range_selector.get()
         end_date = datetime.now().strftime("%Y-%m-%d")
@@ -465,113 +668,109 @@ class DashboardApp(ctk.CTk):
             start_date = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
         elif range_val == "Last 30 Days":
             start_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+        elif range_val == "Last Year":
+            start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
         else:
             start_date = end_date
 
+        self.data.request(
+            "stats",
+            ("stats", start_date, end_date),
+            self._load_stats,
+            lambda stats: self._draw_stats(range_val, *stats),
+            start_date,
+            end_date,
+        )
+
+    @timed("ui.load_stats")
+    def _load_stats(self, start_date, end_date):
+        """Worker thread: the aggregates and heatmap behind the Statistics view."""
+        from src.utils import analytics
+
+        blocks = analytics.BlockArrays.load(self.db, start_date, end_date)
+        return (
+            self.db.get_app_usage_stats(start_date, end_date),
+            self.db.get_category_usage_stats(start_date, end_date),
+            self.db.get_daily_usage_stats(days=7),
+            (blocks.categories, analytics.weekday_hour_heatmap(blocks)),
+        )
+
+    @timed("ui.draw_stats")
+    def _draw_stats(self, range_val, app_stats, cat_stats, weekly_stats, heatmap):
+        from src.ui.charts import bar_series, pie_series
+
+        if not self.stats_frame.winfo_viewable():
+            return  # User left the Statistics view meanwhile
+        started = time.perf_counter()
+
         # 1. Application Chart
-        app_stats = self.db.get_app_usage_stats(start_date, end_date)
-        self._draw_pie_chart(
-            self.app_chart_container, app_stats, "app_name", f"App Usage ({range_val})"
+        app_drawn = self.app_chart.update(
+            *pie_series(app_stats, "app_name"), f"App Usage ({range_val})"
         )
 
         # 2. Category Chart
-        cat_stats = self.db.get_category_usage_stats(start_date, end_date)
-        self._draw_pie_chart(
-            self.cat_chart_container,
-            cat_stats,
-            "category",
-            f"Category Usage ({range_val})",
+        cat_drawn = self.cat_chart.update(
+            *pie_series(cat_stats, "category"), f"Category Usage ({range_val})"
         )
 
         # 3. Weekly Trend Chart
-        weekly_stats = self.db.get_daily_usage_stats(days=7)
-        self._draw_bar_chart(
-            self.weekly_chart_container, weekly_stats, "Weekly Activity (last 7 days)"
+        weekly_drawn = self.weekly_chart.update(
+            *bar_series(weekly_stats), "Weekly Activity (last 7 days)"
         )
 
-    def _draw_pie_chart(self, container, stats, label_key, title):
-        if not stats:
-            ctk.CTkLabel(container, text="No data available yet.").pack(expand=True)
-            return
-
-        top_stats = stats[:6]
-        labels = [s[label_key] for s in top_stats]
-        sizes = [s["total_duration"] for s in top_stats]
-
-        if len(stats) > 6:
-            others_duration = sum(s["total_duration"] for s in stats[6:])
-            labels.append("Others")
-            sizes.append(others_duration)
-
-        fig, ax = plt.subplots(figsize=(5, 5), facecolor="#2B2B2B")
-        ax.set_facecolor("#2B2B2B")
-        colors = plt.cm.Paired(range(len(labels)))
-        ax.pie(
-            sizes,
-            labels=labels,
-            autopct="%1.1f%%",
-            startangle=140,
-            colors=colors,
-            textprops={"color": "w"},
-        )
-        ax.set_title(title, color="white", pad=10)
-
-        canvas = FigureCanvasTkAgg(fig, master=container)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        plt.close(fig)
-
-    def _draw_bar_chart(self, container, stats, title):
-        if not stats:
-            ctk.CTkLabel(container, text="No data available yet.").pack(expand=True)
-            return
+        # 4. Heatmap
+        categories, _ = heatmap
+        self._heatmap = (range_val, *heatmap)
+        self.heatmap_category.configure(values=[ALL_CATEGORIES, *sorted(categories)])
+        heatmap_drawn = self._draw_heatmap()
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        redrawn = sum((app_drawn, cat_drawn, weekly_drawn, heatmap_drawn))
+        logging.info(f"Stats render: {elapsed_ms:.1f} ms ({redrawn}/4 charts redrawn)")
+
+    @timed("ui.draw_heatmap")
+    def _draw_heatmap(self) -> bool:
+        """Redraws the heatmap for the chosen category from the last load."""
+        from src.ui.charts import heatmap_series
+
+        if self._heatmap is None:
+            return False
+        range_val, categories, heatmap = self._heatmap
+        selected = self.heatmap_category.get()
+        if selected != ALL_CATEGORIES and selected not in categories:
+            selected = ALL_CATEGORIES
+            self.heatmap_category.set(selected)
+        return self.heatmap_chart.update(
+            *heatmap_series(categories, heatmap, selected),
+            f"{selected} by Hour and Weekday ({range_val})",
+        )
 
-        dates = [s["date"] for s in stats]
-        # Convert YYYY-MM-DD to DD/MM
-        labels = [datetime.strptime(d, "%Y-%m-%d").strftime("%d/%m") for d in dates]
-        durations = [s["total_duration"] / 60 for s in stats]  # Hours
-
-        fig, ax = plt.subplots(figsize=(5, 5), facecolor="#2B2B2B")
-        ax.set_facecolor("#2B2B2B")
-
-        bars = ax.bar(labels, durations, color="#1f538d")
-
-        ax.set_title(title, color="white", pad=10)
-        ax.set_ylabel("Hours", color="white")
-        ax.tick_params(axis="x", colors="white")
-        ax.tick_params(axis="y", colors="white")
-
-        # Add value labels on top of bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(
-                bar.get_x() + bar.get_width() / 2.0,
-                height,
-                f"{height:.1f}h",
-                ha="center",
-                va="bottom",
-                color="white",
-            )
+    def render_categories_list(self):
+        """Requests app assignments and categories; rendered on arrival."""
+        self.data.request(
+            "categories",
+            "categories",
+            self._load_categories,
+            lambda result: self._draw_categories_list(*result),
+        )
 
-        canvas = FigureCanvasTkAgg(fig, master=container)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        plt.close(fig)
+    def _load_categories(self):
+        """Worker thread: known apps, all categories and current assignments."""
+        return (
+            self.db.get_known_apps(),
+            self.db.get_categories(),
+            self.db.get_all_app_categories(),
+        )
 
-    def render_categories_list(self):
+    @timed("ui.draw_categories")
+    def _draw_categories_list(self, apps, all_categories, assignments):
         """Renders both app assignments and category management list."""
         # 1. App Assignments
         for widget in self.cat_scrollable.winfo_children():
             widget.destroy()
 
-        with self.db._get_connection() as conn:
-            cursor = conn.execute("SELECT DISTINCT app_name FROM activity_blocks")
-            apps = [row[0] for row in cursor.fetchall()]
-
-        all_categories = self.db.get_categories()
-
         for app_name in apps:
-            current_cat = self.db.get_app_category(app_name)
+            current_cat = assignments.get(app_name, "Uncategorized")
             row = ctk.CTkFrame(self.cat_scrollable, fg_color="transparent")
             row.pack(fill="x", padx=10, pady=5)
             ctk.CTkLabel(
@@ -611,9 +810,13 @@ class DashboardApp(ctk.CTk):
     def add_custom_category(self):
         name = self.new_cat_entry.get().strip()
         if name:
-            self.db.add_category(name)
             self.new_cat_entry.delete(0, "end")
-            self.render_categories_list()
+            self.data.write(
+                self._edit_categories,
+                lambda _: self.render_categories_list(),
+                self.db.add_category,
+                name,
+            )
 
     def save_settings(self):
         try:
@@ -621,68 +824,142 @@ class DashboardApp(ctk.CTk):
             idle_min = int(self.idle_entry.get())
             if idle_min < 1:
                 idle_min = 1
-            self.db.set_setting("idle_threshold", str(idle_min * 60))
 
             # 2. Cleanup Days
             cleanup_days = int(self.cleanup_entry.get())
             if cleanup_days < 1:
                 cleanup_days = 1
-            self.db.set_setting("db_cleanup_days", str(cleanup_days))
+        except ValueError:
+            logging.error("Invalid input in settings entries.")
+            self._flash_save_button("red", "Error: Invalid Numbers")
+            return
 
+        settings = {
+            "idle_threshold": str(idle_min * 60),
+            "db_cleanup_days": str(cleanup_days),
             # 3. Export on Exit
-            export_val = "True" if self.export_on_exit_var.get() else "False"
-            self.db.set_setting("export_on_exit", export_val)
-
-            # 4. Startup Toggle
-            enabled = self.startup_var.get()
-            StartupManager.set_startup(enabled)
-
+            "export_on_exit": "True" if self.export_on_exit_var.get() else "False",
             # 5. Merge Browsing
-            merge_val = "True" if self.merge_browsing_var.get() else "False"
-            self.db.set_setting("merge_short_browsing", merge_val)
+            "merge_short_browsing": (
+                "True" if self.merge_browsing_var.get() else "False"
+            ),
+            # 7. Diagnostics
+            "metrics_enabled": "True" if self.metrics_enabled_var.get() else "False",
+        }
+        registry.enabled = settings["metrics_enabled"] == "True"
+        # 4. Startup Toggle
+        startup_enabled = self.startup_var.get()
+
+        # 6. Appearance
+        ctk.set_appearance_mode(self.theme_option.get())
+
+        self.data.write(
+            self._persist_settings,
+            lambda _: self._flash_save_button("green", "Settings Saved! ✓"),
+            settings,
+            startup_enabled,
+        )
 
-            # 6. Appearance
-            ctk.set_appearance_mode(self.theme_option.get())
+    def _persist_settings(self, settings, startup_enabled):
+        """Worker thread: writes settings, startup entry and notifies the engine."""
+        for key, value in settings.items():
+            self.db.set_setting(key, value)
+        StartupManager.set_startup(startup_enabled)
+
+        # Notify Engine
+        if self.engine:
+            self.engine.reload_settings()
+
+        logging.info("Settings saved and applied.")
+
+    def _flash_save_button(self, color, text):
+        # Visual feedback
+        self.save_settings_btn.configure(fg_color=color, text=text)
+        self.after(
+            2000,
+            lambda: self.save_settings_btn.configure(
+                fg_color=ctk.ThemeManager.theme["CTkButton"]["fg_color"],
+                text="Save & Apply Settings",
+            ),
+        )
 
-            # Notify Engine
-            if self.engine:
-                self.engine.reload_settings()
-
-            logging.info("Settings saved and applied.")
-
-            # Visual feedback
-            self.save_settings_btn.configure(fg_color="green", text="Settings Saved! ✓")
-            self.after(
-                2000,
-                lambda: self.save_settings_btn.configure(
-                    fg_color=ctk.ThemeManager.theme["CTkButton"]["fg_color"],
-                    text="Save & Apply Settings",
-                ),
-            )
+    def refresh_diagnostics(self):
+        self.data.request(
+            "diagnostics", "diagnostics", self._load_metrics, self._show_metrics
+        )
 
-        except ValueError:
-            logging.error("Invalid input in settings entries.")
-            self.save_settings_btn.configure(
-                fg_color="red", text="Error: Invalid Numbers"
-            )
-            self.after(
-                2000,
-                lambda: self.save_settings_btn.configure(
-                    fg_color=ctk.ThemeManager.theme["CTkButton"]["fg_color"],
-                    text="Save & Apply Settings",
-                ),
+    def _load_metrics(self) -> dict:
+        """Worker thread: this process's metrics, plus the tracker's if separate."""
+        snapshots = {
+            "dashboard" if self.exit_when_hidden else "app": registry.snapshot()
+        }
+        remote = getattr(self.engine, "metrics_snapshot", None)
+        if remote:
+            try:
+                snapshots["tracker"] = remote()
+            except Exception as e:
+                logging.error(f"Could not read tracker metrics: {e}")
+        return snapshots
+
+    def _show_metrics(self, snapshots: dict):
+        sections = []
+        for process, snapshot in snapshots.items():
+            state = "" if snapshot["enabled"] else " (collection off)"
+            sections.append(
+                f"[{process}, pid {snapshot['pid']}, since {snapshot['since']}]{state}\n"
+                + format_snapshot(snapshot)
             )
+        self.diagnostics_text.configure(state="normal")
+        self.diagnostics_text.delete("1.0", "end")
+        self.diagnostics_text.insert("1.0", "\n\n".join(sections))
+        self.diagnostics_text.configure(state="disabled")
+
+    def dump_metrics(self):
+        path = os.path.join(
+            self.exporter.export_dir,
+            f"metrics_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.json",
+        )
+        self.data.request(
+            "diagnostics_dump",
+            "diagnostics_dump",
+            lambda: registry.dump(path, self._load_metrics()),
+            lambda written: logging.info(f"Metrics saved to {written}"),
+        )
 
     def delete_custom_category(self, name):
-        if self.db.delete_category(name):
-            self.render_categories_list()
+        self.data.write(
+            self._edit_categories,
+            lambda deleted: deleted and self.render_categories_list(),
+            self.db.delete_category,
+            name,
+        )
 
     def update_category(self, app_name, new_cat):
-        self.db.set_app_category(app_name, new_cat)
+        self.data.write(
+            self._edit_categories,
+            None,
+            self.db.set_app_category,
+            app_name,
+            new_cat,
+        )
         logging.info(f"Updated {app_name} to category {new_cat}")
 
+    def _edit_categories(self, edit, *args):
+        """
+        Worker thread: applies a category edit, then has the engine drop its
+        cached mapping (in --tracker mode it lives in another process).
+        """
+        result = edit(*args)
+        if self.engine:
+            self.engine.invalidate_categories()
+        return result
+
     def manual_export(self):
-        path = self.exporter.export_today()
+        self.data.request(
+            "export", "export_today", self.exporter.export_today, self._export_done
+        )
+
+    def _export_done(self, path):
         if path:
             logging.info(f"Manual export successful: {path}")
         else:
@@ -695,12 +972,30 @@ class DashboardApp(ctk.CTk):
             logging.error("Export folder does not exist yet.")
 
     def delete_activity_block(self, block_id):
-        self.db.delete_block(block_id)
-        self.refresh_data()
+        # Through the engine so its in-memory active block stays consistent
+        delete = self.engine.delete_block if self.engine else self.db.delete_block
+        self.data.write(
+            delete,
+            lambda _: self.update_activity_views(force=True),
+            block_id,
+        )
 
     def set_engine(self, engine):
         self.engine = engine
 
+    def _apply_idle_decision(self, decision, idle_start, idle_end):
+        """Worker thread: waits until the engine (or tracker) has applied it."""
+        try:
+            self.engine.handle_idle_decision(decision, idle_start, idle_end).result(
+                timeout=COMMAND_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            logging.error(f"Idle decision could not be applied: {e}")
+
+    def _idle_decision_applied(self, _):
+        self.update_activity_views(force=True)
+        self._exit_if_unused()
+
     def show_idle_confirmation(self, idle_start, idle_end):
         """Called by the engine when user returns from idle."""
         logging.info(f"Idle return callback received: {idle_start} to {idle_end}")
@@ -759,10 +1054,18 @@ class DashboardApp(ctk.CTk):
             popup.after(1000, countdown)
 
         def make_decision(decision):
-            if self.engine:
-                self.engine.handle_idle_decision(decision, idle_start, idle_end)
             popup.destroy()
-            self.refresh_data()
+            if self.engine:
+                # The tracker may be another process: never wait on the Tk thread
+                self.data.write(
+                    self._apply_idle_decision,
+                    self._idle_decision_applied,
+                    decision,
+                    idle_start,
+                    idle_end,
+                )
+            else:
+                self.after(0, self._exit_if_unused)
 
         btn_frame = ctk.CTkFrame(popup, fg_color="transparent")
         btn_frame.pack(pady=20)
@@ -0,0 +1,118 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable
+
+
+class DashboardDataService:
+    """
+    Runs dashboard database work on a background thread so the Tk main loop
+    never blocks on SQLite.
+
+    - submit() returns a Future; a request whose key is already in flight
+      shares the existing Future instead of running twice.
+    - request() additionally delivers the result on the Tk thread through
+      widget.after(0, ...). Each request bumps its channel's generation, so a
+      result that arrives after a newer request (or after invalidate()) is
+      discarded instead of overwriting fresher data.
+    - write() is for mutations: never coalesced, run in submission order,
+      and its result is always delivered.
+    """
+
+    def __init__(self, widget):
+        self.widget = widget
+        # One worker keeps queries ordered and uses a single pooled connection
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="dashboard-data"
+        )
+        self._lock = threading.Lock()
+        self._in_flight: dict[Hashable, Future] = {}
+        self._generations: dict[str, int] = {}
+        self.coalesced_count = 0
+
+    def submit(self, key: Hashable, func: Callable, *args) -> Future:
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced_count += 1
+                return future
+            future = self._executor.submit(func, *args)
+            self._in_flight[key] = future
+        future.add_done_callback(lambda f, k=key: self._forget(k, f))
+        return future
+
+    def _forget(self, key: Hashable, future: Future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def request(
+        self,
+        channel: str,
+        key: Hashable,
+        func: Callable,
+        on_result: Callable[[Any], None],
+        *args,
+    ) -> Future:
+        """Runs func(*args) in the background and calls on_result on the Tk thread."""
+        with self._lock:
+            generation = self._generations.get(channel, 0) + 1
+            self._generations[channel] = generation
+
+        future = self.submit(key, func, *args)
+        future.add_done_callback(
+            lambda f: self._schedule(channel, generation, f, on_result)
+        )
+        return future
+
+    def write(
+        self, func: Callable, on_result: Callable[[Any], None] | None, *args
+    ) -> Future:
+        """
+        Runs the mutation func(*args) after everything queued before it and
+        calls on_result (if given) on the Tk thread. Unlike reads, A->X,
+        A->Y, A->X must all run, so writes never share a Future.
+        """
+        future = self._executor.submit(func, *args)
+        if on_result is not None:
+            future.add_done_callback(lambda f: self._schedule(None, None, f, on_result))
+        return future
+
+    def invalidate(self, channel: str):
+        """Discards every pending result of a channel."""
+        with self._lock:
+            self._generations[channel] = self._generations.get(channel, 0) + 1
+
+    def _schedule(self, channel, generation, future, on_result):
+        try:
+            self.widget.after(
+                0, lambda: self._deliver(channel, generation, future, on_result)
+            )
+        except Exception:
+            # Usually Tk shutting down (TclError / "main thread is not in main
+            # loop"); the result can't be shown, but its failure must not vanish
+            logging.exception(f"Dashboard result not delivered ({channel or 'write'})")
+            if not future.cancelled() and future.exception():
+                logging.error(
+                    f"Dashboard data request failed ({channel or 'write'}): "
+                    f"{future.exception()}"
+                )
+
+    def _deliver(self, channel, generation, future, on_result):
+        if channel is not None and self._generations.get(channel) != generation:
+            return  # Stale: superseded by a newer request or invalidated
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error:
+            logging.error(f"Dashboard data request failed ({channel}): {error}")
+            return
+        on_result(future.result())
+
+    def shutdown(self):
+        """Drops queued reads; queued writes still run before the process exits."""
+        with self._lock:
+            reads = list(self._in_flight.values())
+        for future in reads:
+            future.cancel()  # Runs _forget, which takes the lock
+        self._executor.shutdown(wait=False)
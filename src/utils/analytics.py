@@ -0,0 +1,164 @@
+from datetime import datetime
+import numpy as np
+from src.db.manager import day_start_epoch, next_day
+
+# Same rule as the exporter: a gap longer than this ends a session
+SESSION_GAP_SECONDS = 120
+SESSION_BINS_MINUTES = (0, 5, 15, 30, 60, 120, 240)
+DURATION_BINS_MINUTES = (0, 1, 5, 15, 30, 60, 120)
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+class BlockArrays:
+    """
+    The blocks of a date range as parallel NumPy arrays: start/end in epoch
+    seconds (clipped to the range) plus app and category indices into the
+    apps/categories name lists. Loaded with one query per storage
+    partition; everything below works on these arrays without Python loops
+    over blocks.
+    """
+
+    def __init__(self, origin, horizon, start, end, app, category, apps, categories):
+        self.origin = origin  # Local midnight of the first day
+        self.horizon = horizon  # Local midnight after the last day
+        self.start = start
+        self.end = end
+        self.app = app
+        self.category = category
+        self.apps = apps
+        self.categories = categories
+
+    def __len__(self):
+        return len(self.start)
+
+    @classmethod
+    def load(cls, db, start_date: str, end_date: str) -> "BlockArrays":
+        origin = day_start_epoch(start_date)
+        horizon = day_start_epoch(next_day(end_date))
+
+        app_index: dict[str, int] = {}
+        parts = []
+        for app_names, rows in db.iter_block_spans(start_date, end_date):
+            if not rows:
+                continue
+            part = np.array(rows, dtype=np.int64)
+            # Partition-local app ids -> indices shared across the range
+            lookup = np.zeros(max(app_names) + 1, dtype=np.int64)
+            for app_id, name in app_names.items():
+                lookup[app_id] = app_index.setdefault(name, len(app_index))
+            part[:, 2] = lookup[part[:, 2]]
+            parts.append(part)
+        data = np.concatenate(parts) if parts else np.empty((0, 3), dtype=np.int64)
+
+        apps = list(app_index)
+        category_index: dict[str, int] = {}
+        app_category = np.array(
+            [
+                category_index.setdefault(
+                    db.categories.resolve(app), len(category_index)
+                )
+                for app in apps
+            ],
+            dtype=np.int64,
+        )
+        start = np.clip(data[:, 0], origin, horizon)
+        end = np.clip(np.maximum(data[:, 1], data[:, 0]), origin, horizon)
+        app = data[:, 2]
+        category = app_category[app] if len(app) else app
+        return cls(
+            origin, horizon, start, end, app, category, apps, list(category_index)
+        )
+
+
+def bucket_seconds(blocks: BlockArrays, width: int, groups=None, n_groups: int = 1):
+    """
+    Seconds covered by blocks in each width-second bucket from the range's
+    local midnight, as an (n_groups, n_buckets) array. Blocks crossing
+    bucket (hour/day) boundaries are split exactly: the partial first and
+    last buckets get their share and the buckets in between get width each,
+    via a difference array.
+    """
+    n_buckets = -(-(blocks.horizon - blocks.origin) // width)
+    if groups is None:
+        groups = np.zeros(len(blocks), dtype=np.int64)
+    size = n_groups * (n_buckets + 1)
+
+    start = blocks.start - blocks.origin
+    end = blocks.end - blocks.origin
+    first = start // width
+    last = end // width
+    base = groups * (n_buckets + 1)
+
+    same = first == last
+    covered = np.zeros(size)
+    covered += np.bincount(base[same] + first[same], (end - start)[same], size)
+
+    split = ~same
+    covered += np.bincount(
+        base[split] + first[split], ((first + 1) * width - start)[split], size
+    )
+    covered += np.bincount(base[split] + last[split], (end - last * width)[split], size)
+    # Whole buckets strictly between first and last
+    steps = np.bincount(base[split] + first[split] + 1, minlength=size)
+    steps -= np.bincount(base[split] + last[split], minlength=size)
+    full = np.cumsum(steps.reshape(n_groups, n_buckets + 1), axis=1) * width
+
+    return (covered.reshape(n_groups, n_buckets + 1) + full)[:, :n_buckets]
+
+
+def minute_occupancy(blocks: BlockArrays):
+    """Fraction (0..1) of every minute of the range covered by activity."""
+    return np.minimum(bucket_seconds(blocks, 60)[0], 60) / 60
+
+
+def weekday_hour_heatmap(blocks: BlockArrays):
+    """
+    Active minutes per category by local weekday and hour of day, as an
+    (n_categories, 7, 24) array indexed like blocks.categories. Hour buckets
+    start at local midnight, so DST days (23/25 hours) land on the right
+    wall-clock hours.
+    """
+    n_categories = max(len(blocks.categories), 1)
+    hours = bucket_seconds(blocks, 3600, blocks.category, n_categories)
+
+    # Wall-clock weekday/hour of every bucket start (a few thousand at most)
+    bucket_starts = [
+        datetime.fromtimestamp(blocks.origin + 3600 * i) for i in range(hours.shape[1])
+    ]
+    cells = np.array([t.weekday() * 24 + t.hour for t in bucket_starts], dtype=np.int64)
+    index = np.arange(n_categories)[:, None] * (7 * 24) + cells
+    heatmap = np.bincount(index.ravel(), hours.ravel(), n_categories * 7 * 24)
+    return (heatmap / 60).reshape(n_categories, 7, 24)[: len(blocks.categories)]
+
+
+def session_lengths(blocks: BlockArrays, gap: int = SESSION_GAP_SECONDS):
+    """Minutes of every session: consecutive blocks with no gap over gap seconds."""
+    if not len(blocks):
+        return np.empty(0)
+    order = np.argsort(blocks.start, kind="stable")
+    start, end = blocks.start[order], blocks.end[order]
+    reach = np.maximum.accumulate(end)  # Furthest end so far
+    breaks = np.flatnonzero(start[1:] - reach[:-1] > gap) + 1
+    firsts = np.concatenate(([0], breaks))
+    lasts = np.concatenate((breaks - 1, [len(start) - 1]))
+    return (reach[lasts] - start[firsts]) / 60
+
+
+def session_length_histogram(blocks: BlockArrays, bins=SESSION_BINS_MINUTES):
+    """Session counts per length bin (minutes); the last bin is open-ended."""
+    edges = np.append(np.asarray(bins, dtype=float), np.inf)
+    counts, _ = np.histogram(session_lengths(blocks), edges)
+    return counts, edges
+
+
+def app_duration_histograms(blocks: BlockArrays, bins=DURATION_BINS_MINUTES):
+    """
+    Block counts per duration bin (minutes) for every app, as an
+    (n_apps, n_bins) array indexed like blocks.apps.
+    """
+    n_bins = len(bins)
+    which = np.digitize((blocks.end - blocks.start) / 60, bins[1:])
+    counts = np.bincount(
+        blocks.app * n_bins + which, minlength=len(blocks.apps) * n_bins
+    )
+    return counts.reshape(len(blocks.apps), n_bins)
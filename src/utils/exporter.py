@@ -2,13 +2,21 @@ import os
 import sys
 import logging
 from datetime import datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+from src.utils.metrics import timed
+
+# Large write buffer so a year-long export is a handful of syscalls per file
+EXPORT_BUFFER_SIZE = 64 * 1024
 
 
 class ExportManager:
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, export_dir: str | None = None):
         self.db = db_manager
         # Uygulama dizininde 'Exports' klasörü oluştur
-        if getattr(sys, "frozen", False):
+        if export_dir:
+            base_dir = None
+        elif getattr(sys, "frozen", False):
             # EXE olarak çalışıyorsa EXE'nin yanına
             base_dir = os.path.dirname(sys.executable)
         else:
@@ -17,7 +25,7 @@ class ExportManager:
                 os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
             )
 
-        self.export_dir = os.path.join(base_dir, "Exports")
+        self.export_dir = export_dir or os.path.join(base_dir, "Exports")
 
         if not os.path.exists(self.export_dir):
             os.makedirs(self.export_dir)
@@ -27,73 +35,72 @@ class ExportManager:
         today_str = datetime.now().strftime("%Y-%m-%d")
         return self.export_date(today_str)
 
+    @timed("export.export_date")
     def export_date(self, date_str):
         """Exports activity for a specific date (YYYY-MM-DD)."""
-        blocks = self.db.get_app_usage_stats(
-            date_str, date_str
-        )  # This gets totals, we need raw blocks
-
-        # We need raw blocks to reconstruct the timeline
-        raw_blocks = self._get_raw_blocks_for_date(date_str)
-
-        if not raw_blocks:
+        paths = self.export_range(date_str, date_str)
+        if not paths:
             logging.info(f"No data to export for {date_str}")
             return None
-
-        file_path = os.path.join(self.export_dir, f"activity_{date_str}.txt")
-
+        return paths[0]
+
+    @timed("export.export_range")
+    def export_range(self, start_date, end_date):
+        """
+        Exports every day from start_date to end_date (inclusive) to its own
+        file, in a single ordered pass over the database. Returns the paths
+        written; days without activity produce no file.
+        """
+        paths = []
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(f"--- Activity Report: {date_str} ---\n\n")
-
-                last_label = None
-                last_end_time = None
-
-                for block in raw_blocks:
-                    start_time = datetime.fromisoformat(block["start_time"])
-                    end_time = datetime.fromisoformat(block["end_time"])
-                    app_name = block["app_name"]
-                    category = self.db.get_app_category(app_name)
-
-                    # Label determination
-                    label = category if category != "Uncategorized" else app_name
-                    label = label.lower()
-
-                    # Check for gaps (Breaks)
-                    if last_end_time:
-                        gap = (start_time - last_end_time).total_seconds()
-                        if gap > 120:  # Gap > 2 minutes is a break
-                            break_time = last_end_time.strftime("%H:%M")
-                            f.write(f"{break_time} - break\n")
-                            last_label = "break"
-
-                    # Only write if the label has changed or after a break
-                    if label != last_label:
-                        time_str = start_time.strftime("%H:%M")
-                        f.write(f"{time_str} - {label}\n")
-                        last_label = label
-
-                    last_end_time = end_time
-
-                f.write(
-                    f"\nReport generated at: {datetime.now().strftime('%H:%M:%S')}\n"
-                )
-
-            logging.info(f"Exported data to {file_path}")
-            return file_path
+            rows = self.db.iter_blocks_with_category(start_date, end_date)
+            for day, day_rows in groupby(rows, key=itemgetter("day")):
+                paths.append(self._write_day(day, day_rows))
         except Exception as e:
             logging.error(f"Failed to export data: {e}")
-            return None
-
-    def _get_raw_blocks_for_date(self, date_str):
-        """Helper to get chronological blocks for a day."""
-        with self.db._get_connection() as conn:
-            import sqlite3
+            return paths
 
-            conn.row_factory = sqlite3.Row
-            # Using strftime('%Y-%m-%d', start_time) to ensure we match exactly the date part
-            cursor = conn.execute(
-                "SELECT * FROM activity_blocks WHERE date(start_time) = ? ORDER BY start_time ASC",
-                (date_str,),
+        if paths:
+            logging.info(
+                f"Exported {len(paths)} day(s) from {start_date} to {end_date} into {self.export_dir}"
             )
-            return [dict(row) for row in cursor.fetchall()]
+        return paths
+
+    def _write_day(self, date_str, rows):
+        """Writes one day's timeline from chronologically ordered block rows."""
+        file_path = os.path.join(self.export_dir, f"activity_{date_str}.txt")
+
+        with open(file_path, "w", encoding="utf-8", buffering=EXPORT_BUFFER_SIZE) as f:
+            f.write(f"--- Activity Report: {date_str} ---\n\n")
+
+            last_label = None
+            last_end_ts = None
+            last_end_time = None
+
+            for block in rows:
+                category = block["category"]
+
+                # Label determination
+                label = category if category != "Uncategorized" else block["app_name"]
+                label = label.lower()
+
+                # Check for gaps (Breaks)
+                if last_end_ts is not None:
+                    gap = block["start_ts"] - last_end_ts
+                    if gap > 120:  # Gap > 2 minutes is a break
+                        # Stored times are 'YYYY-MM-DD HH:MM:SS...'; slice HH:MM
+                        f.write(f"{last_end_time[11:16]} - break\n")
+                        last_label = "break"
+
+                # Only write if the label has changed or after a break
+                if label != last_label:
+                    f.write(f"{str(block['start_time'])[11:16]} - {label}\n")
+                    last_label = label
+
+                last_end_ts = block["end_ts"]
+                last_end_time = str(block["end_time"])
+
+            f.write(f"\nReport generated at: {datetime.now().strftime('%H:%M:%S')}\n")
+
+        logging.info(f"Exported data to {file_path}")
+        return file_path
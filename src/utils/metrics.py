@@ -0,0 +1,246 @@
+import inspect
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from functools import wraps
+from typing import Callable
+
+# Upper bounds (ms) of the latency buckets; one more bucket holds the rest
+LATENCY_BUCKETS_MS = (
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1000,
+    2500,
+)
+
+
+class Counter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        if registry.enabled:
+            with self._lock:
+                self.value += amount
+
+    def reset(self):
+        with self._lock:
+            self.value = 0
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; percentiles are bucket upper bounds."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * (len(self.bounds) + 1)
+            self.count = 0
+            self.total_ms = 0.0
+            self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        index = bisect_left(self.bounds, ms)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += ms
+            if ms > self.max_ms:
+                self.max_ms = ms
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of samples."""
+        wanted = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= wanted:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"<={b}" for b in self.bounds] + [f">{self.bounds[-1]}"]
+            return {
+                "count": self.count,
+                "mean_ms": self.total_ms / self.count if self.count else 0.0,
+                "p50_ms": self.percentile(0.50),
+                "p95_ms": self.percentile(0.95),
+                "p99_ms": self.percentile(0.99),
+                "max_ms": self.max_ms,
+                "buckets": dict(zip(labels, self.counts)),
+            }
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters, gauges and latency histograms. Gauges are
+    functions read when a snapshot is taken. With enabled off, timed()
+    wrappers and counters skip all bookkeeping.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.started_at = datetime.now()
+        self._lock = threading.Lock()
+        self._counters: dict[str, Counter] = {}
+        self._gauges: dict[str, Callable[[], object]] = {}
+        self._histograms: dict[str, Histogram] = {}
+
+    def counter(self, name: str) -> Counter:
+        with self._lock:
+            return self._counters.setdefault(name, Counter())
+
+    def histogram(self, name: str) -> Histogram:
+        with self._lock:
+            return self._histograms.setdefault(name, Histogram())
+
+    def gauge(self, name: str, read: Callable[[], object]):
+        """Registers read() as the current value of name (replaces any earlier one)."""
+        with self._lock:
+            self._gauges[name] = read
+
+    def reset(self):
+        with self._lock:
+            metrics = [*self._counters.values(), *self._histograms.values()]
+        for metric in metrics:
+            metric.reset()
+        self.started_at = datetime.now()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = dict(self._histograms)
+        gauge_values = {}
+        for name, read in sorted(gauges.items()):
+            try:
+                gauge_values[name] = read()
+            except Exception as e:
+                gauge_values[name] = f"error: {e}"
+        return {
+            "enabled": self.enabled,
+            "pid": os.getpid(),
+            "since": self.started_at.isoformat(timespec="seconds"),
+            "taken_at": datetime.now().isoformat(timespec="seconds"),
+            "counters": {name: c.value for name, c in sorted(counters.items())},
+            "gauges": gauge_values,
+            "histograms": {
+                name: h.snapshot() for name, h in sorted(histograms.items()) if h.count
+            },
+        }
+
+    def dump(self, path: str, snapshot: dict | None = None) -> str:
+        """Writes snapshot (default: a fresh one) as JSON; returns the path."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot or self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+
+registry = MetricsRegistry()
+
+
+def timed(name: str):
+    """
+    Records each call's wall time (ms) in the histogram name. For generator
+    functions only the time spent inside the generator is counted, summed
+    over the whole iteration.
+    """
+
+    def decorate(func):
+        histogram = registry.histogram(name)
+
+        if inspect.isgeneratorfunction(func):
+
+            @wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                if not registry.enabled:
+                    yield from func(*args, **kwargs)
+                    return
+                spent = 0.0
+                started = time.perf_counter()
+                iterator = func(*args, **kwargs)
+                try:
+                    while True:
+                        try:
+                            item = next(iterator)
+                        except StopIteration:
+                            return
+                        finally:
+                            spent += time.perf_counter() - started
+                        yield item
+                        started = time.perf_counter()
+                finally:
+                    iterator.close()
+                    histogram.observe(spent * 1000)
+
+            return generator_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe((time.perf_counter() - started) * 1000)
+
+        return wrapper
+
+    return decorate
+
+
+def instrument_methods(prefix: str, exclude: tuple = ()):
+    """
+    Class decorator: timed(f"{prefix}.{method}") on every public method
+    defined by the class, except those in exclude (e.g. context managers,
+    whose call only creates the manager).
+    """
+
+    def decorate(cls):
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or attr in exclude or not inspect.isfunction(value):
+                continue
+            setattr(cls, attr, timed(f"{prefix}.{attr}")(value))
+        return cls
+
+    return decorate
+
+
+def format_snapshot(snapshot: dict) -> str:
+    """Plain-text table of a snapshot for the Diagnostics view."""
+    lines = [f"{'latency (ms)':<32}{'count':>8}{'mean':>9}{'p95':>9}{'max':>9}"]
+    for name, h in snapshot["histograms"].items():
+        lines.append(
+            f"{name:<32}{h['count']:>8}{h['mean_ms']:>9.2f}"
+            f"{h['p95_ms']:>9.2f}{h['max_ms']:>9.2f}"
+        )
+    if len(lines) == 1:
+        lines.append("(no samples yet)")
+    values = {**snapshot["counters"], **snapshot["gauges"]}
+    if values:
+        lines.append("")
+        lines.extend(f"{name:<32}{value:>8}" for name, value in values.items())
+    return "\n".join(lines)
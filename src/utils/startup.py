@@ -3,6 +3,16 @@ import sys
 import winreg
 
 
+def launch_flag() -> str:
+    """
+    Arguments for the login entry: start in the tray, keeping the separate
+    tracker/dashboard processes if that is how we are running (main.py).
+    """
+    if {"--tracker", "--dashboard"} & set(sys.argv):
+        return "--tracker"
+    return "--tray"
+
+
 class StartupManager:
     APP_NAME = "TimeReporter"
     REG_PATH = r"Software\Microsoft\Windows\CurrentVersion\Run"
@@ -22,10 +32,11 @@ class StartupManager:
                 # Use the current executable path
                 # If running as script, sys.executable is python.exe, we need the script path too
                 # If running as EXE (PyInstaller), sys.executable is the EXE path
+                # launch_flag(): start at login without opening the window
                 if getattr(sys, "frozen", False):
-                    path = sys.executable
+                    path = f'"{sys.executable}" {launch_flag()}'
                 else:
-                    path = f'"{sys.executable}" "{os.path.abspath(sys.argv[0])}"'
+                    path = f'"{sys.executable}" "{os.path.abspath(sys.argv[0])}" {launch_flag()}'
 
                 winreg.SetValueEx(key, StartupManager.APP_NAME, 0, winreg.REG_SZ, path)
             else:
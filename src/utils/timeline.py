@@ -0,0 +1,29 @@
+import logging
+import time
+
+
+class StartupTimeline:
+    """
+    Wall-clock milliseconds of each startup phase, written to the log as one
+    line so a slow import or view shows up as a regression.
+    """
+
+    def __init__(self, started: float | None = None):
+        # started: a time.perf_counter() taken as early as possible
+        self.started = time.perf_counter() if started is None else started
+        self._last = self.started
+        self.phases: list[tuple[str, float]] = []
+
+    def mark(self, phase: str):
+        """Closes the phase running since the previous mark."""
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._last) * 1000))
+        self._last = now
+
+    @property
+    def total_ms(self) -> float:
+        return (self._last - self.started) * 1000
+
+    def log(self):
+        steps = ", ".join(f"{phase} {ms:.0f}" for phase, ms in self.phases)
+        logging.info(f"Startup timeline (ms): {steps}; total {self.total_ms:.0f}")